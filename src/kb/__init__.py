@@ -8,12 +8,45 @@ This module provides three collections:
 Plus conversation threading for multi-turn Q&A support.
 """
 
+from importlib import import_module
+
 from .collections import KBCollection, get_collection_path, get_similarity_threshold
-from .indexer import build_kb_index, get_kb_path, get_chroma_path, get_data_path
-from .retriever import KBRetriever, get_retriever, reset_retriever
-from .ticket_history import TicketHistoryStore, get_ticket_history, reset_ticket_history
-from .status_store import StatusUpdateStore, StatusUpdate, get_status_store, reset_status_store
-from .conversation_store import ConversationStore, get_conversation_store, reset_conversation_store
+
+# The remaining submodules pull in ChromaDB, LangChain and OpenAI, so they are
+# only imported the first time one of their names is accessed.
+_LAZY_IMPORTS = {
+    "build_kb_index": ".indexer",
+    "get_kb_path": ".indexer",
+    "get_chroma_path": ".indexer",
+    "get_data_path": ".indexer",
+    "KBRetriever": ".retriever",
+    "get_retriever": ".retriever",
+    "reset_retriever": ".retriever",
+    "TicketHistoryStore": ".ticket_history",
+    "get_ticket_history": ".ticket_history",
+    "reset_ticket_history": ".ticket_history",
+    "StatusUpdateStore": ".status_store",
+    "StatusUpdate": ".status_store",
+    "get_status_store": ".status_store",
+    "reset_status_store": ".status_store",
+    "ConversationStore": ".conversation_store",
+    "get_conversation_store": ".conversation_store",
+    "reset_conversation_store": ".conversation_store",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     # Collections
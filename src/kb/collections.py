@@ -5,6 +5,8 @@ Defines separate collections for different content types.
 
 from enum import Enum
 from pathlib import Path
+from types import MappingProxyType
+from typing import NamedTuple
 
 
 class KBCollection(str, Enum):
@@ -15,37 +17,49 @@ class KBCollection(str, Enum):
     MONITORING_ISSUES = "monitoring_issues"  # AI-generated monitoring issues
 
 
-# Collection metadata configurations
-COLLECTION_CONFIGS = {
-    KBCollection.SUPPORT_KB: {
-        "description": "Static knowledge base documents (procedures, policies, guides)",
-        "persist_subdir": "chroma_db",
-        "similarity_threshold": 0.6,
-    },
-    KBCollection.PREVIOUS_QUERIES: {
-        "description": "Previously processed tickets for auto-reply matching",
-        "persist_subdir": "previous_queries",
-        "similarity_threshold": 0.8,
-    },
-    KBCollection.STATUS_UPDATES: {
-        "description": "System status updates, outages, and announcements",
-        "persist_subdir": "status_updates",
-        "similarity_threshold": 0.5,
-    },
-    KBCollection.MONITORING_ISSUES: {
-        "description": "AI-generated issues from monitoring system",
-        "persist_subdir": "monitoring_issues",
-        "similarity_threshold": 0.85,
-    },
-}
+class CollectionConfig(NamedTuple):
+    """Static configuration for a KB collection."""
+    description: str
+    persist_subdir: str
+    similarity_threshold: float
+
+
+# Collection metadata configurations (read-only)
+COLLECTION_CONFIGS: MappingProxyType[KBCollection, CollectionConfig] = MappingProxyType({
+    KBCollection.SUPPORT_KB: CollectionConfig(
+        description="Static knowledge base documents (procedures, policies, guides)",
+        persist_subdir="chroma_db",
+        similarity_threshold=0.6,
+    ),
+    KBCollection.PREVIOUS_QUERIES: CollectionConfig(
+        description="Previously processed tickets for auto-reply matching",
+        persist_subdir="previous_queries",
+        similarity_threshold=0.8,
+    ),
+    KBCollection.STATUS_UPDATES: CollectionConfig(
+        description="System status updates, outages, and announcements",
+        persist_subdir="status_updates",
+        similarity_threshold=0.5,
+    ),
+    KBCollection.MONITORING_ISSUES: CollectionConfig(
+        description="AI-generated issues from monitoring system",
+        persist_subdir="monitoring_issues",
+        similarity_threshold=0.85,
+    ),
+})
+
+# Flattened once at import so threshold lookups are a single dict hit
+_THRESHOLDS: MappingProxyType[KBCollection, float] = MappingProxyType({
+    collection: config.similarity_threshold
+    for collection, config in COLLECTION_CONFIGS.items()
+})
 
 
 def get_collection_path(base_path: Path, collection: KBCollection) -> Path:
     """Get the persistence path for a specific collection."""
-    config = COLLECTION_CONFIGS[collection]
-    return base_path / config["persist_subdir"]
+    return base_path / COLLECTION_CONFIGS[collection].persist_subdir
 
 
 def get_similarity_threshold(collection: KBCollection) -> float:
     """Get the default similarity threshold for a collection."""
-    return COLLECTION_CONFIGS[collection]["similarity_threshold"]
+    return _THRESHOLDS[collection]
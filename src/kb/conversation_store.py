@@ -3,22 +3,84 @@ Conversation store for managing multi-turn conversation threads.
 Enables Q&A follow-up by preserving context across ticket interactions.
 """
 
-import json
+import atexit
+import mmap
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+import orjson
+import pydantic_core
+
 from ..schemas import (
     SupportTicket, PipelineResult, ExtractedFields, TriageResult, RoutingDecision,
-    Conversation, ConversationMessage, ConversationStatus, ConversationInfo, AccountTier
+    Conversation, ConversationMessage, ConversationStatus, ConversationInfo,
+    ConversationSummary, AccountTier
+)
+
+
+# Maximum number of full conversations kept in memory
+CONVERSATION_CACHE_SIZE = 256
+
+# Summary index of every conversation, so listings don't load each file
+INDEX_FILENAME = "index.json"
+
+# Each conversation is a directory holding its mutable header fields and an
+# append-only message log, so adding a message writes only that message
+META_FILENAME = "meta.json"
+MESSAGES_FILENAME = "messages.jsonl"
+
+# Threads used to parse conversations when the index has to be rebuilt
+LOAD_WORKERS = min(8, os.cpu_count() or 1)
+
+# How often pending conversation writes are flushed to disk
+FLUSH_INTERVAL_SECONDS = 0.2
+
+# Extracted fields merged across follow-up messages
+_MERGE_FIELDS = (
+    "environment", "region", "error_message", "reproduction_steps",
+    "impact", "requested_action", "order_id"
+)
+
+# Extracted fields shown in conversation context: (attribute, label, formatter)
+_CONTEXT_FIELDS = (
+    ("environment", "environment", str),
+    ("region", "region", str),
+    ("error_message", "error", lambda value: f"{value[:50]}..."),
+    ("order_id", "order_id", str),
 )
 
+ACTIVE_STATUSES = frozenset({
+    ConversationStatus.awaiting_customer,
+    ConversationStatus.awaiting_agent,
+    ConversationStatus.in_progress
+})
+
+
+def _read_json(path: Path):
+    """
+    Parse a JSON file through a read-only memory map.
+
+    orjson parses the mapped pages directly, so large conversation archives
+    are never copied into an intermediate bytes object.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("file is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
 
 class ConversationStore:
     """
     Manages conversation threads across ticket follow-ups.
-    Stores conversations as JSON files for simplicity (can be upgraded to DB).
+    Stores each conversation as a directory with a meta.json header and an
+    append-only messages.jsonl log. Older single-file conversations are still
+    read and are migrated the next time they are written.
     """
 
     def __init__(self, persist_dir: str | Path | None = None):
@@ -35,30 +97,297 @@ class ConversationStore:
         self.persist_dir = Path(persist_dir)
         self.persist_dir.mkdir(parents=True, exist_ok=True)
 
-        # In-memory cache of conversations
-        self._conversations: dict[str, Conversation] = {}
-        self._load_all_conversations()
-
-    def _get_conversation_path(self, conversation_id: str) -> Path:
-        """Get the file path for a conversation."""
+        # Conversations are loaded on demand into a bounded LRU cache;
+        # listings and stats are answered from the summary index instead
+        self._lock = threading.RLock()
+        self._conversations: OrderedDict[str, Conversation] = OrderedDict()
+        # Rendered LLM context per conversation, valid while updated_at matches
+        self._context_cache: dict[str, tuple[datetime, str]] = {}
+        self._index: dict[str, ConversationSummary] = {}
+        # Secondary indexes over the summary index for customer/status lookups
+        self._by_email: dict[str, set[str]] = {}
+        self._by_status: dict[ConversationStatus, set[str]] = {}
+
+        # Write-back: saves mark a conversation dirty and a background thread
+        # flushes them, so rapid updates to one conversation coalesce into a
+        # single write. Unflushed conversations are pinned here so LRU
+        # eviction can't drop changes before they reach disk.
+        self._dirty: set[str] = set()
+        self._unflushed: dict[str, Conversation] = {}
+        # Number of messages already in each conversation's log on disk
+        self._persisted_counts: dict[str, int] = {}
+        self._index_dirty = False
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self._load_index()
+
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+        atexit.register(self.flush)
+
+    def _get_conversation_dir(self, conversation_id: str) -> Path:
+        """Get the directory for a conversation."""
+        return self.persist_dir / conversation_id
+
+    def _get_legacy_path(self, conversation_id: str) -> Path:
+        """Get the single-file path used by conversations saved before the log format."""
         return self.persist_dir / f"{conversation_id}.json"
 
-    def _load_all_conversations(self) -> None:
-        """Load all conversations from disk into memory."""
-        for conv_file in self.persist_dir.glob("*.json"):
+    def _get_index_path(self) -> Path:
+        """Get the file path for the summary index."""
+        return self.persist_dir / INDEX_FILENAME
+
+    def _list_conversation_ids(self) -> set[str]:
+        """List the IDs of all conversations persisted on disk."""
+        conversation_ids = set()
+        # scandir entries carry their type, so files and directories are told
+        # apart without a stat per entry
+        with os.scandir(self.persist_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if os.path.exists(os.path.join(entry.path, META_FILENAME)):
+                        conversation_ids.add(entry.name)
+                elif entry.name.endswith(".json") and entry.name != INDEX_FILENAME:
+                    conversation_ids.add(entry.name[:-len(".json")])
+        return conversation_ids
+
+    def _load_index(self) -> None:
+        """
+        Load the summary index, reconciling it with the files on disk.
+
+        Only conversations missing from the index are parsed, so a warm start
+        reads one file regardless of how many conversations exist.
+        """
+        index_path = self._get_index_path()
+        if index_path.exists():
             try:
-                with open(conv_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                conv = Conversation(**data)
-                self._conversations[conv.conversation_id] = conv
+                entries = _read_json(index_path)
+                for entry in entries.values():
+                    self._set_summary(ConversationSummary.model_validate(entry))
             except Exception as e:
-                print(f"Warning: Failed to load conversation {conv_file}: {e}")
+                print(f"Warning: Failed to load conversation index, rebuilding: {e}")
+                self._index, self._by_email, self._by_status = {}, {}, {}
+
+        on_disk = self._list_conversation_ids()
+        stale = set(self._index) - on_disk
+        missing = on_disk - set(self._index)
+
+        for conversation_id in stale:
+            self._remove_summary(conversation_id)
+        if missing:
+            # orjson releases the GIL while parsing, so a cold rebuild over many
+            # conversations scales across threads
+            with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+                for conversation in executor.map(self._read_conversation, missing):
+                    if conversation:
+                        self._set_summary(self._summarize(conversation))
+
+        if stale or missing:
+            self._write_index()
+
+    def _write_index(self) -> None:
+        """Persist the summary index."""
+        entries = {
+            conversation_id: summary.model_dump()
+            for conversation_id, summary in self._index.items()
+        }
+        self._atomic_write(self._get_index_path(), orjson.dumps(entries))
+
+    def _atomic_write(self, path: Path, data: bytes) -> None:
+        """Write a file via a temp file and rename so readers never see a partial write."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def _set_summary(self, summary: ConversationSummary) -> None:
+        """Add or replace an index entry, keeping the secondary indexes in step."""
+        with self._lock:
+            self._remove_summary(summary.conversation_id)
+            self._index[summary.conversation_id] = summary
+            self._by_email.setdefault(summary.customer_email, set()).add(summary.conversation_id)
+            self._by_status.setdefault(summary.status, set()).add(summary.conversation_id)
+
+    def _remove_summary(self, conversation_id: str) -> None:
+        """Remove an index entry and its secondary index memberships."""
+        with self._lock:
+            summary = self._index.pop(conversation_id, None)
+            if summary is None:
+                return
+            self._by_email.get(summary.customer_email, set()).discard(conversation_id)
+            self._by_status.get(summary.status, set()).discard(conversation_id)
+
+    def _summarize(self, conversation: Conversation) -> ConversationSummary:
+        """Build the index entry for a conversation."""
+        return ConversationSummary(
+            conversation_id=conversation.conversation_id,
+            original_ticket_id=conversation.original_ticket_id,
+            customer_email=conversation.customer_email,
+            customer_name=conversation.customer_name,
+            subject=conversation.subject,
+            status=conversation.status,
+            message_count=len(conversation.messages),
+            pending_fields=list(conversation.pending_fields),
+            created_at=conversation.created_at,
+            updated_at=conversation.updated_at
+        )
+
+    def _read_conversation(self, conversation_id: str) -> Optional[Conversation]:
+        """Read a single conversation from disk."""
+        conversation_dir = self._get_conversation_dir(conversation_id)
+        path = conversation_dir / META_FILENAME
+        if not path.exists():
+            path = self._get_legacy_path(conversation_id)
+
+        try:
+            data = _read_json(path)
+            log_is_clean = False
+            if path.name == META_FILENAME:
+                data["messages"], log_is_clean = self._read_messages(
+                    conversation_dir / MESSAGES_FILENAME
+                )
+            conversation = Conversation.model_validate(data)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Warning: Failed to load conversation {path}: {e}")
+            return None
+
+        # A damaged log is left uncounted so the next write rewrites it whole
+        if log_is_clean:
+            with self._lock:
+                self._persisted_counts[conversation_id] = len(conversation.messages)
+        return conversation
+
+    def _read_messages(self, path: Path) -> tuple[list[dict], bool]:
+        """
+        Read a message log, skipping a torn line left by an interrupted append.
+
+        Returns:
+            The raw messages, and whether every line could be parsed
+        """
+        messages = []
+        clean = True
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return messages, clean
+                # Lines are parsed as slices of the mapped file, without copying
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    start = 0
+                    while start < len(mm):
+                        end = mm.find(b"\n", start)
+                        if end == -1:
+                            end = len(mm)
+                        try:
+                            messages.append(orjson.loads(view[start:end]))
+                        except orjson.JSONDecodeError:
+                            print(f"Warning: Skipping unreadable message in {path}")
+                            clean = False
+                        start = end + 1
+        except FileNotFoundError:
+            pass
+        return messages, clean
+
+    def _cache_conversation(self, conversation: Conversation) -> None:
+        """Insert a conversation into the LRU cache, evicting the oldest if full."""
+        with self._lock:
+            self._conversations[conversation.conversation_id] = conversation
+            self._conversations.move_to_end(conversation.conversation_id)
+            while len(self._conversations) > CONVERSATION_CACHE_SIZE:
+                evicted_id, _ = self._conversations.popitem(last=False)
+                self._context_cache.pop(evicted_id, None)
 
     def _save_conversation(self, conversation: Conversation) -> None:
-        """Save a conversation to disk."""
-        path = self._get_conversation_path(conversation.conversation_id)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(conversation.model_dump(mode="json"), f, indent=2, default=str)
+        """Refresh a conversation's index entry and queue it to be written."""
+        with self._lock:
+            self._set_summary(self._summarize(conversation))
+            self._index_dirty = True
+            self._dirty.add(conversation.conversation_id)
+            self._unflushed[conversation.conversation_id] = conversation
+
+    def _write_conversation(self, conversation: Conversation) -> None:
+        """
+        Write a conversation to disk.
+
+        Messages written since the last flush are appended to the log; only
+        the small meta.json header is rewritten.
+        """
+        conversation_id = conversation.conversation_id
+        conversation_dir = self._get_conversation_dir(conversation_id)
+        conversation_dir.mkdir(exist_ok=True)
+
+        messages = list(conversation.messages)
+        persisted = self._persisted_counts.get(conversation_id, 0)
+        messages_path = conversation_dir / MESSAGES_FILENAME
+        if 0 < persisted <= len(messages):
+            if persisted < len(messages):
+                with open(messages_path, "ab") as f:
+                    start = f.tell()
+                    try:
+                        f.write(self._encode_messages(messages[persisted:]))
+                        f.flush()
+                    except Exception:
+                        # Drop a partial append so the retry doesn't duplicate lines
+                        f.truncate(start)
+                        raise
+        else:
+            # New or migrated conversation: write the whole log
+            self._atomic_write(messages_path, self._encode_messages(messages))
+
+        # Counted as soon as the log holds them, so a failed meta write below
+        # is retried without appending the same messages again
+        with self._lock:
+            self._persisted_counts[conversation_id] = len(messages)
+
+        meta = conversation.model_dump_json(exclude={"messages"}, indent=2).encode()
+        self._atomic_write(conversation_dir / META_FILENAME, meta)
+        self._get_legacy_path(conversation_id).unlink(missing_ok=True)
+
+    def _encode_messages(self, messages: list[ConversationMessage]) -> bytes:
+        """Encode messages as JSON lines."""
+        # Serialized straight to bytes by pydantic-core, no intermediate dict
+        return b"".join(pydantic_core.to_json(message) + b"\n" for message in messages)
+
+    def _flush_loop(self) -> None:
+        """Background thread that periodically flushes pending writes."""
+        while not self._closed.wait(FLUSH_INTERVAL_SECONDS):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Warning: Failed to flush conversations: {e}")
+
+    def flush(self) -> None:
+        """Write all pending conversations and the index to disk."""
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                pending = [self._unflushed[conversation_id] for conversation_id in dirty]
+                index_dirty, self._index_dirty = self._index_dirty, False
+
+            try:
+                for conversation in pending:
+                    self._write_conversation(conversation)
+                if index_dirty:
+                    with self._lock:
+                        self._write_index()
+            except Exception:
+                # Requeue so the next flush retries
+                with self._lock:
+                    self._dirty |= dirty
+                    self._index_dirty = self._index_dirty or index_dirty
+                raise
+
+            with self._lock:
+                # Keep anything re-dirtied while we were writing
+                for conversation_id in dirty - self._dirty:
+                    self._unflushed.pop(conversation_id, None)
+
+    def close(self) -> None:
+        """Stop the background flush thread and write any pending changes."""
+        self._closed.set()
+        self._flush_thread.join()
+        self.flush()
 
     def create_conversation(
         self,
@@ -116,7 +445,7 @@ class ConversationStore:
             updated_at=datetime.now()
         )
 
-        self._conversations[conversation_id] = conversation
+        self._cache_conversation(conversation)
         self._save_conversation(conversation)
 
         return conversation
@@ -131,7 +460,25 @@ class ConversationStore:
         Returns:
             The Conversation or None if not found
         """
-        return self._conversations.get(conversation_id)
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            if conversation is not None:
+                self._conversations.move_to_end(conversation_id)
+                return conversation
+
+            # Evicted from the cache but not yet written
+            conversation = self._unflushed.get(conversation_id)
+            if conversation is not None:
+                self._cache_conversation(conversation)
+                return conversation
+
+        if conversation_id not in self._index:
+            return None
+
+        conversation = self._read_conversation(conversation_id)
+        if conversation is not None:
+            self._cache_conversation(conversation)
+        return conversation
 
     def add_customer_message(
         self,
@@ -150,7 +497,7 @@ class ConversationStore:
         Returns:
             Updated Conversation or None if not found
         """
-        conversation = self._conversations.get(conversation_id)
+        conversation = self.get_conversation(conversation_id)
         if not conversation:
             return None
 
@@ -200,13 +547,15 @@ class ConversationStore:
         Returns:
             Updated Conversation or None if not found
         """
-        conversation = self._conversations.get(conversation_id)
+        conversation = self.get_conversation(conversation_id)
         if not conversation:
             return None
 
+        # One timestamp for the message ID, the message and the conversation
+        now = datetime.now()
         message = ConversationMessage(
-            message_id=f"reply-{datetime.now().timestamp()}",
-            timestamp=datetime.now(),
+            message_id=f"reply-{now.timestamp()}",
+            timestamp=now,
             sender_type="system" if is_auto_reply else "agent",
             sender_id="system",
             content=reply_content,
@@ -214,7 +563,7 @@ class ConversationStore:
         )
 
         conversation.messages.append(message)
-        conversation.updated_at = datetime.now()
+        conversation.updated_at = now
 
         self._save_conversation(conversation)
         return conversation
@@ -234,24 +583,16 @@ class ConversationStore:
 
         merged = conversation.merged_extracted_fields
 
-        # Merge each field - new value fills in if current is None
-        if new_extraction.environment and not merged.environment:
-            merged.environment = new_extraction.environment
-        if new_extraction.region and not merged.region:
-            merged.region = new_extraction.region
-        if new_extraction.error_message and not merged.error_message:
-            merged.error_message = new_extraction.error_message
-        if new_extraction.reproduction_steps and not merged.reproduction_steps:
-            merged.reproduction_steps = new_extraction.reproduction_steps
-        if new_extraction.impact and not merged.impact:
-            merged.impact = new_extraction.impact
-        if new_extraction.requested_action and not merged.requested_action:
-            merged.requested_action = new_extraction.requested_action
-        if new_extraction.order_id and not merged.order_id:
-            merged.order_id = new_extraction.order_id
-
+        # New value fills in a field only if the current one is empty
+        updates = {
+            field: value for field in _MERGE_FIELDS
+            if (value := getattr(new_extraction, field)) and not getattr(merged, field)
+        }
         # Update missing fields based on what we now have
-        merged.missing_fields = new_extraction.missing_fields
+        updates["missing_fields"] = new_extraction.missing_fields
+
+        # Copy rather than mutate: the merged fields may be shared with a message
+        conversation.merged_extracted_fields = merged.model_copy(update=updates)
 
     def _update_pending_fields(self, conversation: Conversation) -> None:
         """Update the list of pending fields based on merged extraction."""
@@ -259,15 +600,12 @@ class ConversationStore:
             return
 
         merged = conversation.merged_extracted_fields
-        still_missing = []
-
-        for field in conversation.pending_fields:
-            # Check if the field is still missing
-            field_value = getattr(merged, field, None)
-            if field_value is None:
-                still_missing.append(field)
+        present = {field for field in _MERGE_FIELDS if getattr(merged, field) is not None}
 
-        conversation.pending_fields = still_missing
+        # Keep the original order; fields we don't extract stay pending
+        conversation.pending_fields = [
+            field for field in conversation.pending_fields if field not in present
+        ]
 
     def get_conversation_context(self, conversation_id: str) -> str:
         """
@@ -279,49 +617,59 @@ class ConversationStore:
         Returns:
             Formatted conversation history
         """
-        conversation = self._conversations.get(conversation_id)
+        conversation = self.get_conversation(conversation_id)
         if not conversation:
             return ""
 
+        # Every mutation bumps updated_at, so a matching timestamp means the
+        # rendered context is still current
+        updated_at = conversation.updated_at
+        cached = self._context_cache.get(conversation_id)
+        if cached and cached[0] == updated_at:
+            return cached[1]
+
+        # Enum values are resolved once, outside the message loop
+        tier = conversation.account_tier.value
+        status = conversation.status.value
+
         context_parts = [
             f"Conversation ID: {conversation.conversation_id}",
             f"Customer: {conversation.customer_name} ({conversation.customer_email})",
-            f"Account Tier: {conversation.account_tier.value}",
+            f"Account Tier: {tier}",
             f"Product: {conversation.product}",
             f"Subject: {conversation.subject}",
-            f"Status: {conversation.status.value}",
+            f"Status: {status}",
             "",
             "--- Message History ---"
         ]
 
         for msg in conversation.messages:
-            sender_label = msg.sender_type.upper()
-            timestamp = msg.timestamp.strftime("%Y-%m-%d %H:%M")
-            context_parts.append(f"\n[{sender_label}] ({timestamp})")
-            context_parts.append(msg.content)
-
-            if msg.extracted_fields:
-                fields = msg.extracted_fields
-                extracted = []
-                if fields.environment:
-                    extracted.append(f"environment={fields.environment}")
-                if fields.region:
-                    extracted.append(f"region={fields.region}")
-                if fields.error_message:
-                    extracted.append(f"error={fields.error_message[:50]}...")
-                if fields.order_id:
-                    extracted.append(f"order_id={fields.order_id}")
+            # isoformat is implemented in C and doesn't parse a format string
+            timestamp = msg.timestamp.isoformat(sep=" ", timespec="minutes")[:16]
+            entry = f"\n[{msg.sender_type.upper()}] ({timestamp})\n{msg.content}"
+
+            fields = msg.extracted_fields
+            if fields:
+                extracted = ", ".join([
+                    f"{label}={format_value(value)}"
+                    for attr, label, format_value in _CONTEXT_FIELDS
+                    if (value := getattr(fields, attr))
+                ])
                 if extracted:
-                    context_parts.append(f"[Extracted: {', '.join(extracted)}]")
+                    entry += f"\n[Extracted: {extracted}]"
+
+            context_parts.append(entry)
 
         if conversation.pending_fields:
             context_parts.append(f"\n--- Still Needed: {', '.join(conversation.pending_fields)} ---")
 
-        return "\n".join(context_parts)
+        context = "\n".join(context_parts)
+        self._context_cache[conversation_id] = (updated_at, context)
+        return context
 
     def get_merged_fields(self, conversation_id: str) -> Optional[ExtractedFields]:
         """Get the merged extracted fields for a conversation."""
-        conversation = self._conversations.get(conversation_id)
+        conversation = self.get_conversation(conversation_id)
         if conversation:
             return conversation.merged_extracted_fields
         return None
@@ -333,7 +681,7 @@ class ConversationStore:
         routing: RoutingDecision
     ) -> Optional[Conversation]:
         """Update the triage and routing for a conversation."""
-        conversation = self._conversations.get(conversation_id)
+        conversation = self.get_conversation(conversation_id)
         if not conversation:
             return None
 
@@ -344,44 +692,90 @@ class ConversationStore:
         self._save_conversation(conversation)
         return conversation
 
+    def set_status(
+        self,
+        conversation_id: str,
+        status: ConversationStatus
+    ) -> Optional[Conversation]:
+        """Set the status of a conversation."""
+        conversation = self.get_conversation(conversation_id)
+        if not conversation:
+            return None
+
+        conversation.status = status
+        conversation.updated_at = datetime.now()
+
+        self._save_conversation(conversation)
+        return conversation
+
     def resolve_conversation(self, conversation_id: str) -> Optional[Conversation]:
         """Mark a conversation as resolved."""
-        conversation = self._conversations.get(conversation_id)
+        conversation = self.get_conversation(conversation_id)
         if not conversation:
             return None
 
+        now = datetime.now()
         conversation.status = ConversationStatus.resolved
-        conversation.resolved_at = datetime.now()
-        conversation.updated_at = datetime.now()
+        conversation.resolved_at = now
+        conversation.updated_at = now
 
         self._save_conversation(conversation)
         return conversation
 
+    def list_conversations(
+        self,
+        statuses: set[ConversationStatus] | frozenset[ConversationStatus] | None = None,
+        customer_email: str | None = None
+    ) -> list[ConversationSummary]:
+        """
+        List conversation summaries from the index without loading conversations.
+
+        Args:
+            statuses: Only include conversations in one of these statuses
+            customer_email: Only include conversations for this customer
+
+        Returns:
+            Matching ConversationSummary entries
+        """
+        with self._lock:
+            if customer_email is not None:
+                conversation_ids = set(self._by_email.get(customer_email, ()))
+            else:
+                conversation_ids = None
+
+            if statuses is not None:
+                with_status = set().union(*(self._by_status.get(s, ()) for s in statuses))
+                conversation_ids = (
+                    with_status if conversation_ids is None else conversation_ids & with_status
+                )
+
+            if conversation_ids is None:
+                return list(self._index.values())
+            return [self._index[conversation_id] for conversation_id in conversation_ids]
+
+    def _load_matching(self, summaries: list[ConversationSummary]) -> list[Conversation]:
+        """Load the full conversations for a list of summaries."""
+        conversation_ids = [summary.conversation_id for summary in summaries]
+        if len(conversation_ids) <= 1:
+            loaded = map(self.get_conversation, conversation_ids)
+        else:
+            with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+                loaded = list(executor.map(self.get_conversation, conversation_ids))
+        return [conversation for conversation in loaded if conversation]
+
     def get_conversations_by_customer(self, customer_email: str) -> list[Conversation]:
         """Get all conversations for a customer."""
-        return [
-            conv for conv in self._conversations.values()
-            if conv.customer_email == customer_email
-        ]
+        return self._load_matching(self.list_conversations(customer_email=customer_email))
 
     def get_active_conversations(self) -> list[Conversation]:
         """Get all active (non-resolved, non-closed) conversations."""
-        active_statuses = {
-            ConversationStatus.awaiting_customer,
-            ConversationStatus.awaiting_agent,
-            ConversationStatus.in_progress
-        }
-        return [
-            conv for conv in self._conversations.values()
-            if conv.status in active_statuses
-        ]
+        return self._load_matching(self.list_conversations(statuses=ACTIVE_STATUSES))
 
     def get_awaiting_customer(self) -> list[Conversation]:
         """Get conversations awaiting customer response."""
-        return [
-            conv for conv in self._conversations.values()
-            if conv.status == ConversationStatus.awaiting_customer
-        ]
+        return self._load_matching(
+            self.list_conversations(statuses={ConversationStatus.awaiting_customer})
+        )
 
     def get_conversation_info(self, conversation: Conversation) -> ConversationInfo:
         """Create a ConversationInfo summary for a conversation."""
@@ -395,11 +789,13 @@ class ConversationStore:
 
     def get_stats(self) -> dict:
         """Get statistics about the conversation store."""
-        total = len(self._conversations)
-        by_status = {}
-        for conv in self._conversations.values():
-            status = conv.status.value
-            by_status[status] = by_status.get(status, 0) + 1
+        with self._lock:
+            total = len(self._index)
+            by_status = {
+                status.value: len(conversation_ids)
+                for status, conversation_ids in self._by_status.items()
+                if conversation_ids
+            }
 
         return {
             "total_conversations": total,
@@ -434,4 +830,6 @@ def get_conversation_store(persist_dir: str | Path | None = None) -> Conversatio
 def reset_conversation_store() -> None:
     """Reset the singleton conversation store instance."""
     global _conversation_store
+    if _conversation_store is not None:
+        _conversation_store.close()
     _conversation_store = None
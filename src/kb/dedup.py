@@ -0,0 +1,104 @@
+"""
+Near-duplicate detection for knowledge base chunks.
+Uses MinHash signatures over character shingles with LSH banding, so
+near-identical chunks can be dropped before they are embedded.
+"""
+
+import zlib
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+# Signature length; more permutations give a finer Jaccard estimate
+NUM_PERM = 64
+
+# Character n-gram size used for shingling
+SHINGLE_SIZE = 5
+
+# LSH bands (NUM_PERM must divide evenly); 16 bands of 4 rows surface
+# candidates from roughly 0.5 similarity, which are then checked against
+# the full signature
+LSH_BANDS = 16
+
+# Estimated Jaccard similarity at which a chunk counts as a duplicate
+DEDUP_THRESHOLD = 0.9
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+# Universal hash coefficients drawn over the full prime range (smaller ones
+# would keep a*x+b monotonic in x and every permutation would pick the same
+# minimum). Fixed seed so signatures are stable across processes and runs.
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    """Hash the distinct character shingles of whitespace-normalized text."""
+    normalized = " ".join(text.lower().split())
+    if len(normalized) <= SHINGLE_SIZE:
+        shingles = {normalized}
+    else:
+        shingles = {
+            normalized[i:i + SHINGLE_SIZE]
+            for i in range(len(normalized) - SHINGLE_SIZE + 1)
+        }
+    return np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+
+def minhash(text: str) -> np.ndarray:
+    """
+    Compute the MinHash signature of a text.
+
+    Args:
+        text: Text to sign
+
+    Returns:
+        Array of NUM_PERM uint64 minimums
+    """
+    hashes = _shingle_hashes(text)[:, None]
+    return ((hashes * _PERM_A + _PERM_B) % _MERSENNE_PRIME).min(axis=0)
+
+
+def drop_near_duplicates(
+    chunks: list[Document],
+    threshold: float = DEDUP_THRESHOLD
+) -> list[Document]:
+    """
+    Drop chunks that are near-duplicates of an earlier chunk.
+
+    Args:
+        chunks: Chunks in priority order; the first of each duplicate group is kept
+        threshold: Estimated Jaccard similarity at which chunks are duplicates
+
+    Returns:
+        The chunks that were kept, in their original order
+    """
+    rows = NUM_PERM // LSH_BANDS
+    buckets: dict[tuple[int, bytes], list[int]] = {}
+    signatures: list[np.ndarray] = []
+    kept = []
+
+    for chunk in chunks:
+        signature = minhash(chunk.page_content)
+        bands = [
+            (band, signature[band * rows:(band + 1) * rows].tobytes())
+            for band in range(LSH_BANDS)
+        ]
+
+        candidates = {index for band in bands for index in buckets.get(band, ())}
+        if any(np.mean(signatures[index] == signature) >= threshold for index in candidates):
+            continue
+
+        index = len(kept)
+        kept.append(chunk)
+        signatures.append(signature)
+        for band in bands:
+            buckets.setdefault(band, []).append(index)
+
+    return kept
@@ -0,0 +1,175 @@
+"""
+Persistent embedding cache for the knowledge base.
+Vectors are keyed by embedding model and a hash of the text, so unchanged
+chunks are never re-embedded across index rebuilds or restarts.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+# SQLite limits bound parameters per statement; lookups are chunked below this
+LOOKUP_CHUNK_SIZE = 500
+
+# Query vectors kept in memory, so repeated queries skip the SQLite lookup
+QUERY_CACHE_SIZE = 4096
+
+# Vectors are quantized to half precision, which halves the cache (and the
+# vector payload sent to Chroma) with negligible effect on cosine similarity
+VECTOR_DTYPE = np.float16
+
+# Cache schema version (PRAGMA user_version); 0 stored float32 vectors
+SCHEMA_VERSION = 1
+
+# Rows converted per statement when migrating an older cache
+MIGRATION_BATCH_SIZE = 1000
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embeddings model with a SQLite-backed vector cache.
+
+    Only texts missing from the cache are sent to the wrapped model; their
+    vectors are quantized to float16 and stored as raw bytes in a single
+    transaction. Vectors are returned quantized whether or not they were
+    cached, so a text always embeds the same way. Recent query vectors are
+    also kept in an in-memory LRU.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, path: str | Path):
+        """
+        Initialize the cache.
+
+        Args:
+            embeddings: The embeddings model to call on cache misses
+            model_name: Name of the embedding model, part of the cache key
+            path: Path of the SQLite cache file
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "model TEXT NOT NULL, hash BLOB NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, hash))"
+        )
+        self._conn.commit()
+        self._migrate()
+
+        self._query_cache: OrderedDict[str, list[float]] = OrderedDict()
+
+    def _migrate(self) -> None:
+        """Convert vectors stored by older cache versions to VECTOR_DTYPE."""
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version >= SCHEMA_VERSION:
+            return
+
+        with self._conn:
+            last_rowid = 0
+            while True:
+                rows = self._conn.execute(
+                    "SELECT rowid, vector FROM cache WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, MIGRATION_BATCH_SIZE)
+                ).fetchall()
+                if not rows:
+                    break
+                self._conn.executemany(
+                    "UPDATE cache SET vector = ? WHERE rowid = ?",
+                    [
+                        (np.frombuffer(vector, dtype=np.float32).astype(VECTOR_DTYPE).tobytes(), rowid)
+                        for rowid, vector in rows
+                    ]
+                )
+                last_rowid = rows[-1][0]
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _hash(text: str) -> bytes:
+        """Hash a text for use as a cache key."""
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def _lookup(self, hashes: list[bytes]) -> dict[bytes, list[float]]:
+        """Fetch cached vectors for a list of hashes."""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), LOOKUP_CHUNK_SIZE):
+                chunk = unique[start:start + LOOKUP_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM cache WHERE model = ? AND hash IN ({placeholders})",
+                    [self.model_name, *chunk]
+                )
+                for text_hash, vector in rows:
+                    found[text_hash] = np.frombuffer(vector, dtype=VECTOR_DTYPE).tolist()
+        return found
+
+    def _store(self, hashes: list[bytes], vectors: np.ndarray) -> None:
+        """Save newly computed (already quantized) vectors in one transaction."""
+        rows = [
+            (self.model_name, text_hash, vector.tobytes())
+            for text_hash, vector in zip(hashes, vectors)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (model, hash, vector) VALUES (?, ?, ?)", rows
+            )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed texts, serving repeats from the cache.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector per text, in order
+        """
+        if not texts:
+            return []
+
+        hashes = [self._hash(text) for text in texts]
+        cached = self._lookup(hashes)
+
+        # Embed each distinct missing text once
+        missing = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in cached and text_hash not in missing:
+                missing[text_hash] = text
+
+        if missing:
+            vectors = np.asarray(
+                self.embeddings.embed_documents(list(missing.values())), dtype=VECTOR_DTYPE
+            )
+            self._store(list(missing), vectors)
+            cached.update(zip(missing, vectors.tolist()))
+
+        return [cached[text_hash] for text_hash in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a single query, serving repeats from memory or the cache."""
+        with self._lock:
+            vector = self._query_cache.get(text)
+            if vector is not None:
+                self._query_cache.move_to_end(text)
+                return list(vector)
+
+        vector = self.embed_documents([text])[0]
+
+        with self._lock:
+            self._query_cache[text] = vector
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+
+        return list(vector)
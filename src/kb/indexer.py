@@ -3,18 +3,73 @@ ChromaDB indexer with LangChain integration for the knowledge base.
 Supports multiple collections defined in collections.py.
 """
 
+import hashlib
+import mmap
 import os
+import atexit
 import re
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+import orjson
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
-from langchain_chroma import Chroma
+from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
 from .collections import KBCollection, get_collection_path
+from .dedup import drop_near_duplicates
+from .parent_store import ParentChunkStore
+from .write_queue import BatchWriteQueue
+
+# langchain_chroma pulls in ChromaDB, so it is only imported where a
+# vectorstore is opened
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+
+
+# File Chroma persists a collection's data to
+CHROMA_DB_FILENAME = "chroma.sqlite3"
+
+# HNSW parameters by collection size: (vectors below, M, construction_ef,
+# search_ef). Small KBs get a sparser graph; larger ones need denser graphs
+# and wider beams to hold recall
+HNSW_TIERS = (
+    (100_000, 16, 64, 40),
+    (1_000_000, 24, 128, 100),
+    (float("inf"), 32, 256, 200),
+)
+HNSW_BATCH_SIZE = 1000
+
+# Environment overrides for the tiered HNSW parameters
+HNSW_ENV_OVERRIDES = {
+    "hnsw:M": "KB_HNSW_M",
+    "hnsw:construction_ef": "KB_HNSW_EFC",
+    "hnsw:search_ef": "KB_HNSW_EFS",
+}
+
+# HNSW parameters chosen for the last build, saved next to the index
+HNSW_PARAMS_FILENAME = ".hnsw.json"
+
+# Per-file fingerprints of the KB the index was built from
+MANIFEST_FILENAME = "manifest.json"
+
+# Chunks embedded and inserted per call, bounding peak memory during builds
+INDEX_BATCH_SIZE = 256
+
+# SQLite file (under the data directory) caching embeddings by content hash
+EMBEDDING_CACHE_FILENAME = "embedding_cache.sqlite3"
+
+# Threads used to read KB markdown files
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Embedding requests in flight at once while indexing
+EMBED_CONCURRENCY = int(os.getenv("KB_EMBED_CONCURRENCY", "8"))
 
 
 def get_project_root() -> Path:
@@ -37,26 +92,218 @@ def get_chroma_path() -> Path:
     return get_collection_path(get_data_path(), KBCollection.SUPPORT_KB)
 
 
+# Shared embeddings model, created on first use
+_embeddings = None
+
+# SUPPORT_KB vectorstores opened for writes, keyed by persistence directory
+_vectorstores: dict[Path, "Chroma"] = {}
+_vectorstores_lock = threading.Lock()
+
+# Approved responses written to the KB per batch, and the longest one waits
+APPROVED_BATCH_SIZE = int(os.getenv("KB_APPROVED_BATCH_SIZE", "32"))
+APPROVED_FLUSH_SECONDS = float(os.getenv("KB_APPROVED_FLUSH_SECONDS", "5"))
+
+# Background writer for approved responses, created on first use
+_approved_queue: BatchWriteQueue | None = None
+
+
+def configure_hnsw_params(vector_count: int) -> dict:
+    """
+    Choose HNSW parameters for a collection of the given size.
+
+    Args:
+        vector_count: Number of vectors the collection will hold
+
+    Returns:
+        hnsw:M, hnsw:construction_ef and hnsw:search_ef collection metadata,
+        with any KB_HNSW_* environment overrides applied
+    """
+    for max_count, m, construction_ef, search_ef in HNSW_TIERS:
+        if vector_count < max_count:
+            break
+
+    params = {
+        "hnsw:M": m,
+        "hnsw:construction_ef": construction_ef,
+        "hnsw:search_ef": search_ef,
+    }
+    for key, env_var in HNSW_ENV_OVERRIDES.items():
+        if os.getenv(env_var):
+            params[key] = int(os.getenv(env_var))
+    return params
+
+
+def get_kb_collection_metadata(vector_count: int) -> dict:
+    """Get the metadata (distance space and HNSW parameters) for the SUPPORT_KB collection."""
+    return {
+        "hnsw:space": "cosine",
+        "hnsw:batch_size": HNSW_BATCH_SIZE,
+        **configure_hnsw_params(vector_count),
+    }
+
+
+def load_hnsw_params(persist_dir: Path) -> dict:
+    """Load the HNSW parameters saved with an index (empty if unknown)."""
+    try:
+        return orjson.loads((persist_dir / HNSW_PARAMS_FILENAME).read_bytes())
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Warning: Failed to load HNSW parameters: {e}")
+        return {}
+
+
 def get_embeddings():
     """
-    Get the OpenAI embeddings model.
+    Get the OpenAI embeddings model, wrapped in the persistent embedding cache.
     Requires OPENAI_API_KEY environment variable to be set.
     """
-    from langchain_openai import OpenAIEmbeddings
-    return OpenAIEmbeddings()
+    global _embeddings
+
+    if _embeddings is None:
+        from langchain_openai import OpenAIEmbeddings
+        from .embed_cache import CachedEmbeddings
+        from .rate_limiter import RateLimitedEmbeddings, get_rate_limiter
+
+        # Extra retries since index builds issue several requests concurrently
+        openai_embeddings = OpenAIEmbeddings(max_retries=6)
+        # Only cache misses reach the API, so only they are rate limited
+        _embeddings = CachedEmbeddings(
+            RateLimitedEmbeddings(openai_embeddings, get_rate_limiter()),
+            model_name=openai_embeddings.model,
+            path=get_data_path() / EMBEDDING_CACHE_FILENAME
+        )
+
+    return _embeddings
+
+
+def _get_vectorstore(persist_dir: Path) -> "Chroma":
+    """Get the SUPPORT_KB vectorstore for a directory, opening it once per process."""
+    from langchain_chroma import Chroma
+
+    key = persist_dir.resolve()
+    with _vectorstores_lock:
+        vectorstore = _vectorstores.get(key)
+        if vectorstore is None:
+            vectorstore = Chroma(
+                persist_directory=str(persist_dir),
+                embedding_function=get_embeddings(),
+                collection_name=KBCollection.SUPPORT_KB.value
+            )
+            _vectorstores[key] = vectorstore
+        return vectorstore
+
+
+def _add_approved_documents(items: list[tuple[Path, Document]]) -> None:
+    """
+    Embed and add a batch of approved responses, one call per SUPPORT_KB directory.
+
+    Documents are upserted by their ID, so a batch retried after failing
+    partway doesn't duplicate the directories already written.
+    """
+    by_dir: dict[Path, list[Document]] = {}
+    for persist_dir, doc in items:
+        by_dir.setdefault(persist_dir, []).append(doc)
+
+    for persist_dir, docs in by_dir.items():
+        _get_vectorstore(persist_dir).add_documents(docs, ids=[doc.id for doc in docs])
+        print(f"Added {len(docs)} approved responses to KB")
+
+
+def get_approved_response_queue() -> BatchWriteQueue:
+    """
+    Get or create the singleton queue that writes approved responses.
+
+    Returns:
+        BatchWriteQueue of (persist_dir, Document) items, flushed at interpreter exit
+    """
+    global _approved_queue
+
+    if _approved_queue is None:
+        _approved_queue = BatchWriteQueue(
+            _add_approved_documents,
+            batch_size=APPROVED_BATCH_SIZE,
+            flush_seconds=APPROVED_FLUSH_SECONDS,
+            name="approved response"
+        )
+        atexit.register(_approved_queue.close)
+
+    return _approved_queue
+
+
+def reset_approved_response_queue() -> None:
+    """Write any queued approved responses and reset the singleton queue."""
+    global _approved_queue
 
+    if _approved_queue is not None:
+        _approved_queue.close()
+        _approved_queue = None
 
-def load_markdown_files(kb_path: Path) -> list[Document]:
+
+def _read_text(path: Path) -> str:
+    """
+    Read a UTF-8 text file through a read-only memory map.
+
+    The text is decoded straight from the mapped pages, skipping the
+    intermediate bytes copy a buffered read would make.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            content = str(view, "utf-8")
+
+    # Match text-mode reads, which translate Windows/old-Mac line endings
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+# Markdown files at or below this many bytes hold no indexable content
+# and are skipped
+MIN_KB_FILE_SIZE = 16
+
+
+def _scan_markdown_files(kb_path: Path) -> list[os.DirEntry]:
+    """List the non-empty markdown files in a directory, sorted by name."""
+    # scandir entries carry their type (and cache stat), unlike Path.glob
+    with os.scandir(kb_path) as entries:
+        md_files = [
+            entry for entry in entries
+            if entry.name.endswith(".md") and entry.is_file()
+            and entry.stat().st_size > MIN_KB_FILE_SIZE
+        ]
+    return sorted(md_files, key=lambda entry: entry.name)
+
+
+def load_markdown_files(kb_path: Path, filenames: Optional[Iterable[str]] = None) -> list[Document]:
     """
     Load all markdown files from the knowledge base directory.
     Returns documents with source metadata.
+
+    Args:
+        kb_path: Knowledge base directory
+        filenames: Only load these file names (default: every *.md file)
     """
     documents = []
-    
-    for md_file in kb_path.glob("*.md"):
-        with open(md_file, "r", encoding="utf-8") as f:
-            content = f.read()
-        
+
+    if filenames is None:
+        md_files = [Path(entry.path) for entry in _scan_markdown_files(kb_path)]
+    else:
+        md_files = [kb_path / name for name in filenames]
+
+    # Reads are I/O-bound and release the GIL, so files are read concurrently
+    if len(md_files) > 1:
+        with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(md_files))) as executor:
+            contents = list(executor.map(_read_text, md_files))
+    else:
+        contents = [_read_text(md_file) for md_file in md_files]
+
+    for md_file, content in zip(md_files, contents):
+        # Whitespace-only files would only produce empty chunks
+        if not content.strip():
+            continue
+
         # Create document with source metadata
         doc = Document(
             page_content=content,
@@ -70,86 +317,363 @@ def load_markdown_files(kb_path: Path) -> list[Document]:
     return documents
 
 
+# Section names used in citations: spaces and slashes become hyphens,
+# then anything else outside [a-z0-9-] is stripped
+_SECTION_TRANS = str.maketrans({" ": "-", "/": "-"})
+_SECTION_RE = re.compile(r"[^a-z0-9-]")
+
+# Documents needed before splitting is fanned out to worker processes;
+# below this the pool start-up costs more than it saves (a typical KB file
+# splits in well under a millisecond)
+PARALLEL_SPLIT_MIN_DOCS = 64
+
+# Documents sent to a split worker per task, as a fraction of each worker's share
+SPLIT_TASKS_PER_WORKER = 4
+
+# Child chunks are embedded for retrieval; their parents are returned as passages
+CHILD_CHUNK_SIZE = 300
+CHILD_CHUNK_OVERLAP = 30
+
+# Markdown header levels that start a new section, and their metadata keys
+SECTION_HEADERS = {1: "h1", 2: "h2", 3: "h3"}
+
+# Sections longer than this are split further
+SECTION_CHUNK_SIZE = 1000
+SECTION_CHUNK_OVERLAP = 100
+
+_section_splitter: RecursiveCharacterTextSplitter | None = None
+_child_splitter: RecursiveCharacterTextSplitter | None = None
+
+
+def _get_section_splitter() -> RecursiveCharacterTextSplitter:
+    """Create the splitter for oversized sections once per process."""
+    global _section_splitter
+
+    if _section_splitter is None:
+        _section_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=SECTION_CHUNK_SIZE,
+            chunk_overlap=SECTION_CHUNK_OVERLAP,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        )
+
+    return _section_splitter
+
+
+def _split_sections(text: str) -> list[tuple[str, dict]]:
+    """
+    Split markdown into header-delimited sections in a single pass.
+
+    Lines are stripped and a section's paragraphs are joined with markdown
+    line breaks ("  \\n"). Header lines stay in the content and the enclosing
+    h1-h3 headers are recorded in the metadata; headers inside fenced code
+    blocks are ignored.
+
+    Args:
+        text: Markdown text
+
+    Returns:
+        (content, header metadata) per section
+    """
+    sections: list[tuple[str, dict]] = []
+    block: list[str] = []
+    headers: dict[str, str] = {}
+    fence = ""
+
+    def flush(block_headers: dict[str, str]) -> None:
+        content = "\n".join(block)
+        block.clear()
+        if sections:
+            last_content, last_headers = sections[-1]
+            # Paragraphs of one section, or the body following a bare parent
+            # header line, are joined to the previous section
+            if last_headers == block_headers or (
+                len(last_headers) < len(block_headers)
+                and last_content.rsplit("\n", 1)[-1].startswith("#")
+            ):
+                sections[-1] = (f"{last_content}  \n{content}", block_headers)
+                return
+        sections.append((content, block_headers))
+
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line.isprintable():
+            line = "".join(filter(str.isprintable, line))
+
+        if not fence:
+            if line.startswith("```") and line.count("```") == 1:
+                fence = "```"
+            elif line.startswith("~~~"):
+                fence = "~~~"
+        elif line.startswith(fence):
+            fence = ""
+
+        if fence:
+            block.append(line)
+            continue
+
+        level = len(line) - len(line.lstrip("#"))
+        if level in SECTION_HEADERS and (len(line) == level or line[level] == " "):
+            if block:
+                flush(headers)
+            headers = {
+                name: value for name, value in headers.items()
+                if int(name[1:]) < level
+            }
+            headers[SECTION_HEADERS[level]] = line[level:].strip()
+            block.append(line)
+        elif line:
+            block.append(line)
+        elif block:
+            flush(headers)
+
+    if block:
+        flush(headers)
+
+    return sections
+
+
+def _split_one(doc: dict) -> list[tuple[str, dict]]:
+    """
+    Split a single document into (content, metadata) chunks.
+
+    Takes and returns plain data so it can run in a worker process.
+    """
+    chunks = []
+
+    for content, headers in _split_sections(doc["content"]):
+        # Merge original metadata with header metadata
+        chunk_metadata = {
+            "source": doc["metadata"]["source"],
+            "file_path": doc["metadata"].get("file_path", ""),
+            **headers
+        }
+
+        # Determine section name for citations
+        section = (
+            chunk_metadata.get("h3") or 
+            chunk_metadata.get("h2") or 
+            chunk_metadata.get("h1") or 
+            "general"
+        )
+        # Clean section name for citation format
+        section = _SECTION_RE.sub("", section.lower().translate(_SECTION_TRANS))
+        chunk_metadata["section"] = section
+
+        # Further split if content is too large
+        if len(content) > SECTION_CHUNK_SIZE:
+            sub_chunks = _get_section_splitter().split_text(content)
+            for i, sub_chunk in enumerate(sub_chunks):
+                sub_metadata = chunk_metadata.copy()
+                sub_metadata["chunk_index"] = i
+                chunks.append((sub_chunk, sub_metadata))
+        else:
+            chunks.append((content, chunk_metadata))
+
+    return chunks
+
+
 def split_by_headers(documents: list[Document]) -> list[Document]:
     """
     Split documents by markdown headers to create section-aware chunks.
     Preserves header hierarchy in metadata for citation formatting.
+
+    Splitting is pure-Python string work that holds the GIL, so larger
+    document sets are split across a process pool.
     """
-    # Define headers to split on
-    headers_to_split_on = [
-        ("#", "h1"),
-        ("##", "h2"),
-        ("###", "h3"),
+    payloads = [{"content": doc.page_content, "metadata": doc.metadata} for doc in documents]
+
+    if len(payloads) < PARALLEL_SPLIT_MIN_DOCS:
+        results = map(_split_one, payloads)
+    else:
+        workers = min(os.cpu_count() or 1, len(payloads))
+        # Hand documents out in chunks so small files don't cost a round-trip each
+        chunksize = max(1, len(payloads) // (workers * SPLIT_TASKS_PER_WORKER))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_split_one, payloads, chunksize=chunksize))
+
+    return [
+        Document(page_content=content, metadata=metadata)
+        for chunks in results
+        for content, metadata in chunks
     ]
-    
-    markdown_splitter = MarkdownHeaderTextSplitter(
-        headers_to_split_on=headers_to_split_on,
-        strip_headers=False
-    )
-    
-    # Secondary splitter for chunks that are still too large
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=100,
-        separators=["\n\n", "\n", ". ", " ", ""]
-    )
-    
-    all_chunks = []
-    
-    for doc in documents:
-        # Split by headers first
-        header_splits = markdown_splitter.split_text(doc.page_content)
-        
-        for split in header_splits:
-            # Merge original metadata with header metadata
-            chunk_metadata = {
-                "source": doc.metadata["source"],
-                "file_path": doc.metadata.get("file_path", ""),
-            }
-            
-            # Add header hierarchy to metadata
-            if hasattr(split, "metadata"):
-                chunk_metadata.update(split.metadata)
-            
-            # Determine section name for citations
-            section = (
-                chunk_metadata.get("h3") or 
-                chunk_metadata.get("h2") or 
-                chunk_metadata.get("h1") or 
-                "general"
-            )
-            # Clean section name for citation format
-            section = section.lower().replace(" ", "-").replace("/", "-")
-            section = re.sub(r"[^a-z0-9-]", "", section)
-            chunk_metadata["section"] = section
-            
-            # Get content
-            content = split.page_content if hasattr(split, "page_content") else str(split)
-            
-            # Further split if content is too large
-            if len(content) > 1000:
-                sub_chunks = text_splitter.split_text(content)
-                for i, sub_chunk in enumerate(sub_chunks):
-                    sub_metadata = chunk_metadata.copy()
-                    sub_metadata["chunk_index"] = i
-                    all_chunks.append(Document(
-                        page_content=sub_chunk,
-                        metadata=sub_metadata
-                    ))
-            else:
-                all_chunks.append(Document(
-                    page_content=content,
-                    metadata=chunk_metadata
-                ))
-    
-    return all_chunks
+
+
+def build_kb_manifest(kb_path: Path, previous: Optional[dict] = None) -> dict[str, list]:
+    """
+    Fingerprint every markdown file in the knowledge base.
+
+    Files whose mtime and size match the previous manifest reuse its digest,
+    so only touched files are hashed.
+
+    Args:
+        kb_path: Knowledge base directory
+        previous: Manifest to reuse unchanged entries from
+
+    Returns:
+        Mapping of file name to [mtime_ns, size, blake2b digest]
+    """
+    manifest = {}
+    for md_file in _scan_markdown_files(kb_path):
+        stat = md_file.stat()
+        entry = (previous or {}).get(md_file.name)
+        if not entry or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+            with open(md_file.path, "rb") as f:
+                digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+            entry = [stat.st_mtime_ns, stat.st_size, digest]
+        manifest[md_file.name] = entry
+    return manifest
+
+
+def _load_manifest(persist_dir: Path) -> Optional[dict]:
+    """Load the manifest saved with an index, or None if there isn't one."""
+    try:
+        return orjson.loads((persist_dir / MANIFEST_FILENAME).read_bytes())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Failed to load KB manifest: {e}")
+        return None
+
+
+def _write_manifest(persist_dir: Path, manifest: dict) -> None:
+    """Atomically save the manifest alongside the index."""
+    path = persist_dir / MANIFEST_FILENAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, path)
+
+
+def split_into_children(parents: list[Document]) -> list[Document]:
+    """
+    Split parent chunks into small child chunks for embedding.
+
+    Each parent gets a parent_id (stable per source file and position) that
+    its children carry in their metadata, so retrieval can match on the
+    sharper child embeddings and return the fuller parent text.
+
+    Args:
+        parents: Section-level chunks from split_by_headers; a parent_id is
+            added to their metadata
+
+    Returns:
+        Child chunks, in parent order
+    """
+    global _child_splitter
+
+    if _child_splitter is None:
+        _child_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHILD_CHUNK_SIZE,
+            chunk_overlap=CHILD_CHUNK_OVERLAP,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        )
+
+    children = []
+    ordinals: dict[str, int] = {}
+    for parent in parents:
+        source = parent.metadata["source"]
+        ordinal = ordinals.get(source, 0)
+        ordinals[source] = ordinal + 1
+        parent.metadata["parent_id"] = f"{source}:{ordinal}"
+
+        for child_content in _child_splitter.split_text(parent.page_content):
+            children.append(Document(page_content=child_content, metadata=dict(parent.metadata)))
+
+    return children
+
+
+def _prepare_children(parents: list[Document]) -> list[Document]:
+    """
+    Split parents into child chunks and drop near-duplicate children.
+
+    Duplicates are only dropped within a source file. Files are re-indexed
+    independently, so a copy kept in one file must not be the only one
+    standing for a chunk suppressed in another.
+    """
+    children = split_into_children(parents)
+    by_source: dict[str, list[Document]] = {}
+    for child in children:
+        by_source.setdefault(child.metadata["source"], []).append(child)
+    unique_children = [
+        child
+        for source_children in by_source.values()
+        for child in drop_near_duplicates(source_children)
+    ]
+    if len(unique_children) < len(children):
+        print(f"Skipped {len(children) - len(unique_children)} near-duplicate chunks")
+    return unique_children
+
+
+def _index_chunks(
+    vectorstore: "Chroma",
+    persist_dir: Path,
+    parents: list[Document],
+    children: list[Document]
+) -> None:
+    """Store parent chunks in the sidecar and embed their children."""
+    ParentChunkStore(persist_dir).add(parents)
+    _add_in_batches(vectorstore, children)
+
+
+def _add_in_batches(vectorstore: "Chroma", chunks: list[Document]) -> None:
+    """
+    Embed and insert chunks INDEX_BATCH_SIZE at a time.
+
+    Up to EMBED_CONCURRENCY batches are embedded in parallel, since build time
+    is dominated by request round-trips; each wave is inserted before the next
+    starts so memory stays bounded.
+    """
+    embeddings = vectorstore.embeddings
+    batches = [
+        chunks[start:start + INDEX_BATCH_SIZE]
+        for start in range(0, len(chunks), INDEX_BATCH_SIZE)
+    ]
+
+    def embed(batch: list[Document]) -> list[list[float]]:
+        return embeddings.embed_documents([chunk.page_content for chunk in batch])
+
+    indexed = 0
+    with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY) as executor:
+        for wave_start in range(0, len(batches), EMBED_CONCURRENCY):
+            wave = batches[wave_start:wave_start + EMBED_CONCURRENCY]
+            for batch, vectors in zip(wave, executor.map(embed, wave)):
+                vectorstore._collection.add(
+                    ids=[str(uuid.uuid4()) for _ in batch],
+                    embeddings=vectors,
+                    documents=[chunk.page_content for chunk in batch],
+                    metadatas=[chunk.metadata for chunk in batch]
+                )
+                indexed += len(batch)
+            if len(batches) > 1:
+                print(f"Indexed {indexed}/{len(chunks)} chunks")
+
+
+def _reindex_files(
+    vectorstore: "Chroma",
+    persist_dir: Path,
+    kb_path: Path,
+    changed: list[str],
+    removed: list[str]
+) -> None:
+    """Replace the chunks of changed KB files and drop those of removed files."""
+    sources = [Path(name).stem for name in changed + removed]
+    for source in sources:
+        vectorstore._collection.delete(where={"source": source})
+    ParentChunkStore(persist_dir).delete_sources(sources)
+
+    if changed:
+        parents = split_by_headers(load_markdown_files(kb_path, changed))
+        children = _prepare_children(parents)
+        _index_chunks(vectorstore, persist_dir, parents, children)
+        print(f"Re-indexed {len(children)} chunks from {len(changed)} changed KB files")
+    if removed:
+        print(f"Removed {len(removed)} deleted KB files from the index")
 
 
 def build_kb_index(
     kb_path: str | Path | None = None,
     persist_dir: str | Path | None = None,
     force_rebuild: bool = False
-) -> Chroma:
+) -> "Chroma":
     """
     Build or load the ChromaDB index for the SUPPORT_KB collection.
 
@@ -161,6 +685,8 @@ def build_kb_index(
     Returns:
         Chroma vectorstore instance
     """
+    from langchain_chroma import Chroma
+
     kb_path = Path(kb_path) if kb_path else get_kb_path()
     persist_dir = Path(persist_dir) if persist_dir else get_chroma_path()
 
@@ -170,34 +696,64 @@ def build_kb_index(
     embeddings = get_embeddings()
 
     # Check if index already exists
-    chroma_files = list(persist_dir.glob("*.sqlite3")) + list(persist_dir.glob("chroma.sqlite3"))
-    index_exists = len(chroma_files) > 0
+    index_exists = (persist_dir / CHROMA_DB_FILENAME).exists()
 
     if index_exists and not force_rebuild:
         print(f"Loading existing KB index from {persist_dir}")
-        return Chroma(
+        vectorstore = Chroma(
             persist_directory=str(persist_dir),
             embedding_function=embeddings,
             collection_name=KBCollection.SUPPORT_KB.value
         )
 
+        previous = _load_manifest(persist_dir)
+        manifest = build_kb_manifest(kb_path, previous)
+        if previous is None:
+            # Index predates manifests: take the current files as its baseline
+            _write_manifest(persist_dir, manifest)
+            return vectorstore
+
+        # Only files whose content changed are re-embedded
+        changed = [
+            name for name, entry in manifest.items()
+            if name not in previous or previous[name][2] != entry[2]
+        ]
+        removed = [name for name in previous if name not in manifest]
+        if changed or removed:
+            _reindex_files(vectorstore, persist_dir, kb_path, changed, removed)
+        if manifest != previous:
+            _write_manifest(persist_dir, manifest)
+
+        return vectorstore
+
     print(f"Building KB index from {kb_path}")
 
     # Load and process documents
     documents = load_markdown_files(kb_path)
     print(f"Loaded {len(documents)} markdown files")
 
-    chunks = split_by_headers(documents)
-    print(f"Created {len(chunks)} chunks")
+    parents = split_by_headers(documents)
+    print(f"Created {len(parents)} chunks")
 
-    # Create vectorstore for support_kb collection
-    vectorstore = Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
+    children = _prepare_children(parents)
+
+    # Create vectorstore for support_kb collection, sized for the number of
+    # vectors, then fill it in batches so only one batch of embeddings is
+    # held in memory at a time
+    collection_metadata = get_kb_collection_metadata(len(children))
+    vectorstore = Chroma(
         persist_directory=str(persist_dir),
+        embedding_function=embeddings,
         collection_name=KBCollection.SUPPORT_KB.value,
-        collection_metadata={"hnsw:space": "cosine"}
+        collection_metadata=collection_metadata
     )
+    _index_chunks(vectorstore, persist_dir, parents, children)
+    print(f"Indexed {len(children)} child chunks for retrieval")
+
+    hnsw_params = {key: value for key, value in collection_metadata.items() if key != "hnsw:space"}
+    (persist_dir / HNSW_PARAMS_FILENAME).write_bytes(orjson.dumps(hnsw_params))
+
+    _write_manifest(persist_dir, build_kb_manifest(kb_path))
 
     print(f"KB index built and persisted to {persist_dir}")
     return vectorstore
@@ -211,13 +767,17 @@ def add_approved_response(
     tags: list[str],
     approved_by: str,
     approved_at: str,
-    persist_dir: str | Path | None = None
+    persist_dir: str | Path | None = None,
+    on_added: Optional[Callable[[], None]] = None
 ) -> bool:
     """
     Add an approved response to the support_kb collection.
 
     This allows high-quality responses to be indexed and searchable
-    for future similar tickets.
+    for future similar tickets. The response is queued and embedded in a
+    batch with other approvals, so it becomes searchable shortly after
+    this returns (see get_approved_response_queue().flush()). A failed
+    write is retried in the background.
 
     Args:
         ticket_id: Original ticket ID
@@ -228,19 +788,13 @@ def add_approved_response(
         approved_by: Agent ID who approved
         approved_at: ISO timestamp of approval
         persist_dir: Path to ChromaDB persistence directory
+        on_added: Called once the response has been written to the KB,
+            and not while the write is failing
 
     Returns:
-        True if successfully added
+        True if successfully queued
     """
     persist_dir = Path(persist_dir) if persist_dir else get_chroma_path()
-    embeddings = get_embeddings()
-
-    # Load existing vectorstore
-    vectorstore = Chroma(
-        persist_directory=str(persist_dir),
-        embedding_function=embeddings,
-        collection_name=KBCollection.SUPPORT_KB.value
-    )
 
     # Format as Q&A document
     content = f"""## {question_summary}
@@ -254,23 +808,24 @@ def add_approved_response(
 """
 
     # Create document with metadata
-    doc = Document(
-        page_content=content,
-        metadata={
-            "source": "approved_responses",
-            "section": category.lower().replace(" ", "-"),
-            "ticket_id": ticket_id,
-            "tags": ",".join(tags),
-            "approved_by": approved_by,
-            "approved_at": approved_at,
-            "h2": question_summary,
-            "h3": "Answer"
-        }
-    )
-
-    # Add to vectorstore
-    vectorstore.add_documents([doc])
-    print(f"Added approved response from ticket {ticket_id} to KB")
+    metadata = {
+        "source": "approved_responses",
+        "section": category.lower().replace(" ", "-"),
+        "ticket_id": ticket_id,
+        "approved_by": approved_by,
+        "approved_at": approved_at,
+        "h2": question_summary,
+        "h3": "Answer"
+    }
+    # Stored as a list so searches can filter on it; Chroma rejects empty lists
+    if tags:
+        metadata["tags"] = list(tags)
+    # The ID is fixed here so retried writes replace rather than duplicate it
+    doc = Document(id=str(uuid.uuid4()), page_content=content, metadata=metadata)
+
+    # Queue for the next batched write to the vectorstore
+    get_approved_response_queue().put((persist_dir, doc), on_added)
+    print(f"Queued approved response from ticket {ticket_id} for KB")
 
     return True
 
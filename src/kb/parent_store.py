@@ -0,0 +1,84 @@
+"""
+Sidecar storage for parent chunks of the knowledge base.
+Small child chunks are embedded for retrieval; the larger section-level
+parents they were split from are kept here and returned as passages.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+
+# SQLite file stored next to the Chroma database
+PARENTS_FILENAME = "parents.sqlite3"
+
+# SQLite limits bound parameters per statement; lookups are chunked below this
+LOOKUP_CHUNK_SIZE = 500
+
+
+class ParentChunkStore:
+    """
+    Maps parent_id to the text of a parent chunk.
+    Parents are not embedded, so they are kept outside Chroma.
+    """
+
+    def __init__(self, persist_dir: str | Path):
+        """
+        Open (or create) the parent store for a KB index.
+
+        Args:
+            persist_dir: Chroma persistence directory of the SUPPORT_KB collection
+        """
+        self.path = Path(persist_dir) / PARENTS_FILENAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS parents ("
+                "parent_id TEXT PRIMARY KEY, source TEXT NOT NULL, content TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS parents_source ON parents (source)")
+
+    def add(self, parents: list[Document]) -> None:
+        """Store parent chunks, replacing any with the same parent_id."""
+        rows = [
+            (parent.metadata["parent_id"], parent.metadata["source"], parent.page_content)
+            for parent in parents
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO parents (parent_id, source, content) VALUES (?, ?, ?)", rows
+            )
+
+    def delete_sources(self, sources: list[str]) -> None:
+        """Remove every parent chunk that came from the given KB files."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM parents WHERE source = ?", [(source,) for source in sources]
+            )
+
+    def get_many(self, parent_ids: list[str]) -> dict[str, str]:
+        """
+        Fetch the text of several parent chunks.
+
+        Args:
+            parent_ids: IDs to look up
+
+        Returns:
+            Mapping of parent_id to content for the IDs that were found
+        """
+        found = {}
+        with self._lock:
+            for start in range(0, len(parent_ids), LOOKUP_CHUNK_SIZE):
+                chunk = parent_ids[start:start + LOOKUP_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT parent_id, content FROM parents WHERE parent_id IN ({placeholders})",
+                    chunk
+                )
+                found.update(rows)
+        return found
@@ -0,0 +1,211 @@
+"""
+Proactive rate limiting for OpenAI embedding requests.
+Throttles to the account's requests/tokens-per-minute limits up front so
+large index builds don't stall in 429 retry storms.
+"""
+
+import math
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from langchain_core.embeddings import Embeddings
+
+
+# Times a request is retried after a 429 that got past the client's own retries
+RATE_LIMIT_RETRIES = 3
+
+# Wait used when a 429 carries no usable Retry-After header
+DEFAULT_RETRY_AFTER_SECONDS = 1.0
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests and tokens per minute.
+
+    Both buckets refill continuously; a limit of 0 disables that bucket.
+    Thread-safe, since embeddings are requested from worker threads.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        """
+        Initialize the limiter with full buckets.
+
+        Args:
+            requests_per_minute: Request limit (0 for unlimited)
+            tokens_per_minute: Token limit (0 for unlimited)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is configured."""
+        return bool(self.requests_per_minute or self.tokens_per_minute)
+
+    def _refill(self, now: float) -> None:
+        """Top up both buckets for the time elapsed since the last refill."""
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(
+                float(self.requests_per_minute),
+                self._requests + elapsed * self.requests_per_minute / 60
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                float(self.tokens_per_minute),
+                self._tokens + elapsed * self.tokens_per_minute / 60
+            )
+
+    def acquire(self, requests: int = 1, tokens: int = 0) -> None:
+        """
+        Block until the given requests and tokens fit within the limits.
+
+        Amounts larger than a bucket's capacity are clamped to it, so an
+        oversized batch waits for a full bucket rather than forever.
+
+        Args:
+            requests: Number of API requests about to be made
+            tokens: Estimated tokens those requests will consume
+        """
+        if not self.enabled:
+            return
+
+        requests = min(requests, self.requests_per_minute) if self.requests_per_minute else 0
+        tokens = min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                wait = self._paused_until - now
+                if wait <= 0:
+                    request_deficit = requests - self._requests if self.requests_per_minute else 0
+                    token_deficit = tokens - self._tokens if self.tokens_per_minute else 0
+                    if request_deficit <= 0 and token_deficit <= 0:
+                        self._requests -= requests
+                        self._tokens -= tokens
+                        return
+                    wait = max(
+                        request_deficit * 60 / self.requests_per_minute if request_deficit > 0 else 0,
+                        token_deficit * 60 / self.tokens_per_minute if token_deficit > 0 else 0
+                    )
+
+                self._cond.wait(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for the given number of seconds (e.g. after a 429)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+
+def _retry_after_seconds(error: Exception) -> float:
+    """Read the server's requested wait from a 429 response, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    return DEFAULT_RETRY_AFTER_SECONDS
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Whether an exception is an HTTP 429 from the API."""
+    return getattr(error, "status_code", None) == 429
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """
+    Wraps an embeddings model so every call first acquires from a RateLimiter.
+
+    Tokens are estimated at four characters per token. A 429 that still gets
+    through pauses the limiter for exactly the server's Retry-After.
+    """
+
+    def __init__(self, embeddings: Embeddings, limiter: RateLimiter):
+        """
+        Initialize the wrapper.
+
+        Args:
+            embeddings: The embeddings model to throttle
+            limiter: Limiter shared by every caller of the same API key
+        """
+        self.embeddings = embeddings
+        self.limiter = limiter
+        # OpenAIEmbeddings splits large inputs into requests of chunk_size texts
+        self.texts_per_request = getattr(embeddings, "chunk_size", None) or 0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts once the rate limits allow it."""
+        if not texts:
+            return []
+
+        requests = math.ceil(len(texts) / self.texts_per_request) if self.texts_per_request else 1
+        tokens = sum(len(text) // 4 for text in texts)
+
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self.limiter.acquire(requests=requests, tokens=tokens)
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as e:
+                if not _is_rate_limit_error(e) or attempt == RATE_LIMIT_RETRIES:
+                    raise
+                wait = _retry_after_seconds(e)
+                print(f"Embedding rate limited, retrying in {wait:.1f}s")
+                self.limiter.pause(wait)
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a single query once the rate limits allow it."""
+        return self.embed_documents([text])[0]
+
+
+# Singleton instance
+_rate_limiter: RateLimiter | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get or create the singleton limiter, configured from OPENAI_RPM and OPENAI_TPM.
+
+    Returns:
+        RateLimiter instance (unlimited when neither variable is set)
+    """
+    global _rate_limiter
+
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(
+            requests_per_minute=int(os.getenv("OPENAI_RPM", "0")),
+            tokens_per_minute=int(os.getenv("OPENAI_TPM", "0"))
+        )
+
+    return _rate_limiter
+
+
+def reset_rate_limiter() -> None:
+    """Reset the singleton limiter instance."""
+    global _rate_limiter
+    _rate_limiter = None
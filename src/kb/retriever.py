@@ -3,13 +3,50 @@ LangChain retriever wrapper for knowledge base search with citation formatting.
 Supports multiple collections: support_kb, previous_queries, status_updates.
 """
 
+from collections import OrderedDict
 from pathlib import Path
+import hashlib
+import os
+import threading
 
 from langchain_chroma import Chroma
 
 from ..schemas import KBHit
-from .indexer import get_chroma_path, get_embeddings, build_kb_index
+from .indexer import (
+    get_chroma_path, get_embeddings, build_kb_index, load_hnsw_params, CHROMA_DB_FILENAME
+)
 from .collections import KBCollection, get_collection_path
+from .parent_store import ParentChunkStore
+
+
+# Maximum number of search_with_context results kept per retriever
+SEARCH_CACHE_SIZE = 1024
+
+# Child chunks fetched per requested hit, since several children of the
+# same parent collapse into one hit
+PARENT_OVERSAMPLE = 3
+
+# Terms appended to contextual queries to steer them toward a category's docs
+CATEGORY_QUERY_TERMS = {
+    "billing": "billing payment invoice charge refund",
+    "bug": "bug error crash issue fix",
+    "outage": "outage down unavailable incident",
+    "security": "security vulnerability breach access",
+    "onboarding": "setup getting started configuration",
+    "feature_request": "feature request enhancement",
+}
+
+# Ticket body characters included in contextual queries
+QUERY_BODY_CHARS = 500
+
+# HNSW search beam width kept per candidate fetched; larger fetches (high k)
+# need a wider beam to keep recall up
+SEARCH_EF_PER_RESULT = 2
+
+# Largest k the collection's ef_search is sized for. Chroma has no per-query
+# ef, so the beam is set once at setup; hnswlib never searches with fewer
+# candidates than it returns, so larger k still get k results
+MAX_SEARCH_K = 20
 
 
 class KBRetriever:
@@ -41,6 +78,9 @@ class KBRetriever:
         # Ensure index exists
         self._ensure_index()
 
+        # Parent chunks returned in place of the matched child chunks
+        self.parents = ParentChunkStore(self.persist_dir)
+
         # Load vectorstore for support_kb collection
         self.vectorstore = Chroma(
             persist_directory=str(self.persist_dir),
@@ -48,59 +88,221 @@ class KBRetriever:
             collection_name=KBCollection.SUPPORT_KB.value
         )
 
-        # Create retriever
-        self.retriever = self.vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": self.k}
-        )
+        # Graph parameters are fixed at build time, but the search beam width
+        # can be retuned on an existing index: an explicit KB_HNSW_EFS wins,
+        # otherwise match what the index was built for, widened to cover
+        # searches of up to MAX_SEARCH_K results
+        if os.getenv("KB_HNSW_EFS"):
+            search_ef = int(os.getenv("KB_HNSW_EFS"))
+        else:
+            search_ef = max(
+                load_hnsw_params(self.persist_dir).get("hnsw:search_ef") or 0,
+                SEARCH_EF_PER_RESULT * MAX_SEARCH_K * PARENT_OVERSAMPLE
+            )
+        if search_ef and search_ef != self._current_search_ef():
+            self.set_search_ef(search_ef)
+
+        # LRU of search_with_context results keyed by a hash of its arguments
+        self._search_cache: OrderedDict[str, list[KBHit]] = OrderedDict()
+        self._search_cache_lock = threading.Lock()
+
+    def _current_search_ef(self) -> int | None:
+        """Get the collection's configured ef_search, if the backend exposes it."""
+        try:
+            return self.vectorstore._collection.configuration["hnsw"]["ef_search"]
+        except Exception:
+            return None
+
+    def set_search_ef(self, ef_search: int) -> bool:
+        """
+        Set the HNSW search beam width (ef_search) of the KB collection.
+
+        Args:
+            ef_search: Candidates explored per query; higher trades latency for recall
+
+        Returns:
+            True if the collection accepted the change
+        """
+        try:
+            self.vectorstore._collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+            return True
+        except Exception as e:
+            print(f"Warning: Could not set ef_search on KB collection: {e}")
+            return False
 
     def _ensure_index(self):
         """Ensure the KB index exists, building it if necessary."""
-        chroma_files = list(self.persist_dir.glob("*.sqlite3"))
-        if not chroma_files:
+        if not (self.persist_dir / CHROMA_DB_FILENAME).exists():
             print("KB index not found, building...")
             build_kb_index()
     
-    def search(self, query: str, k: int | None = None) -> list[KBHit]:
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed several queries with a single embeddings request.
+
+        Args:
+            texts: Query texts to embed
+
+        Returns:
+            One embedding vector per input text, in order
+        """
+        if not texts:
+            return []
+        return self.embeddings.embed_documents(texts)
+
+    def search(
+        self,
+        query: str,
+        k: int | None = None,
+        tags: list[str] | None = None
+    ) -> list[KBHit]:
         """
         Search the knowledge base for relevant passages.
         
         Args:
             query: Search query text
             k: Number of results (overrides default)
+            tags: Only match chunks carrying at least one of these tags
+                (e.g. approved responses)
         
         Returns:
             List of KBHit objects with citations
         """
-        if k and k != self.k:
-            # Use custom k for this search
-            docs = self.vectorstore.similarity_search_with_relevance_scores(
-                query, k=k
-            )
-        else:
-            # Use retriever with default k
-            docs_without_scores = self.retriever.invoke(query)
-            # Get scores separately
-            docs = self.vectorstore.similarity_search_with_relevance_scores(
-                query, k=self.k
+        fetch_k = (k or self.k) * PARENT_OVERSAMPLE
+        where = self._tags_filter(tags)
+
+        query_embedding = self.embeddings.embed_query(query)
+
+        return self._to_hits(self._query([query_embedding], fetch_k, where)[0], k or self.k)
+
+    def _query(
+        self,
+        query_embeddings: list[list[float]],
+        n_results: int,
+        where: dict | None = None
+    ) -> list[list[tuple[str, dict, float]]]:
+        """
+        Query the collection directly, skipping LangChain's Document wrapping.
+
+        Returns:
+            (content, metadata, relevance score) per matched chunk, best
+            first, one list per query embedding
+        """
+        results = self.vectorstore._collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where,
+            include=["documents", "metadatas", "distances"]
+        )
+
+        relevance_fn = self.vectorstore._select_relevance_score_fn()
+        return [
+            [
+                (content, metadata, relevance_fn(distance))
+                for content, metadata, distance in zip(contents, metadatas, distances)
+            ]
+            for contents, metadatas, distances in zip(
+                results["documents"], results["metadatas"], results["distances"]
             )
-        
-        results = []
-        for doc, score in docs:
-            # Extract metadata
-            source = doc.metadata.get("source", "unknown")
-            section = doc.metadata.get("section", "general")
-            
-            # Create KBHit
-            hit = KBHit(
-                doc_name=source,
-                section=section,
-                passage=doc.page_content[:500],  # Truncate long passages
+        ]
+
+    @staticmethod
+    def _tags_filter(tags: list[str] | None) -> dict | None:
+        """Build a Chroma where-filter matching chunks with any of the given tags."""
+        if not tags:
+            return None
+        # $in doesn't match list-valued metadata, so each tag is a $contains
+        clauses = [{"tags": {"$contains": tag}} for tag in tags]
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    def search_batch(
+        self,
+        ticket_subjects: list[str],
+        ticket_bodies: list[str],
+        categories: list[str | None] | None = None,
+        k: int | None = None
+    ) -> list[list[KBHit]]:
+        """
+        Run search_with_context for several tickets at once.
+
+        Results are identical to calling search_with_context per ticket and
+        share its cache; the uncached queries are embedded in one request
+        and searched with one multi-vector Chroma query.
+
+        Args:
+            ticket_subjects: Ticket subject lines
+            ticket_bodies: Ticket body texts, aligned with ticket_subjects
+            categories: Optional categories to weight results, aligned with the tickets
+            k: Number of results per ticket
+
+        Returns:
+            One list of KBHit objects per ticket, in order
+        """
+        if categories is None:
+            categories = [None] * len(ticket_subjects)
+
+        keys = [
+            self._search_cache_key(subject, body, category, k)
+            for subject, body, category in zip(ticket_subjects, ticket_bodies, categories)
+        ]
+        hits_by_key = {key: hits for key in keys if (hits := self._cache_get(key)) is not None}
+
+        # Identical tickets in the batch are searched once
+        misses = {}
+        for key, subject, body, category in zip(keys, ticket_subjects, ticket_bodies, categories):
+            if key not in hits_by_key and key not in misses:
+                misses[key] = self.build_context_query(subject, body, category)
+
+        if misses:
+            fetch_k = (k or self.k) * PARENT_OVERSAMPLE
+            query_embeddings = self.embed_batch(list(misses.values()))
+            for key, results in zip(misses, self._query(query_embeddings, fetch_k)):
+                hits_by_key[key] = self._to_hits(results, k or self.k)
+                self._cache_put(key, hits_by_key[key])
+
+        return [list(hits_by_key[key]) for key in keys]
+
+    def _to_hits(self, results: list[tuple[str, dict, float]], k: int) -> list[KBHit]:
+        """
+        Turn matched child chunks into at most k hits on their parent chunks.
+
+        Args:
+            results: (content, metadata, relevance score) per matched chunk,
+                best first
+            k: Maximum number of hits
+
+        Returns:
+            KBHit objects whose passage is the parent chunk's text; chunks
+            without a parent (e.g. approved responses) are used as-is
+        """
+        parent_ids = list({
+            metadata["parent_id"] for _, metadata, _ in results if metadata.get("parent_id")
+        })
+        parents = self.parents.get_many(parent_ids) if parent_ids else {}
+
+        # Children of one parent collapse into its best-scoring hit
+        selected = []
+        seen = set()
+        for content, metadata, score in results:
+            parent_id = metadata.get("parent_id")
+            if parent_id:
+                if parent_id in seen:
+                    continue
+                seen.add(parent_id)
+                content = parents.get(parent_id, content)
+            selected.append((content, metadata, score))
+            if len(selected) == k:
+                break
+
+        return [
+            KBHit(
+                doc_name=metadata.get("source", "unknown"),
+                section=metadata.get("section", "general"),
+                passage=content[:500],  # Truncate long passages
                 relevance_score=float(score)
             )
-            results.append(hit)
-        
-        return results
+            for content, metadata, score in selected
+        ]
     
     def search_with_context(
         self,
@@ -121,28 +323,73 @@ class KBRetriever:
         Returns:
             List of KBHit objects
         """
-        # Build contextual query
-        query_parts = [ticket_subject]
-        
-        # Add key phrases from body (first 500 chars)
-        body_snippet = ticket_body[:500]
-        query_parts.append(body_snippet)
-        
-        # Add category context if available
-        if category:
-            category_context = {
-                "billing": "billing payment invoice charge refund",
-                "bug": "bug error crash issue fix",
-                "outage": "outage down unavailable incident",
-                "security": "security vulnerability breach access",
-                "onboarding": "setup getting started configuration",
-                "feature_request": "feature request enhancement",
-            }
-            if category in category_context:
-                query_parts.append(category_context[category])
-        
-        query = " ".join(query_parts)
-        return self.search(query, k=k)
+        cache_key = self._search_cache_key(ticket_subject, ticket_body, category, k)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return list(cached)
+
+        query = self.build_context_query(ticket_subject, ticket_body, category)
+        hits = self.search(query, k=k)
+        self._cache_put(cache_key, hits)
+        return list(hits)
+
+    def _search_cache_key(
+        self,
+        ticket_subject: str,
+        ticket_body: str,
+        category: str | None,
+        k: int | None
+    ) -> str:
+        """Key search_with_context results by a hash of its arguments."""
+        return hashlib.blake2b(
+            "\0".join([ticket_subject, ticket_body, category or "", str(k or self.k)]).encode("utf-8"),
+            digest_size=16
+        ).hexdigest()
+
+    def _cache_get(self, key: str) -> list[KBHit] | None:
+        """Return cached search results (or None), marking them recently used."""
+        with self._search_cache_lock:
+            cached = self._search_cache.get(key)
+            if cached is not None:
+                self._search_cache.move_to_end(key)
+            return cached
+
+    def _cache_put(self, key: str, hits: list[KBHit]) -> None:
+        """Store search results, evicting the least recently used past SEARCH_CACHE_SIZE."""
+        with self._search_cache_lock:
+            self._search_cache[key] = hits
+            self._search_cache.move_to_end(key)
+            if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+
+    def clear_cache(self):
+        """Drop cached search results; call after the KB collection changes."""
+        with self._search_cache_lock:
+            self._search_cache.clear()
+
+    def build_context_query(
+        self,
+        ticket_subject: str,
+        ticket_body: str,
+        category: str | None = None
+    ) -> str:
+        """
+        Build the contextual query text used by search_with_context.
+
+        Args:
+            ticket_subject: Ticket subject line
+            ticket_body: Ticket body text
+            category: Optional category to weight results
+
+        Returns:
+            Query text combining subject, body snippet and category terms
+        """
+        # Subject, key phrases from the start of the body, and category terms
+        query = f"{ticket_subject} {ticket_body[:QUERY_BODY_CHARS]}"
+        category_terms = CATEGORY_QUERY_TERMS.get(category) if category else None
+        if category_terms:
+            query = f"{query} {category_terms}"
+        return query
     
     def get_citation(self, hit: KBHit) -> str:
         """
@@ -169,11 +416,7 @@ class KBRetriever:
         if not hits:
             return ""
         
-        citations = []
-        for hit in hits:
-            citations.append(f"{hit.citation}: \"{hit.passage[:100]}...\"")
-        
-        return "\n".join(citations)
+        return "\n".join(f"{hit.citation}: \"{hit.passage[:100]}...\"" for hit in hits)
 
 
 # Singleton instance for reuse
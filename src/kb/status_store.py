@@ -6,13 +6,27 @@ Stores and retrieves time-sensitive status information.
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
-import json
+import atexit
 
-from langchain_chroma import Chroma
+import orjson
 from pydantic import BaseModel, Field
 
 from .indexer import get_embeddings
 from .collections import KBCollection, get_collection_path, get_similarity_threshold
+from .write_queue import BatchWriteQueue
+
+
+# New statuses embedded and stored per batch, and the longest one waits
+STATUS_BATCH_SIZE = 64
+STATUS_FLUSH_SECONDS = 0.5
+
+# Update messages at or below this length ("Fixed", "Monitoring") are added to
+# the stored search text without re-embedding the status
+STATUS_REEMBED_MIN_CHARS = 20
+
+# Sort order of severities in the active status list; unknown ones sort last
+SEVERITY_RANKS = {"critical": 0, "high": 1, "medium": 2, "low": 3, "info": 4}
+UNKNOWN_SEVERITY_RANK = len(SEVERITY_RANKS)
 
 
 class StatusUpdate(BaseModel):
@@ -29,6 +43,46 @@ class StatusUpdate(BaseModel):
     updates: list[dict] = Field(default_factory=list, description="List of update entries")
 
 
+def _build_search_text(
+    title: str,
+    description: str,
+    affected_services: list[str],
+    updates: list[dict]
+) -> str:
+    """Combine a status's searchable fields and update messages into one text."""
+    search_text = f"{title} {description} {' '.join(affected_services)}"
+    for update in updates:
+        if update.get("message"):
+            search_text += f" {update['message']}"
+    return search_text
+
+
+def _services_from_metadata(metadata: dict) -> list[str]:
+    """Read affected_services from status metadata (a JSON string before native lists)."""
+    services = metadata.get("affected_services")
+    if isinstance(services, str):
+        return orjson.loads(services)
+    return list(services or [])
+
+
+def _parse_updates(metadatas: list[dict]) -> list[list[dict]]:
+    """Parse the JSON update lists of several statuses with a single orjson call."""
+    return orjson.loads(f"[{','.join(metadata.get('updates') or '[]' for metadata in metadatas)}]")
+
+
+def _severity_rank(metadata: dict) -> int:
+    """Read the severity sort rank stored with a status (computed for older statuses)."""
+    rank = metadata.get("severity_rank")
+    if rank is None:
+        rank = SEVERITY_RANKS.get(metadata.get("severity"), UNKNOWN_SEVERITY_RANK)
+    return rank
+
+
+def _is_active(metadata: dict) -> bool:
+    """Read is_active from status metadata (a "True"/"False" string before native bools)."""
+    return metadata.get("is_active") in (True, "True")
+
+
 class StatusUpdateStore:
     """
     Stores system status updates and enables similarity search.
@@ -56,26 +110,61 @@ class StatusUpdateStore:
         self.embeddings = get_embeddings()
 
         # Load vectorstore
+        from langchain_chroma import Chroma
+
         self.vectorstore = Chroma(
             persist_directory=str(self.persist_dir),
             embedding_function=self.embeddings,
             collection_name=KBCollection.STATUS_UPDATES.value
         )
+        self._migrate_metadata()
+
+        # New statuses are stored in the background; reads flush them first
+        self._writes = BatchWriteQueue(
+            self._write_statuses,
+            batch_size=STATUS_BATCH_SIZE,
+            flush_seconds=STATUS_FLUSH_SECONDS,
+            name="status update"
+        )
+        atexit.register(self.close)
+
+    def _migrate_metadata(self) -> None:
+        """
+        Convert statuses stored with string-encoded metadata to native fields,
+        so where-filters on is_active match them.
+        """
+        collection = self.vectorstore._collection
+        legacy = collection.get(where={"is_active": {"$in": ["True", "False"]}}, include=["metadatas"])
+        if not legacy["ids"]:
+            return
+
+        collection.update(
+            ids=legacy["ids"],
+            metadatas=[
+                {
+                    "is_active": _is_active(metadata),
+                    # None removes the key; Chroma rejects empty lists
+                    "affected_services": _services_from_metadata(metadata) or None,
+                }
+                for metadata in legacy["metadatas"]
+            ]
+        )
+        print(f"[StatusStore] Migrated {len(legacy['ids'])} statuses to native metadata")
 
     def add_status(self, status: StatusUpdate) -> None:
         """
         Add a status update to the store.
 
+        The status is queued and stored in a batch; the store's own reads
+        wait for queued statuses, so they always see it.
+
         Args:
             status: The status update to add
         """
-        # Create searchable text combining all relevant fields
-        search_text = f"{status.title} {status.description} {' '.join(status.affected_services)}"
-
-        # Add update history to search text
-        for update in status.updates:
-            if update.get("message"):
-                search_text += f" {update['message']}"
+        # Create searchable text combining all relevant fields and update history
+        search_text = _build_search_text(
+            status.title, status.description, status.affected_services, status.updates
+        )
 
         # Store metadata for retrieval
         metadata = {
@@ -83,28 +172,59 @@ class StatusUpdateStore:
             "title": status.title,
             "status_type": status.status_type,
             "severity": status.severity,
-            "affected_services": json.dumps(status.affected_services),
+            # Ranked once here so listing active statuses sorts on an int
+            "severity_rank": SEVERITY_RANKS.get(status.severity, UNKNOWN_SEVERITY_RANK),
             "description": status.description,
             "started_at": status.started_at.isoformat(),
             "resolved_at": status.resolved_at.isoformat() if status.resolved_at else "",
-            "is_active": str(status.is_active),
-            "updates": json.dumps(status.updates),
+            "is_active": status.is_active,
+            # Nested dicts can't be stored natively, so updates stay JSON
+            "updates": orjson.dumps(status.updates).decode(),
             "created_at": datetime.now().isoformat(),
         }
-
-        # Add to vectorstore (upsert by using status_id)
-        self.vectorstore.add_texts(
-            texts=[search_text],
-            metadatas=[metadata],
-            ids=[status.status_id]
+        # Chroma rejects empty lists
+        if status.affected_services:
+            metadata["affected_services"] = list(status.affected_services)
+
+        # Queue for the vectorstore (upserted by status_id)
+        self._writes.put((status.status_id, search_text, metadata))
+
+    def _write_statuses(self, items: list[tuple[str, str, dict]]) -> None:
+        """Embed and upsert a batch of queued statuses (background thread)."""
+        # A status queued twice in one batch keeps its latest version
+        latest = {status_id: (search_text, metadata) for status_id, search_text, metadata in items}
+        texts = [search_text for search_text, _ in latest.values()]
+        self.vectorstore._collection.upsert(
+            ids=list(latest),
+            embeddings=self.embeddings.embed_documents(texts),
+            metadatas=[metadata for _, metadata in latest.values()],
+            documents=texts
         )
 
+    def flush(self) -> None:
+        """Block until every queued status has been stored."""
+        self._writes.flush()
+
+    def _wait_for_writes(self) -> None:
+        """
+        Let queued statuses land before a read.
+
+        A status that can't be written stays queued and is retried, so reads
+        go ahead without it rather than failing until the process restarts.
+        """
+        self._writes.flush(raise_on_failure=False)
+
+    def close(self) -> None:
+        """Store any queued statuses and stop the background writer."""
+        self._writes.close()
+
     def update_status(
         self,
         status_id: str,
         message: str,
         new_status_type: Optional[str] = None,
-        resolved: bool = False
+        resolved: bool = False,
+        reembed: Optional[bool] = None
     ) -> bool:
         """
         Add an update to an existing status.
@@ -114,47 +234,60 @@ class StatusUpdateStore:
             message: Update message
             new_status_type: Optional new status type
             resolved: Whether this update resolves the issue
+            reembed: Whether to re-embed the status with the new message;
+                by default only messages longer than STATUS_REEMBED_MIN_CHARS are
 
         Returns:
             True if update was successful
         """
-        # Fetch existing status
-        results = self.vectorstore.get(ids=[status_id], include=["metadatas"])
+        # Fetch existing status; the stored document is its current search text
+        self._wait_for_writes()
+        results = self.vectorstore._collection.get(
+            ids=[status_id], include=["metadatas", "documents", "embeddings"]
+        )
 
         if not results or not results.get("metadatas"):
             return False
 
         metadata = results["metadatas"][0]
+        # One timestamp, so a resolving update and resolved_at agree
+        now = datetime.now().isoformat()
 
         # Parse existing updates
-        updates = json.loads(metadata.get("updates", "[]"))
+        updates = orjson.loads(metadata.get("updates", "[]"))
         updates.append({
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now,
             "message": message,
             "status_type": new_status_type
         })
 
         # Update metadata
-        metadata["updates"] = json.dumps(updates)
+        metadata["updates"] = orjson.dumps(updates).decode()
         if new_status_type:
             metadata["status_type"] = new_status_type
         if resolved:
-            metadata["is_active"] = "False"
-            metadata["resolved_at"] = datetime.now().isoformat()
-
-        # Rebuild search text
-        affected_services = json.loads(metadata.get("affected_services", "[]"))
-        search_text = f"{metadata['title']} {metadata['description']} {' '.join(affected_services)}"
-        for update in updates:
-            if update.get("message"):
-                search_text += f" {update['message']}"
-
-        # Delete and re-add (ChromaDB upsert pattern)
-        self.vectorstore.delete(ids=[status_id])
-        self.vectorstore.add_texts(
-            texts=[search_text],
+            metadata["is_active"] = False
+            metadata["resolved_at"] = now
+
+        if not message:
+            self.vectorstore._collection.update(ids=[status_id], metadatas=[metadata])
+            return True
+
+        # Append to the stored search text rather than rebuilding it from every update
+        search_text = results["documents"][0] or _build_search_text(
+            metadata["title"], metadata["description"], _services_from_metadata(metadata), updates[:-1]
+        )
+        search_text += f" {message}"
+
+        if reembed is None:
+            reembed = len(message.strip()) > STATUS_REEMBED_MIN_CHARS
+        # Chroma embeds documents given without embeddings itself, so a skipped
+        # re-embed passes the existing vector back
+        self.vectorstore._collection.update(
+            ids=[status_id],
             metadatas=[metadata],
-            ids=[status_id]
+            documents=[search_text],
+            embeddings=self.embeddings.embed_documents([search_text]) if reembed else [results["embeddings"][0]]
         )
 
         return True
@@ -176,76 +309,82 @@ class StatusUpdateStore:
         Returns:
             List of relevant status updates with scores
         """
-        results = self.vectorstore.similarity_search_with_relevance_scores(query, k=k * 2)
+        self._wait_for_writes()
+
+        # The shared embeddings cache queries in memory, so repeats of the same
+        # ticket text don't reach the API; only metadata is fetched back, and
+        # inactive statuses are filtered by Chroma rather than over-fetched
+        query_embedding = self.embeddings.embed_query(query)
+        results = self.vectorstore._collection.query(
+            query_embeddings=[query_embedding],
+            n_results=k,
+            where={"is_active": True} if active_only else None,
+            include=["metadatas", "distances"]
+        )
+        relevance_fn = self.vectorstore._select_relevance_score_fn()
+        matches = [
+            (metadata, score)
+            for metadata, score in zip(
+                results["metadatas"][0], map(relevance_fn, results["distances"][0])
+            )
+            if score >= self.similarity_threshold
+        ]
 
         relevant = []
-        for doc, score in results:
-            if score < self.similarity_threshold:
-                continue
-
-            metadata = doc.metadata
-
-            # Filter to active only if requested
-            if active_only and metadata.get("is_active") != "True":
-                continue
-
+        for (metadata, score), updates in zip(matches, _parse_updates([m for m, _ in matches])):
             relevant.append({
                 "status_id": metadata.get("status_id"),
                 "title": metadata.get("title"),
                 "status_type": metadata.get("status_type"),
                 "severity": metadata.get("severity"),
-                "affected_services": json.loads(metadata.get("affected_services", "[]")),
+                "affected_services": _services_from_metadata(metadata),
                 "description": metadata.get("description"),
                 "started_at": metadata.get("started_at"),
                 "resolved_at": metadata.get("resolved_at") or None,
-                "is_active": metadata.get("is_active") == "True",
-                "updates": json.loads(metadata.get("updates", "[]")),
+                "is_active": _is_active(metadata),
+                "updates": updates,
                 "relevance_score": score
             })
 
-            if len(relevant) >= k:
-                break
-
         return relevant
 
     def get_active_statuses(self) -> list[dict]:
         """Get all active (unresolved) status updates."""
-        # Get all documents
+        # Let Chroma filter to active statuses rather than loading them all
+        self._wait_for_writes()
         collection = self.vectorstore._collection
-        all_results = collection.get(include=["metadatas"])
+        active_results = collection.get(where={"is_active": True}, include=["metadatas"])
+
+        # Most severe first, then oldest; Chroma has no ordering, so sort here
+        metadatas = sorted(
+            active_results.get("metadatas", []),
+            key=lambda metadata: (_severity_rank(metadata), metadata.get("started_at"))
+        )
 
         active = []
-        for metadata in all_results.get("metadatas", []):
-            if metadata.get("is_active") == "True":
-                active.append({
-                    "status_id": metadata.get("status_id"),
-                    "title": metadata.get("title"),
-                    "status_type": metadata.get("status_type"),
-                    "severity": metadata.get("severity"),
-                    "affected_services": json.loads(metadata.get("affected_services", "[]")),
-                    "description": metadata.get("description"),
-                    "started_at": metadata.get("started_at"),
-                    "is_active": True,
-                    "updates": json.loads(metadata.get("updates", "[]")),
-                })
-
-        # Sort by severity and start time
-        severity_order = {"critical": 0, "high": 1, "medium": 2, "low": 3, "info": 4}
-        active.sort(key=lambda x: (severity_order.get(x["severity"], 5), x["started_at"]))
+        for metadata, updates in zip(metadatas, _parse_updates(metadatas)):
+            active.append({
+                "status_id": metadata.get("status_id"),
+                "title": metadata.get("title"),
+                "status_type": metadata.get("status_type"),
+                "severity": metadata.get("severity"),
+                "affected_services": _services_from_metadata(metadata),
+                "description": metadata.get("description"),
+                "started_at": metadata.get("started_at"),
+                "is_active": True,
+                "updates": updates,
+            })
 
         return active
 
     def get_stats(self) -> dict:
         """Get statistics about the status update store."""
+        self._wait_for_writes()
         collection = self.vectorstore._collection
         count = collection.count()
 
-        # Count active vs resolved
-        all_results = collection.get(include=["metadatas"])
-        active_count = sum(
-            1 for m in all_results.get("metadatas", [])
-            if m.get("is_active") == "True"
-        )
+        # Count active vs resolved; only the matching IDs are fetched
+        active_count = len(collection.get(where={"is_active": True}, include=[])["ids"])
 
         return {
             "total_statuses": count,
@@ -275,6 +414,8 @@ def get_status_store() -> StatusUpdateStore:
 
 
 def reset_status_store():
-    """Reset the singleton status store instance."""
+    """Reset the singleton status store instance, storing any queued statuses."""
     global _status_store
+    if _status_store is not None:
+        _status_store.close()
     _status_store = None
@@ -6,13 +6,58 @@ This is part of the KB collections system - specifically the PREVIOUS_QUERIES co
 
 from datetime import datetime
 from pathlib import Path
-import json
+import atexit
+import hashlib
+import threading
+from collections import OrderedDict
 
-from langchain_chroma import Chroma
+import numpy as np
+import orjson
 
 from ..schemas import SupportTicket, PipelineResult, ReplyDraft
 from .indexer import get_embeddings, get_chroma_path
 from .collections import KBCollection, get_collection_path, get_similarity_threshold
+from .write_queue import BatchWriteQueue
+
+
+def _text_digest(text: str) -> bytes:
+    """Hash ticket text after normalizing case and whitespace."""
+    normalized = " ".join(text.lower().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+
+def _quantize(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize embeddings to int8 with one symmetric scale per row.
+
+    Args:
+        vectors: float32 embeddings, one per row
+
+    Returns:
+        Tuple of (int8 codes, float32 per-row scales)
+    """
+    scales = np.abs(vectors).max(axis=1, initial=0.0) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+# Candidates rescored at full dimension, per result requested
+RERANK_FACTOR = 4
+
+# Reduced dimensionality for the approximate scan, and the number of stored
+# tickets needed before a projection is fitted
+PCA_COMPONENTS = 128
+PCA_MIN_VECTORS = 100
+PCA_FILENAME = "pca_projection.npy"
+
+# Processed tickets embedded and stored per batch, and the longest one waits
+HISTORY_BATCH_SIZE = 64
+HISTORY_FLUSH_SECONDS = 0.5
+
+# Lookup embeddings kept until the ticket is stored, so add_ticket reuses the
+# vector find_similar_ticket computed instead of embedding the same text again
+PENDING_VECTORS_SIZE = 1024
 
 
 class TicketHistoryStore:
@@ -44,12 +89,162 @@ class TicketHistoryStore:
         self.embeddings = get_embeddings()
 
         # Load vectorstore with collection name from enum
+        from langchain_chroma import Chroma
+
         self.vectorstore = Chroma(
             persist_directory=str(self.persist_dir),
             embedding_function=self.embeddings,
             collection_name=KBCollection.PREVIOUS_QUERIES.value
         )
 
+        # Guards writes when tickets are processed concurrently
+        self._lock = threading.Lock()
+
+        # search_text -> embedding from lookups, consumed when the ticket is stored
+        self._pending_vectors: OrderedDict[str, list[float]] = OrderedDict()
+
+        # In-memory mirror of the collection so lookups skip the Chroma query
+        self._relevance_fn = self.vectorstore._select_relevance_score_fn()
+        hnsw_config = self.vectorstore._collection.configuration.get("hnsw") or {}
+        self._space = hnsw_config.get("space") or "l2"
+        self._load_mirror()
+
+        # Tickets are stored in the background, so processing doesn't wait on embedding
+        self._writes = BatchWriteQueue(
+            self._write_tickets,
+            batch_size=HISTORY_BATCH_SIZE,
+            flush_seconds=HISTORY_FLUSH_SECONDS,
+            name="ticket history"
+        )
+        atexit.register(self.close)
+
+    def _load_mirror(self) -> None:
+        """Load all stored ticket embeddings and metadata into memory."""
+        data = self.vectorstore._collection.get(include=["embeddings", "metadatas", "documents"])
+        self._ids: list[str] = list(data["ids"])
+        self._metadatas: list[dict] = list(data["metadatas"])
+        if self._ids:
+            vectors = np.asarray(data["embeddings"], dtype=np.float32)
+        else:
+            vectors = np.empty((0, 0), dtype=np.float32)
+
+        # Reduced int8 codes for the scan, full-dimension float16 vectors for
+        # reranking its candidates without a Chroma round trip
+        self._projection = self._load_projection(vectors)
+        self._codes, self._scales = _quantize(self._project(vectors) if self._ids else vectors)
+        self._vectors = vectors.astype(np.float16)
+        self._sq_norms = np.einsum("ij,ij->i", vectors, vectors)
+
+        # Exact-text index so identical tickets match without an embedding call
+        self._index_by_id: dict[str, int] = {ticket_id: i for i, ticket_id in enumerate(self._ids)}
+        self._digests: list[bytes] = [_text_digest(doc or "") for doc in data["documents"]]
+        self._hash_index: dict[bytes, str] = dict(zip(self._digests, self._ids))
+
+    def _load_projection(self, vectors: np.ndarray) -> np.ndarray | None:
+        """
+        Load the persisted PCA projection, fitting one if enough tickets exist.
+
+        The projection is an uncentered truncated SVD, so dot products in the
+        reduced space approximate the original ones directly.
+
+        Args:
+            vectors: All stored embeddings, one per row
+
+        Returns:
+            Projection matrix (dim x components), or None to scan at full dimension
+        """
+        path = self.persist_dir / PCA_FILENAME
+        if path.exists():
+            projection = np.load(path)
+            if not len(vectors) or projection.shape[0] == vectors.shape[1]:
+                return projection
+            print(f"[TicketHistory] Ignoring {PCA_FILENAME}: embedding dimension changed")
+
+        if len(vectors) < PCA_MIN_VECTORS:
+            return None
+
+        _, _, vt = np.linalg.svd(vectors, full_matrices=False)
+        projection = np.ascontiguousarray(vt[:PCA_COMPONENTS].T, dtype=np.float32)
+        np.save(path, projection)
+        return projection
+
+    def _project(self, vectors: np.ndarray) -> np.ndarray:
+        """Map embeddings into the reduced space used by the approximate scan."""
+        if self._projection is None:
+            return vectors
+        return vectors @ self._projection
+
+    def _add_to_mirror(
+        self,
+        ticket_id: str,
+        embedding: list[float],
+        metadata: dict,
+        search_text: str
+    ) -> None:
+        """
+        Upsert a ticket into the in-memory mirror. Caller must hold the lock.
+
+        Arrays and lists read outside the lock are replaced rather than
+        mutated so that concurrent readers holding a snapshot are unaffected.
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        code, scale = _quantize(self._project(vector[None, :]))
+        half = vector.astype(np.float16)
+        sq_norm = np.float32(vector @ vector)
+        digest = _text_digest(search_text)
+        ids = list(self._ids)
+        metadatas = list(self._metadatas)
+
+        index = self._index_by_id.get(ticket_id)
+        if index is not None:
+            codes, scales, sq_norms = self._codes.copy(), self._scales.copy(), self._sq_norms.copy()
+            vectors = self._vectors.copy()
+            codes[index], scales[index], sq_norms[index] = code[0], scale[0], sq_norm
+            vectors[index] = half
+            metadatas[index] = metadata
+            old_digest = self._digests[index]
+            if self._hash_index.get(old_digest) == ticket_id:
+                del self._hash_index[old_digest]
+            self._digests[index] = digest
+        else:
+            self._index_by_id[ticket_id] = len(ids)
+            ids.append(ticket_id)
+            metadatas.append(metadata)
+            self._digests.append(digest)
+            codes = np.vstack([self._codes, code]) if self._codes.size else code
+            vectors = np.vstack([self._vectors, half]) if self._vectors.size else half[None, :]
+            scales = np.append(self._scales, scale)
+            sq_norms = np.append(self._sq_norms, sq_norm).astype(np.float32)
+
+        self._hash_index[digest] = ticket_id
+        self._ids = ids
+        self._metadatas = metadatas
+        self._codes = codes
+        self._scales = scales
+        self._vectors = vectors
+        self._sq_norms = sq_norms
+
+    def _distances(self, query: np.ndarray, dots: np.ndarray, sq_norms: np.ndarray) -> np.ndarray:
+        """
+        Compute distances in the collection's own metric so relevance scores
+        (and therefore thresholds) match what Chroma would return.
+
+        Args:
+            query: Query embedding
+            dots: Dot products of the query with each stored embedding
+            sq_norms: Squared L2 norms of the stored embeddings
+
+        Returns:
+            Distance from the query to each stored embedding
+        """
+        if self._space == "cosine":
+            norms = np.sqrt(sq_norms) * np.linalg.norm(query)
+            return 1.0 - dots / np.maximum(norms, 1e-12)
+        if self._space == "ip":
+            return 1.0 - dots
+        # Chroma's l2 space reports squared euclidean distance
+        return np.maximum(sq_norms - 2.0 * dots + query @ query, 0.0)
+
     def add_ticket(
         self,
         ticket: SupportTicket,
@@ -58,6 +253,9 @@ class TicketHistoryStore:
         """
         Add a processed ticket to the history store.
 
+        The ticket is queued and stored with others in one embedding request
+        and upsert, so it becomes matchable shortly after this returns.
+
         Args:
             ticket: The original support ticket
             result: The pipeline result with reply
@@ -74,15 +272,49 @@ class TicketHistoryStore:
             "urgency": result.triage.urgency.value,
             "customer_reply": result.reply.customer_reply,
             "internal_notes": result.reply.internal_notes,
-            "citations": json.dumps(result.reply.citations),
+            "citations": orjson.dumps(result.reply.citations).decode(),
+            # Lets an auto-reply reuse this ticket's classification without re-running it
+            "cached_result": result.model_dump_json(
+                include={"triage", "kb_hits"}
+            ),
         }
 
-        # Add to vectorstore
-        self.vectorstore.add_texts(
-            texts=[search_text],
-            metadatas=[metadata],
-            ids=[ticket.ticket_id]
-        )
+        self._writes.put((ticket.ticket_id, search_text, metadata))
+
+    def _write_tickets(self, items: list[tuple[str, str, dict]]) -> None:
+        """Embed and store a batch of queued tickets (background thread)."""
+        # A ticket queued twice in one batch keeps its latest version
+        latest = {ticket_id: (search_text, metadata) for ticket_id, search_text, metadata in items}
+        ids = list(latest)
+        texts = [search_text for search_text, _ in latest.values()]
+        metadatas = [metadata for _, metadata in latest.values()]
+
+        # Reuse vectors from find_similar_ticket; embed the rest once and use
+        # the vectors for both Chroma and the mirror
+        with self._lock:
+            embeddings = [self._pending_vectors.pop(text, None) for text in texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            for i, embedding in zip(missing, self.embeddings.embed_documents([texts[i] for i in missing])):
+                embeddings[i] = embedding
+
+        with self._lock:
+            self.vectorstore._collection.upsert(
+                ids=ids,
+                embeddings=embeddings,
+                metadatas=metadatas,
+                documents=texts
+            )
+            for ticket_id, embedding, metadata, search_text in zip(ids, embeddings, metadatas, texts):
+                self._add_to_mirror(ticket_id, embedding, metadata, search_text)
+
+    def flush(self) -> None:
+        """Block until every queued ticket has been stored."""
+        self._writes.flush()
+
+    def close(self) -> None:
+        """Store any queued tickets and stop the background writer."""
+        self._writes.close()
 
     def find_similar_ticket(
         self,
@@ -99,46 +331,128 @@ class TicketHistoryStore:
         """
         search_text = f"{ticket.subject} {ticket.body}"
 
-        # Search for similar tickets
-        results = self.vectorstore.similarity_search_with_relevance_scores(
-            search_text, k=5
-        )
+        digest = _text_digest(search_text)
+
+        # Snapshot the mirror; writers swap in new objects rather than mutate
+        with self._lock:
+            exact_id = self._hash_index.get(digest)
+            exact_metadata = self._metadatas[self._index_by_id[exact_id]] if exact_id else None
+            metadatas = self._metadatas
+            codes = self._codes
+            scales = self._scales
+            vectors = self._vectors
+            sq_norms = self._sq_norms
 
-        if not results:
+        # Identical text to a stored ticket - no need to embed
+        if exact_metadata and exact_id != ticket.ticket_id:
+            return self._build_match(exact_metadata, 1.0)
+
+        if not metadatas:
             return False, 0.0, None, None
 
-        for doc, score in results:
+        # Search for similar tickets in memory
+        embedding = self.embeddings.embed_query(search_text)
+        with self._lock:
+            self._pending_vectors[search_text] = embedding
+            if len(self._pending_vectors) > PENDING_VECTORS_SIZE:
+                self._pending_vectors.popitem(last=False)
+        query = np.asarray(embedding, dtype=np.float32)
+        top, distances = self._search_mirror(query, codes, scales, vectors, sq_norms, k=5)
+        results = [
+            (metadatas[i], self._relevance_fn(float(distance)))
+            for i, distance in zip(top, distances)
+        ]
+
+        for metadata, score in results:
             # Skip if below similarity threshold
             if score < self.similarity_threshold:
                 continue
 
             # Skip if it's the same ticket
-            if doc.metadata.get("ticket_id") == ticket.ticket_id:
+            if metadata.get("ticket_id") == ticket.ticket_id:
                 continue
 
-            # Found a match - create reply draft from stored data
-            processed_at_str = doc.metadata.get("processed_at")
-            citations = json.loads(doc.metadata.get("citations", "[]"))
-            reply = ReplyDraft(
-                customer_reply=doc.metadata.get("customer_reply", ""),
-                internal_notes=doc.metadata.get("internal_notes", ""),
-                citations=citations,
-                should_send=True  # Auto-replies should be sent
-            )
-
-            matched_info = {
-                "matched_ticket_id": doc.metadata.get("ticket_id"),
-                "processed_at": processed_at_str,
-                "category": doc.metadata.get("category"),
-                "similarity_score": score
-            }
-
-            return True, score, reply, matched_info
+            return self._build_match(metadata, score)
 
         # No matching ticket found
         best_score = results[0][1] if results else 0.0
         return False, best_score, None, None
 
+    def _search_mirror(
+        self,
+        query: np.ndarray,
+        codes: np.ndarray,
+        scales: np.ndarray,
+        vectors: np.ndarray,
+        sq_norms: np.ndarray,
+        k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the nearest stored tickets: an approximate scan over the reduced
+        int8 codes, then a rerank of the best candidates at full dimension.
+
+        Args:
+            query: Query embedding
+            codes: int8 quantized reduced embeddings
+            scales: Per-row quantization scales
+            vectors: float16 full-dimension embeddings
+            sq_norms: Squared L2 norms of the original embeddings
+            k: Number of results
+
+        Returns:
+            Tuple of (row indices, distances), nearest first
+        """
+        # Quantize the query too so the scan is an int8 product accumulated in
+        # int32, rather than upcasting the whole code matrix to float per query
+        query_code, query_scale = _quantize(self._project(query)[None, :])
+        dots = np.einsum("ij,j->i", codes, query_code[0], dtype=np.int32)
+        approx = self._distances(query, dots * (scales * query_scale[0]), sq_norms)
+        n_candidates = min(k * RERANK_FACTOR, len(approx))
+        candidates = np.argpartition(approx, n_candidates - 1)[:n_candidates]
+
+        # Rescore candidates against their resident full-dimension embeddings
+        exact_dots = vectors[candidates].astype(np.float32) @ query
+        distances = self._distances(query, exact_dots, sq_norms[candidates])
+
+        order = np.argsort(distances)[:k]
+        return candidates[order], distances[order]
+
+    def _build_match(
+        self,
+        metadata: dict,
+        score: float
+    ) -> tuple[bool, float, ReplyDraft, dict]:
+        """
+        Build the auto-reply match tuple from a stored ticket's metadata.
+
+        Args:
+            metadata: Metadata of the matched ticket
+            score: Similarity score of the match
+
+        Returns:
+            Tuple of (True, similarity_score, reply_draft, matched_ticket_info)
+        """
+        # Create reply draft from stored data
+        processed_at_str = metadata.get("processed_at")
+        citations = orjson.loads(metadata.get("citations", "[]"))
+        reply = ReplyDraft(
+            customer_reply=metadata.get("customer_reply", ""),
+            internal_notes=metadata.get("internal_notes", ""),
+            citations=citations,
+            should_send=True  # Auto-replies should be sent
+        )
+
+        matched_info = {
+            "matched_ticket_id": metadata.get("ticket_id"),
+            "processed_at": processed_at_str,
+            "category": metadata.get("category"),
+            "similarity_score": score,
+            # Absent for tickets stored before results were cached
+            "cached_result": orjson.loads(metadata["cached_result"]) if "cached_result" in metadata else None
+        }
+
+        return True, score, reply, matched_info
+
     def get_stats(self) -> dict:
         """Get statistics about the ticket history store."""
         collection = self.vectorstore._collection
@@ -169,6 +483,8 @@ def get_ticket_history() -> TicketHistoryStore:
 
 
 def reset_ticket_history():
-    """Reset the singleton ticket history instance."""
+    """Reset the singleton ticket history instance, storing any queued tickets."""
     global _history_store
+    if _history_store is not None:
+        _history_store.close()
     _history_store = None
@@ -0,0 +1,219 @@
+"""
+Background batching for knowledge base writes.
+Callers queue items and return immediately; a worker thread hands them to a
+writer in batches, so N writes cost one embedding request and one Chroma call.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+# Queued items before put() blocks, so a stalled writer can't grow memory unbounded
+WRITE_QUEUE_SIZE = 1024
+
+# Attempts per batch before it is kept for a later retry, and the delay
+# before the first retry (doubled for each one after)
+WRITE_ATTEMPTS = 3
+WRITE_RETRY_SECONDS = 0.5
+
+# Signals the worker thread to write what it has and exit
+_STOP = object()
+
+
+class _FlushRequest:
+    """Asks the worker thread to write what it has and report what it couldn't."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.unwritten = 0
+
+
+class BatchWriteQueue:
+    """
+    Bounded queue of items written in batches by a background thread.
+
+    A batch is written once batch_size items are buffered or the oldest has
+    waited flush_seconds. A batch that still fails after retrying is kept
+    apart from new items, so one bad write can't wedge the queue, and is
+    retried after the next successful write, on flush() and on close().
+    Callbacks only run once their batch is written.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[list], None],
+        batch_size: int,
+        flush_seconds: float,
+        name: str = "KB"
+    ):
+        """
+        Start the queue's worker thread.
+
+        Args:
+            writer: Writes a batch of queued items
+            batch_size: Items buffered before a batch is written
+            flush_seconds: Longest an item waits before being written
+            name: Label used in log messages
+        """
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.name = name
+
+        self._queue: queue.Queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        # Batches that failed every attempt, only touched by the worker thread
+        self._failed: list[list[tuple]] = []
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Number of queued items not yet written."""
+        return self._pending
+
+    def put(self, item: Any, on_written: Optional[Callable[[], None]] = None) -> None:
+        """
+        Queue an item for the next batch.
+
+        Args:
+            item: Item handed to the writer
+            on_written: Called once the batch containing the item is written
+
+        Raises:
+            RuntimeError: If the queue has been closed
+        """
+        # Held across the put so close() can't slip _STOP in ahead of the item
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} write queue is closed")
+            with self._pending_lock:
+                self._pending += 1
+            self._queue.put((item, on_written))
+
+    def flush(self, raise_on_failure: bool = True) -> None:
+        """
+        Block until every item queued so far has been written.
+
+        Args:
+            raise_on_failure: Raise if some items couldn't be written; when
+                False they are only logged, for callers that can work without them
+
+        Raises:
+            RuntimeError: If some items still couldn't be written; they stay
+                queued and are retried later
+        """
+        if self._closed or not self._pending:
+            return
+        request = _FlushRequest()
+        self._queue.put(request)
+        request.done.wait()
+        if not request.unwritten:
+            return
+        message = f"Failed to write {request.unwritten} queued {self.name} items"
+        if raise_on_failure:
+            raise RuntimeError(message)
+        print(f"Warning: {message}")
+
+    def close(self) -> None:
+        """Write any queued items and stop the worker thread."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Worker thread: buffer queued items and write them in batches."""
+        buffer = []
+        deadline = 0.0
+
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if buffer else None
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                entry = None
+
+            if isinstance(entry, tuple):
+                if not buffer:
+                    deadline = time.monotonic() + self.flush_seconds
+                buffer.append(entry)
+                if len(buffer) < self.batch_size:
+                    continue
+
+            if buffer:
+                # A working writer is the cue to retry earlier failures
+                if self._write(buffer) and self._failed:
+                    self._retry_failed()
+                buffer = []
+
+            if isinstance(entry, _FlushRequest):
+                self._retry_failed()
+                entry.unwritten = sum(len(batch) for batch in self._failed)
+                entry.done.set()
+            elif entry is _STOP:
+                self._retry_failed()
+                if self._failed:
+                    lost = sum(len(batch) for batch in self._failed)
+                    print(f"Error: Dropped {lost} unwritten {self.name} items on close")
+                return
+
+    def _write(self, entries: list[tuple], attempts: int = WRITE_ATTEMPTS) -> bool:
+        """
+        Hand a batch to the writer, retrying with backoff, then run its callbacks.
+
+        Args:
+            entries: Queued (item, callback) pairs
+            attempts: Times to try the writer before keeping the batch
+
+        Returns:
+            True if the batch was written, False if it was kept for a later retry
+        """
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(WRITE_RETRY_SECONDS * 2 ** (attempt - 1))
+            try:
+                self.writer([item for item, _ in entries])
+                break
+            except Exception as e:
+                error = e
+        else:
+            print(f"Error: Failed to write {len(entries)} queued {self.name} items, will retry: {error}")
+            self._keep_failed(entries)
+            return False
+
+        with self._pending_lock:
+            self._pending -= len(entries)
+
+        # Each distinct callback runs once per batch
+        for callback in dict.fromkeys(cb for _, cb in entries if cb is not None):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Warning: {self.name} write callback failed: {e}")
+
+        return True
+
+    def _keep_failed(self, entries: list[tuple]) -> None:
+        """Keep a failed batch for retry, dropping the oldest beyond the queue size."""
+        self._failed.append(entries)
+        kept = sum(len(batch) for batch in self._failed)
+        while kept > WRITE_QUEUE_SIZE:
+            dropped = self._failed.pop(0)
+            kept -= len(dropped)
+            with self._pending_lock:
+                self._pending -= len(dropped)
+            print(f"Error: Dropped {len(dropped)} unwritten {self.name} items")
+
+    def _retry_failed(self) -> None:
+        """Try each kept batch once more, keeping any that fail again."""
+        batches, self._failed = self._failed, []
+        for batch in batches:
+            self._write(batch, attempts=1)
@@ -2,9 +2,14 @@
 LLM client using OpenAI-compatible APIs.
 """
 
+import copy
+import hashlib
+import importlib.util
 import json
 import os
-from typing import Any
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
 
 from dotenv import load_dotenv
 
@@ -16,6 +21,42 @@ from .schemas import (
     Urgency, Category, Sentiment, SupportTicket
 )
 
+# openai and httpx are only imported once a provider is created, so importing
+# this module (e.g. for type hints) stays cheap
+if TYPE_CHECKING:
+    import httpx
+
+
+# Sampling temperature for every completion
+TEMPERATURE = 0.3
+
+# Completions kept by the opt-in response cache (least recently used evicted first)
+LLM_CACHE_SIZE = 1024
+
+# Connection pool shared by every request of a provider, so calls reuse warm
+# TCP/TLS connections instead of paying a handshake each time
+LLM_MAX_CONNECTIONS = 32
+LLM_MAX_KEEPALIVE_CONNECTIONS = 16
+LLM_TIMEOUT_SECONDS = 30.0
+
+# HTTP/2 lets concurrent calls multiplex over one connection; it needs the
+# optional h2 package, without which requests fall back to HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _build_http_client() -> "httpx.Client":
+    """Create the pooled HTTP client used for LLM requests."""
+    import httpx
+
+    return httpx.Client(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        timeout=LLM_TIMEOUT_SECONDS
+    )
+
 
 class OpenAIProvider:
     """Provider for OpenAI-compatible APIs."""
@@ -24,55 +65,189 @@ class OpenAIProvider:
         self,
         api_key: str | None = None,
         base_url: str | None = None,
-        model: str = "gpt-4o-mini"
+        model: str = "gpt-4o-mini",
+        enable_cache: bool = False
     ):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
         self.model = model
+        self.enable_cache = enable_cache
+
+        # Identical prompts (e.g. templated triage of similar tickets) are
+        # answered from memory instead of another round trip to the API
+        self._cache: OrderedDict[str, Any] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # Cleared the first time the endpoint rejects a json_schema response format
+        self._supports_json_schema = True
 
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable.")
 
         from openai import OpenAI
 
-        client_kwargs = {"api_key": self.api_key}
+        client_kwargs = {"api_key": self.api_key, "http_client": _build_http_client()}
         if self.base_url:
             client_kwargs["base_url"] = self.base_url
 
         self.client = OpenAI(**client_kwargs)
 
-    def complete(self, prompt: str, system_prompt: str = "") -> str:
+    def close(self) -> None:
+        """Close the provider's pooled HTTP connections."""
+        self.client.close()
+
+    def _cache_key(
+        self,
+        kind: str,
+        prompt: str,
+        system_prompt: str,
+        json_schema: dict[str, Any] | None = None
+    ) -> str:
+        """Hash everything that determines a completion into a cache key."""
+        parts = [kind, self.model, system_prompt, prompt, str(TEMPERATURE)]
+        if json_schema:
+            parts.append(json.dumps(json_schema, sort_keys=True))
+        raw = "\x00".join(parts)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Any:
+        """Return a cached completion (or None), marking it recently used."""
+        with self._cache_lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, key: str, value: Any) -> None:
+        """Store a completion, evicting the least recently used past LLM_CACHE_SIZE."""
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > LLM_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _messages(self, prompt: str, system_prompt: str) -> list[dict[str, str]]:
+        """Build the chat messages for a prompt."""
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
+        return messages
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.3
-        )
-        return response.choices[0].message.content or ""
+    def _json_response_format(self, json_schema: dict[str, Any] | None) -> dict[str, Any]:
+        """Response format for a JSON completion, strict when a schema is given."""
+        if json_schema is None or not self._supports_json_schema:
+            return {"type": "json_object"}
+        return {"type": "json_schema", "json_schema": {**json_schema, "strict": True}}
 
-    def complete_json(self, prompt: str, system_prompt: str = "") -> dict[str, Any]:
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
+    def _create_json(
+        self,
+        prompt: str,
+        system_prompt: str,
+        json_schema: dict[str, Any] | None
+    ):
+        """
+        Request a JSON completion, falling back to plain JSON mode if the
+        endpoint rejects structured outputs (some OpenAI-compatible servers do).
+        """
+        from openai import BadRequestError
+
+        create = self.client.chat.completions.create
+        kwargs = {
+            "model": self.model,
+            "messages": self._messages(prompt, system_prompt),
+            "temperature": TEMPERATURE
+        }
+        try:
+            return create(**kwargs, response_format=self._json_response_format(json_schema))
+        except BadRequestError as e:
+            if json_schema is None or not self._supports_json_schema:
+                raise
+            print(f"Warning: Structured outputs rejected, using JSON mode: {e}")
+            self._supports_json_schema = False
+            return create(**kwargs, response_format={"type": "json_object"})
+
+    def complete(self, prompt: str, system_prompt: str = "") -> str:
+        if self.enable_cache:
+            key = self._cache_key("text", prompt, system_prompt)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
 
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=messages,
-            temperature=0.3,
-            response_format={"type": "json_object"}
+            messages=self._messages(prompt, system_prompt),
+            temperature=TEMPERATURE
         )
+        content = response.choices[0].message.content or ""
+
+        if self.enable_cache:
+            self._cache_put(key, content)
+        return content
+
+    def complete_json(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        json_schema: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """
+        Complete a prompt whose response is a JSON object.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            json_schema: Optional {"name", "schema"} the response must match;
+                sent as a strict structured-output format
+
+        Returns:
+            Parsed JSON response
+        """
+        if self.enable_cache:
+            key = self._cache_key("json", prompt, system_prompt, json_schema)
+            cached = self._cache_get(key)
+            if cached is not None:
+                # Callers may mutate the result, so never hand out the cached dict
+                return copy.deepcopy(cached)
+
+        response = self._create_json(prompt, system_prompt, json_schema)
         content = response.choices[0].message.content or "{}"
-        return json.loads(content)
+        result = json.loads(content)
+
+        if self.enable_cache:
+            self._cache_put(key, copy.deepcopy(result))
+        return result
+
+
+# Singleton instance; the lock keeps concurrent first calls from each
+# building a provider with its own connection pool and cache
+_llm_client: OpenAIProvider | None = None
+_llm_client_lock = threading.Lock()
 
 
 def get_llm_client() -> OpenAIProvider:
     """
-    Factory function to get the OpenAI LLM client.
+    Get or create the singleton OpenAI LLM client.
     Requires OPENAI_API_KEY environment variable.
+    Set LLM_CACHE=true to reuse completions for repeated prompts.
+
+    Returns:
+        OpenAIProvider instance, shared so every caller reuses its connections
     """
-    return OpenAIProvider()
+    global _llm_client
+
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = OpenAIProvider(enable_cache=os.getenv("LLM_CACHE", "false").lower() == "true")
+
+    return _llm_client
+
+
+def reset_llm_client() -> None:
+    """Reset the singleton LLM client, closing its connections."""
+    global _llm_client
+    with _llm_client_lock:
+        if _llm_client is not None:
+            _llm_client.close()
+        _llm_client = None
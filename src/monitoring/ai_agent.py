@@ -3,6 +3,9 @@ AI Agent for monitoring event analysis and automated response generation.
 """
 
 import json
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional
 import uuid
@@ -13,6 +16,31 @@ from ..kb.collections import KBCollection
 from .schemas import LogEvent, AIIssue, AIAlert, EventType
 
 
+# Processed event IDs remembered for duplicate detection; older IDs are forgotten
+PROCESSED_EVENTS_SIZE = 50_000
+
+# Analyses kept for reuse by events with the same fingerprint
+ANALYSIS_CACHE_SIZE = 256
+
+# How long a cached analysis is reused before the LLM is asked again
+ANALYSIS_CACHE_TTL_SECONDS = 300.0
+
+# Significant digits kept from each metric, so small fluctuations share a fingerprint
+FINGERPRINT_METRIC_DIGITS = 2
+
+
+def _event_fingerprint(event: LogEvent) -> tuple:
+    """Key for events that would get the same analysis, ignoring small metric changes."""
+    metrics = tuple(sorted(
+        (name, f"{value:.{FINGERPRINT_METRIC_DIGITS}g}" if isinstance(value, float) else value)
+        for name, value in event.metrics.items()
+    ))
+    return (
+        event.event_type.value, event.service_name, event.region,
+        event.message, event.critical, metrics
+    )
+
+
 class MonitoringAIAgent:
     """
     AI agent that analyzes flagged monitoring events and generates:
@@ -24,7 +52,11 @@ class MonitoringAIAgent:
     def __init__(self, llm: OpenAIProvider, kb_retriever: KBRetriever):
         self._llm = llm
         self._kb_retriever = kb_retriever
-        self._processed_event_ids: set[str] = set()
+        # Insertion-ordered so the oldest IDs can be evicted past PROCESSED_EVENTS_SIZE
+        self._processed_event_ids: OrderedDict[str, None] = OrderedDict()
+        self._processed_lock = threading.Lock()
+        self._analysis_cache: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+        self._analysis_cache_lock = threading.Lock()
 
     def analyze_flagged_event(
         self,
@@ -34,11 +66,16 @@ class MonitoringAIAgent:
         """Analyze a flagged event and generate issue/alerts in ONE LLM call."""
 
         # Skip if already processed
-        if event.event_id in self._processed_event_ids:
+        with self._processed_lock:
+            already_processed = event.event_id in self._processed_event_ids
+            self._processed_event_ids[event.event_id] = None
+            self._processed_event_ids.move_to_end(event.event_id)
+            while len(self._processed_event_ids) > PROCESSED_EVENTS_SIZE:
+                self._processed_event_ids.popitem(last=False)
+        if already_processed:
             print(f"[AIAgent] Event {event.event_id[:8]}... already processed, skipping")
             return None, []
 
-        self._processed_event_ids.add(event.event_id)
         print(f"[AIAgent] Analyzing event {event.event_id[:8]}... service={event.service_name}")
 
         # Build context from recent flagged events
@@ -47,9 +84,17 @@ class MonitoringAIAgent:
             if e.service_name == event.service_name and e.flagged
         ][:5]
 
-        # Single LLM call that returns everything
-        print(f"[AIAgent] Calling LLM (single consolidated call)...")
-        result = self._analyze_and_generate_all(event, context_events)
+        # Reuse the analysis of a recent event with the same fingerprint
+        fingerprint = _event_fingerprint(event)
+        result = self._cached_analysis(fingerprint)
+        if result is not None:
+            print(f"[AIAgent] Reusing cached analysis for {event.service_name}")
+        else:
+            # Single LLM call that returns everything
+            print(f"[AIAgent] Calling LLM (single consolidated call)...")
+            result = self._analyze_and_generate_all(event, context_events)
+            if result:
+                self._cache_analysis(fingerprint, result)
 
         if not result:
             print(f"[AIAgent] LLM call failed")
@@ -67,6 +112,27 @@ class MonitoringAIAgent:
 
         return issue, alerts
 
+    def _cached_analysis(self, fingerprint: tuple) -> Optional[dict]:
+        """Return a copy of an unexpired cached analysis (or None), marking it recently used."""
+        with self._analysis_cache_lock:
+            entry = self._analysis_cache.get(fingerprint)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= time.monotonic():
+                del self._analysis_cache[fingerprint]
+                return None
+            self._analysis_cache.move_to_end(fingerprint)
+            return dict(result)
+
+    def _cache_analysis(self, fingerprint: tuple, result: dict) -> None:
+        """Store an analysis, evicting the least recently used past ANALYSIS_CACHE_SIZE."""
+        with self._analysis_cache_lock:
+            self._analysis_cache[fingerprint] = (time.monotonic() + ANALYSIS_CACHE_TTL_SECONDS, dict(result))
+            self._analysis_cache.move_to_end(fingerprint)
+            while len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+
     def _analyze_and_generate_all(
         self,
         event: LogEvent,
@@ -196,5 +262,6 @@ Generate a JSON response with ALL of the following:
 
     def clear_processed_events(self):
         """Clear the set of processed event IDs."""
-        self._processed_event_ids.clear()
+        with self._processed_lock:
+            self._processed_event_ids.clear()
 
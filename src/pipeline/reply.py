@@ -4,6 +4,7 @@ Generates customer-facing replies with KB citations and internal notes.
 Includes follow-up request generation for Q&A conversations.
 """
 
+import re
 from typing import Optional
 
 from ..schemas import (
@@ -256,36 +257,36 @@ ACTION REQUIRED: Review the AI-suggested draft below and send an appropriate res
     )
 
 
+# Common signature patterns to remove from drafted replies
+signature_patterns = [
+    # "Best regards," followed by name/team (multi-line)
+    r'\n*(?:Best regards|Kind regards|Warm regards|Regards|Sincerely|Thanks|Thank you|Cheers),?\s*\n+.*?(?:Support Team|Customer Support|Team|Staff|\[Your Name\]|Your Name).*$',
+    # Just the closing line with brackets
+    r'\n*(?:Best regards|Kind regards|Warm regards|Regards|Sincerely|Thanks|Thank you|Cheers),?\s*\n+\[.*?\].*$',
+    # Standalone signature blocks
+    r'\n+(?:Best regards|Kind regards|Warm regards|Regards|Sincerely|Thanks|Thank you|Cheers),?\s*$',
+    # Common patterns with line breaks
+    r'\n+Best,?\s*\n+.*$',
+    # "We are here to help" followed by anything
+    r'\n*(?:Thank you for your patience[^.]*\.)?\s*We are here to help!?\s*\n*(?:Best regards|Kind regards|Warm regards|Regards|Sincerely|Thanks|Thank you|Cheers).*$',
+    # Just "We are here to help" at the end
+    r'\n+(?:Thank you for your patience[^.]*\.)?\s*We are here to help!?\s*$',
+    # Name placeholder patterns
+    r'\n+\[Your Name\].*$',
+    r'\n+Your Name.*$',
+    # Customer Support Team on its own line
+    r'\n+Customer Support(?: Team)?\s*$',
+    # Generic filler endings
+    r'\n+Thank you for your patience and understanding\.\s*$',
+]
+_signature_res = [re.compile(p, re.IGNORECASE | re.DOTALL) for p in signature_patterns]
+
+
 def _strip_signature(text: str) -> str:
     """Remove generic email signatures from LLM-generated replies."""
-    import re
-
-    # Common signature patterns to remove
-    signature_patterns = [
-        # "Best regards," followed by name/team (multi-line)
-        r'\n*(?:Best regards|Kind regards|Warm regards|Regards|Sincerely|Thanks|Thank you|Cheers),?\s*\n+.*?(?:Support Team|Customer Support|Team|Staff|\[Your Name\]|Your Name).*$',
-        # Just the closing line with brackets
-        r'\n*(?:Best regards|Kind regards|Warm regards|Regards|Sincerely|Thanks|Thank you|Cheers),?\s*\n+\[.*?\].*$',
-        # Standalone signature blocks
-        r'\n+(?:Best regards|Kind regards|Warm regards|Regards|Sincerely|Thanks|Thank you|Cheers),?\s*$',
-        # Common patterns with line breaks
-        r'\n+Best,?\s*\n+.*$',
-        # "We are here to help" followed by anything
-        r'\n*(?:Thank you for your patience[^.]*\.)?\s*We are here to help!?\s*\n*(?:Best regards|Kind regards|Warm regards|Regards|Sincerely|Thanks|Thank you|Cheers).*$',
-        # Just "We are here to help" at the end
-        r'\n+(?:Thank you for your patience[^.]*\.)?\s*We are here to help!?\s*$',
-        # Name placeholder patterns
-        r'\n+\[Your Name\].*$',
-        r'\n+Your Name.*$',
-        # Customer Support Team on its own line
-        r'\n+Customer Support(?: Team)?\s*$',
-        # Generic filler endings
-        r'\n+Thank you for your patience and understanding\.\s*$',
-    ]
-
     result = text
-    for pattern in signature_patterns:
-        result = re.sub(pattern, '', result, flags=re.IGNORECASE | re.DOTALL)
+    for regex in _signature_res:
+        result = regex.sub('', result)
 
     return result.rstrip()
 
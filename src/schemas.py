@@ -5,7 +5,7 @@ Pydantic schemas for all inputs and outputs in the support triage system.
 from datetime import datetime
 from enum import Enum
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, RootModel
 
 
 class Urgency(str, Enum):
@@ -198,6 +198,10 @@ class Conversation(BaseModel):
     resolved_at: Optional[datetime] = Field(default=None, description="Resolution time if resolved")
 
 
+class ConversationMessageList(RootModel[list[ConversationMessage]]):
+    """A conversation's messages, serialized as a single JSON array."""
+
+
 class ConversationInfo(BaseModel):
     """Summary info about a conversation included in PipelineResult."""
     conversation_id: str = Field(..., description="Conversation ID")
@@ -207,6 +211,20 @@ class ConversationInfo(BaseModel):
     status: ConversationStatus = Field(default=ConversationStatus.in_progress, description="Conversation status")
 
 
+class ConversationSummary(BaseModel):
+    """Lightweight conversation listing entry kept in the conversation store's index."""
+    conversation_id: str = Field(..., description="Conversation ID")
+    original_ticket_id: str = Field(..., description="ID of the initial ticket")
+    customer_email: str = Field(..., description="Customer email for this conversation")
+    customer_name: str = Field(..., description="Customer name")
+    subject: str = Field(..., description="Conversation subject")
+    status: ConversationStatus = Field(..., description="Current conversation status")
+    message_count: int = Field(..., description="Total messages in conversation")
+    pending_fields: list[str] = Field(default_factory=list, description="Fields still needed from customer")
+    created_at: datetime = Field(..., description="Conversation creation time")
+    updated_at: datetime = Field(..., description="Last update time")
+
+
 class PipelineResult(BaseModel):
     """Complete output from the support triage pipeline."""
     ticket_id: str = Field(..., description="Original ticket ID")
@@ -224,6 +242,10 @@ class PipelineResult(BaseModel):
     conversation: Optional[ConversationInfo] = Field(default=None, description="Conversation thread information")
 
 
+class PipelineResultList(RootModel[list[PipelineResult]]):
+    """A batch of pipeline results, serialized as a single JSON array."""
+
+
 class ApprovedResponse(BaseModel):
     """An approved response to add to the KB for future use."""
     ticket_id: str = Field(..., description="Original ticket ID this response is based on")
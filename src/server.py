@@ -4,15 +4,18 @@ FastAPI server for the support triage web UI.
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import NamedTuple
 
+import orjson
 from dotenv import load_dotenv
 load_dotenv()  # Load .env file
 
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from pydantic import ValidationError
 
 from .schemas import (
@@ -20,14 +23,14 @@ from .schemas import (
     GuardrailStatus, InputGuardrailStatus, TriageResult, ExtractedFields,
     RoutingDecision, ReplyDraft, Urgency, Category, Sentiment, Team, KBHit,
     StatusUpdateInfo, Conversation, ConversationInfo, ConversationStatus,
-    ApprovedResponse
+    ApprovedResponse, PipelineResultList, ConversationMessageList
 )
 from .llm_client import get_llm_client, OpenAIProvider
 from .kb.retriever import get_retriever, KBRetriever
 from .kb.indexer import build_kb_index, add_approved_response
 from .kb.ticket_history import get_ticket_history, TicketHistoryStore
 from .kb.status_store import get_status_store, StatusUpdateStore, StatusUpdate
-from .kb.conversation_store import get_conversation_store, ConversationStore
+from .kb.conversation_store import get_conversation_store, ConversationStore, ACTIVE_STATUSES
 from .kb.collections import KBCollection
 from .pipeline.triage import triage_and_extract, triage_and_extract_with_context
 from .pipeline.routing import compute_routing
@@ -59,6 +62,16 @@ def get_kb_path() -> Path:
     return get_project_root() / "kb"
 
 
+def _orjson_response(content) -> Response:
+    """
+    Serialize a response body with orjson.
+
+    orjson handles datetimes and enums natively, so models can be passed as
+    plain model_dump() dicts without a JSON-mode pass first.
+    """
+    return Response(content=orjson.dumps(content), media_type="application/json")
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Support Triage System",
@@ -66,6 +79,15 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Reuse the matched ticket's triage and KB hits on auto-reply instead of
+# re-running them. Set AUTO_REPLY_REUSE_TRIAGE=false to always recompute.
+AUTO_REPLY_REUSE_TRIAGE = os.getenv("AUTO_REPLY_REUSE_TRIAGE", "true").lower() != "false"
+
+# Threads for a ticket's independent lookups; sized for process_tickets'
+# default of 8 tickets in flight, each with one background lookup
+LOOKUP_WORKERS = 8
+_lookup_executor = ThreadPoolExecutor(max_workers=LOOKUP_WORKERS, thread_name_prefix="lookup")
+
 # Global instances (lazy loaded)
 _llm = None
 _retriever = None
@@ -185,6 +207,12 @@ def get_kb_retriever():
     return _retriever
 
 
+def _invalidate_kb_search_cache():
+    """Drop cached KB search results after the support KB changes."""
+    if _retriever is not None:
+        _retriever.clear_cache()
+
+
 def get_history():
     global _ticket_history
     if _ticket_history is None:
@@ -206,6 +234,21 @@ def get_conversations():
     return _conversation_store
 
 
+class _TriagedTicket(NamedTuple):
+    """A ticket that has been triaged and is waiting for KB retrieval."""
+    ticket: SupportTicket  # Sanitized if the input guardrail required it
+    input_guardrail: InputGuardrailStatus
+    conversation: Conversation | None
+    fields_received: list[str]
+    triage: TriageResult
+    extracted: ExtractedFields
+    routing: RoutingDecision
+    status_updates: list[StatusUpdateInfo]
+    auto_reply_info: AutoReplyInfo
+    search_subject: str
+    search_body: str
+
+
 def process_ticket(
     ticket: SupportTicket,
     llm: OpenAIProvider,
@@ -237,6 +280,37 @@ def process_ticket(
     if conversation_store is None:
         conversation_store = get_conversation_store()
 
+    triaged = _triage_ticket(ticket, llm, retriever, ticket_history, status_store, conversation_store)
+    if isinstance(triaged, PipelineResult):
+        return triaged
+
+    # Stage 2: KB retrieval
+    kb_hits = retriever.search_with_context(
+        ticket_subject=triaged.search_subject,
+        ticket_body=triaged.search_body,
+        category=triaged.triage.category.value,
+        k=5
+    )
+
+    return _reply_to_ticket(triaged, kb_hits, llm, ticket_history, conversation_store)
+
+
+def _triage_ticket(
+    ticket: SupportTicket,
+    llm: OpenAIProvider,
+    retriever: KBRetriever,
+    ticket_history: TicketHistoryStore,
+    status_store: StatusUpdateStore,
+    conversation_store: ConversationStore
+) -> PipelineResult | _TriagedTicket:
+    """
+    Run the pipeline up to KB retrieval: input guardrails, status and
+    similar-ticket lookups, auto-reply, then triage.
+
+    Returns:
+        The finished PipelineResult for blocked and auto-replied tickets,
+        otherwise the triaged ticket with its KB search text
+    """
     # Stage 0a: Input guardrail check
     input_guardrail = check_input_guardrails(ticket, llm)
 
@@ -262,9 +336,20 @@ def process_ticket(
         if conversation:
             print(f"[DEBUG] Conversation has {len(conversation.messages)} messages, pending_fields: {conversation.pending_fields}")
 
-    # Stage 0c: Check for relevant system status updates (STATUS_UPDATES collection)
+    # Stage 0c: Check for relevant system status updates (STATUS_UPDATES collection).
+    # Runs in the background while the similar-ticket lookup below proceeds, since
+    # both are independent embedding + vector searches
     search_query = f"{ticket.subject} {ticket.body[:500]}"
-    relevant_statuses = status_store.find_relevant_status(search_query, active_only=True, k=3)
+    status_future = _lookup_executor.submit(
+        status_store.find_relevant_status, search_query, active_only=True, k=3
+    )
+
+    # Stage 0d: Check for similar recent tickets (auto-reply from PREVIOUS_QUERIES collection)
+    # Skip auto-reply check for follow-ups
+    auto_reply_info = AutoReplyInfo(is_auto_reply=False, similarity_score=0.0)
+    similar_ticket = None if is_followup else ticket_history.find_similar_ticket(ticket)
+
+    relevant_statuses = status_future.result()
     status_updates = [
         StatusUpdateInfo(
             status_id=s["status_id"],
@@ -279,13 +364,8 @@ def process_ticket(
         for s in relevant_statuses
     ]
 
-    # Stage 0d: Check for similar recent tickets (auto-reply from PREVIOUS_QUERIES collection)
-    # Skip auto-reply check for follow-ups
-    auto_reply_info = AutoReplyInfo(is_auto_reply=False, similarity_score=0.0)
-
-    if not is_followup:
-        should_auto_reply, similarity_score, cached_reply, matched_info = \
-            ticket_history.find_similar_ticket(ticket)
+    if similar_ticket is not None:
+        should_auto_reply, similarity_score, cached_reply, matched_info = similar_ticket
 
         auto_reply_info = AutoReplyInfo(
             is_auto_reply=False,
@@ -304,17 +384,28 @@ def process_ticket(
                 time_since_match_hours=round(time_since, 2)
             )
 
-            # Still do triage for classification purposes
-            triage, extracted = triage_and_extract(ticket, llm)
-            routing = compute_routing(triage, ticket.account_tier)
-
-            # Use KB hits from search (for display)
-            kb_hits = retriever.search_with_context(
-                ticket_subject=ticket.subject,
-                ticket_body=ticket.body,
-                category=triage.category.value,
-                k=5
-            )
+            cached_result = matched_info.get("cached_result")
+            if AUTO_REPLY_REUSE_TRIAGE and cached_result:
+                # Reuse the matched ticket's classification - no LLM or KB calls.
+                # Routing depends on this customer's tier, and the matched
+                # ticket's extracted fields describe another customer's issue,
+                # so neither is carried over.
+                triage = TriageResult.model_validate(cached_result["triage"])
+                kb_hits = [KBHit.model_validate(hit) for hit in cached_result["kb_hits"]]
+                extracted = ExtractedFields()
+                routing = compute_routing(triage, ticket.account_tier)
+            else:
+                # Still do triage for classification purposes
+                triage, extracted = triage_and_extract(ticket, llm)
+                routing = compute_routing(triage, ticket.account_tier)
+
+                # Use KB hits from search (for display)
+                kb_hits = retriever.search_with_context(
+                    ticket_subject=ticket.subject,
+                    ticket_body=ticket.body,
+                    category=triage.category.value,
+                    k=5
+                )
 
             # Use the cached reply with note about auto-reply
             reply = ReplyDraft(
@@ -340,7 +431,8 @@ def process_ticket(
             conversation = conversation_store.create_conversation(ticket, triage, extracted, routing)
             conversation_info = conversation_store.get_conversation_info(conversation)
 
-            result = PipelineResult(
+            # Every field is an already-validated model, so skip re-validation
+            result = PipelineResult.model_construct(
                 ticket_id=ticket.ticket_id,
                 triage=triage,
                 extracted_fields=extracted,
@@ -397,7 +489,7 @@ def process_ticket(
         triage, extracted = triage_and_extract(ticket, llm)
         routing = compute_routing(triage, ticket.account_tier)
 
-    # Stage 2: KB retrieval
+    # KB search text for stage 2.
     # For follow-ups, use original subject and combine context for better matching
     if conversation:
         search_subject = conversation.subject
@@ -407,13 +499,48 @@ def process_ticket(
         search_subject = ticket.subject
         search_body = ticket.body
 
-    kb_hits = retriever.search_with_context(
-        ticket_subject=search_subject,
-        ticket_body=search_body,
-        category=triage.category.value,
-        k=5
+    return _TriagedTicket(
+        ticket=ticket,
+        input_guardrail=input_guardrail,
+        conversation=conversation,
+        fields_received=fields_received,
+        triage=triage,
+        extracted=extracted,
+        routing=routing,
+        status_updates=status_updates,
+        auto_reply_info=auto_reply_info,
+        search_subject=search_subject,
+        search_body=search_body
     )
 
+
+def _reply_to_ticket(
+    triaged: _TriagedTicket,
+    kb_hits: list[KBHit],
+    llm: OpenAIProvider,
+    ticket_history: TicketHistoryStore,
+    conversation_store: ConversationStore
+) -> PipelineResult:
+    """
+    Finish the pipeline for a triaged ticket: reply drafting, output
+    guardrails, conversation tracking and ticket history.
+
+    Args:
+        triaged: Ticket state from _triage_ticket
+        kb_hits: KB hits retrieved for the ticket
+        llm: LLM provider instance
+        ticket_history: Ticket history store the result is added to
+        conversation_store: Conversation store for Q&A threading
+
+    Returns:
+        Complete PipelineResult
+    """
+    ticket = triaged.ticket
+    conversation = triaged.conversation
+    fields_received = triaged.fields_received
+    triage, extracted, routing = triaged.triage, triaged.extracted, triaged.routing
+    auto_reply_info = triaged.auto_reply_info
+
     # Stage 3: Determine if we need more information (Q&A follow-up logic)
     pending_fields = extracted.missing_fields if extracted.missing_fields else []
     needs_followup = len(pending_fields) > 0
@@ -485,26 +612,28 @@ def process_ticket(
     # Update conversation status based on outcome
     if needs_followup:
         # Still waiting for customer info
-        conversation.status = ConversationStatus.awaiting_customer
+        conversation = conversation_store.set_status(
+            conversation.conversation_id, ConversationStatus.awaiting_customer
+        ) or conversation
     elif not pending_fields and is_high_confidence:
         # Issue likely resolved
         conversation_store.resolve_conversation(conversation.conversation_id)
 
     conversation_info = conversation_store.get_conversation_info(conversation)
 
-    # Assemble result
-    result = PipelineResult(
+    # Assemble result (stages return validated models, so skip re-validation)
+    result = PipelineResult.model_construct(
         ticket_id=ticket.ticket_id,
         triage=triage,
         extracted_fields=extracted,
         routing=routing,
         kb_hits=kb_hits,
         reply=reply,
-        input_guardrail_status=input_guardrail,
+        input_guardrail_status=triaged.input_guardrail,
         guardrail_status=guardrail,
         processing_mode="real",
         auto_reply=auto_reply_info,
-        status_updates=status_updates,
+        status_updates=triaged.status_updates,
         conversation=conversation_info
     )
 
@@ -514,6 +643,73 @@ def process_ticket(
     return result
 
 
+def process_tickets(
+    tickets: list[SupportTicket],
+    llm: OpenAIProvider,
+    retriever: KBRetriever,
+    ticket_history: TicketHistoryStore | None = None,
+    status_store: StatusUpdateStore | None = None,
+    conversation_store: ConversationStore | None = None,
+    max_workers: int = 8
+) -> list[PipelineResult]:
+    """
+    Process several tickets concurrently through the full pipeline.
+
+    Each ticket spends nearly all of its time waiting on LLM and embedding
+    round-trips, so tickets are dispatched to a thread pool and total wall
+    time approaches the slowest ticket rather than the sum of all of them.
+    Tickets are triaged first, then searched in the KB together (one
+    embeddings request and one multi-vector query, with the same queries
+    process_ticket would use), then replied to.
+
+    Args:
+        tickets: Support tickets to process
+        llm: LLM provider instance
+        retriever: KB retriever instance
+        ticket_history: Optional ticket history store for auto-reply
+        status_store: Optional status update store
+        conversation_store: Optional conversation store for Q&A threading
+        max_workers: Maximum number of tickets processed at once
+
+    Returns:
+        PipelineResults in the same order as the input tickets
+    """
+    # Resolve shared stores up front so workers don't race singleton creation
+    if ticket_history is None:
+        ticket_history = get_ticket_history()
+    if status_store is None:
+        status_store = get_status_store()
+    if conversation_store is None:
+        conversation_store = get_conversation_store()
+
+    def _triage(ticket: SupportTicket) -> PipelineResult | _TriagedTicket:
+        return _triage_ticket(ticket, llm, retriever, ticket_history, status_store, conversation_store)
+
+    def _reply(triaged: _TriagedTicket, kb_hits: list[KBHit]) -> PipelineResult:
+        return _reply_to_ticket(triaged, kb_hits, llm, ticket_history, conversation_store)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_triage, tickets))
+
+        # Blocked and auto-replied tickets are already finished
+        pending = [i for i, result in enumerate(results) if isinstance(result, _TriagedTicket)]
+        triaged = [results[i] for i in pending]
+
+        # Inputs are sanitized and categories known by now, so these are the
+        # same queries process_ticket would search with
+        kb_hits_batch = retriever.search_batch(
+            [t.search_subject for t in triaged],
+            [t.search_body for t in triaged],
+            categories=[t.triage.category.value for t in triaged],
+            k=5
+        )
+
+        for i, result in zip(pending, executor.map(_reply, triaged, kb_hits_batch)):
+            results[i] = result
+
+    return results
+
+
 def _create_blocked_response(
     ticket: SupportTicket,
     input_guardrail: InputGuardrailStatus
@@ -572,7 +768,7 @@ This ticket was flagged by automated security systems and requires human review.
         fixes_applied=[]
     )
 
-    return PipelineResult(
+    return PipelineResult.model_construct(
         ticket_id=ticket.ticket_id,
         triage=triage,
         extracted_fields=extracted,
@@ -593,28 +789,51 @@ async def get_mode():
     return {"mode": "real"}
 
 
-@app.post("/api/process", response_model=PipelineResult)
-async def process_ticket_api(ticket_data: dict):
-    """Process a support ticket through the triage pipeline."""
+# Value -> member lookup built once instead of calling AccountTier() per ticket
+_ACCOUNT_TIERS = {tier.value: tier for tier in AccountTier}
+
+
+def _coerce_ticket_fields(ticket_data: dict) -> None:
+    """
+    Convert string created_at/account_tier values in a raw payload in place.
+
+    Raises:
+        ValueError: If either value can't be parsed
+    """
+    # Parse datetime if string (trailing Z means UTC)
+    created_at = ticket_data.get("created_at")
+    if isinstance(created_at, str):
+        if created_at.endswith("Z"):
+            created_at = created_at[:-1] + "+00:00"
+        ticket_data["created_at"] = datetime.fromisoformat(created_at)
+
+    # Parse account tier if string
+    account_tier = ticket_data.get("account_tier")
+    if isinstance(account_tier, str):
+        if account_tier not in _ACCOUNT_TIERS:
+            raise ValueError(f"{account_tier!r} is not a valid AccountTier")
+        ticket_data["account_tier"] = _ACCOUNT_TIERS[account_tier]
+
+
+def _parse_ticket_data(ticket_data: dict) -> SupportTicket:
+    """Validate a raw ticket payload, raising a 422 on bad input."""
     try:
-        # Parse datetime if string
-        if isinstance(ticket_data.get("created_at"), str):
-            ticket_data["created_at"] = datetime.fromisoformat(
-                ticket_data["created_at"].replace("Z", "+00:00")
-            )
-        
-        # Parse account tier if string
-        if isinstance(ticket_data.get("account_tier"), str):
-            ticket_data["account_tier"] = AccountTier(ticket_data["account_tier"])
-        
+        _coerce_ticket_fields(ticket_data)
+
         # Validate ticket
-        ticket = SupportTicket(**ticket_data)
-        
+        return SupportTicket(**ticket_data)
+
     except ValidationError as e:
         raise HTTPException(status_code=422, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
-    
+
+
+@app.post("/api/process", response_model=PipelineResult)
+async def process_ticket_api(ticket_data: dict):
+    """Process a support ticket through the triage pipeline."""
+    ticket = _parse_ticket_data(ticket_data)
+
     # Process ticket
     try:
         llm = get_llm()
@@ -630,6 +849,26 @@ async def process_ticket_api(ticket_data: dict):
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
 
+@app.post("/api/process/batch", response_model=list[PipelineResult])
+async def process_tickets_api(tickets_data: list[dict]):
+    """Process several support tickets concurrently through the triage pipeline."""
+    tickets = [_parse_ticket_data(ticket_data) for ticket_data in tickets_data]
+
+    try:
+        llm = get_llm()
+        retriever = get_kb_retriever()
+        results = process_tickets(
+            tickets, llm, retriever, get_history(), get_status(), get_conversations()
+        )
+        # Serialize the whole batch in one pass instead of dumping each result
+        return Response(
+            content=PipelineResultList(results).model_dump_json(),
+            media_type="application/json"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
+
+
 @app.get("/api/ticket-history/stats")
 async def get_ticket_history_stats():
     """Get statistics about the previous queries (ticket history) store."""
@@ -729,7 +968,8 @@ async def update_status(status_id: str, update_data: dict):
             status_id=status_id,
             message=message,
             new_status_type=update_data.get("new_status_type"),
-            resolved=update_data.get("resolved", False)
+            resolved=update_data.get("resolved", False),
+            reembed=update_data.get("reembed")
         )
 
         if not success:
@@ -799,13 +1039,15 @@ async def add_approved_response_api(data: dict):
             category=category.value,
             tags=tags,
             approved_by=data["approved_by"],
-            approved_at=approved_at.isoformat()
+            approved_at=approved_at.isoformat(),
+            # The response is written in the background; drop stale searches once it lands
+            on_added=_invalidate_kb_search_cache
         )
 
         if success:
             return {
                 "success": True,
-                "message": f"Approved response from ticket {data['ticket_id']} added to KB",
+                "message": f"Approved response from ticket {data['ticket_id']} queued for KB",
                 "ticket_id": data["ticket_id"],
                 "category": category.value
             }
@@ -865,12 +1107,15 @@ async def list_conversations(status: str | None = None, limit: int = 50):
     try:
         conversation_store = get_conversations()
 
+        # Listings come from the store's summary index; no conversation files are read
         if status == "active":
-            conversations = conversation_store.get_active_conversations()
+            conversations = conversation_store.list_conversations(statuses=ACTIVE_STATUSES)
         elif status == "awaiting_customer":
-            conversations = conversation_store.get_awaiting_customer()
+            conversations = conversation_store.list_conversations(
+                statuses={ConversationStatus.awaiting_customer}
+            )
         else:
-            conversations = list(conversation_store._conversations.values())
+            conversations = conversation_store.list_conversations()
 
         # Sort by updated_at descending
         conversations.sort(key=lambda c: c.updated_at, reverse=True)
@@ -886,7 +1131,7 @@ async def list_conversations(status: str | None = None, limit: int = 50):
                 "customer_name": c.customer_name,
                 "subject": c.subject,
                 "status": c.status.value,
-                "message_count": len(c.messages),
+                "message_count": c.message_count,
                 "pending_fields": c.pending_fields,
                 "created_at": c.created_at.isoformat(),
                 "updated_at": c.updated_at.isoformat()
@@ -917,7 +1162,7 @@ async def get_conversation(conversation_id: str):
         if not conversation:
             raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
 
-        return conversation.model_dump(mode="json")
+        return Response(content=conversation.model_dump_json(), media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
@@ -934,7 +1179,10 @@ async def get_conversation_messages(conversation_id: str):
         if not conversation:
             raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
 
-        return [msg.model_dump(mode="json") for msg in conversation.messages]
+        return Response(
+            content=ConversationMessageList(conversation.messages).model_dump_json(),
+            media_type="application/json"
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -969,15 +1217,7 @@ async def process_followup(conversation_id: str, ticket_data: dict):
         if not conversation:
             raise HTTPException(status_code=404, detail=f"Conversation {conversation_id} not found")
 
-        # Parse datetime if string
-        if isinstance(ticket_data.get("created_at"), str):
-            ticket_data["created_at"] = datetime.fromisoformat(
-                ticket_data["created_at"].replace("Z", "+00:00")
-            )
-
-        # Parse account tier if string
-        if isinstance(ticket_data.get("account_tier"), str):
-            ticket_data["account_tier"] = AccountTier(ticket_data["account_tier"])
+        _coerce_ticket_fields(ticket_data)
 
         # Mark as follow-up and set conversation_id
         ticket_data["conversation_id"] = conversation_id
@@ -1045,14 +1285,14 @@ async def get_customer_conversations(customer_email: str):
     """Get all conversations for a specific customer."""
     try:
         conversation_store = get_conversations()
-        conversations = conversation_store.get_conversations_by_customer(customer_email)
+        conversations = conversation_store.list_conversations(customer_email=customer_email)
 
         return [
             {
                 "conversation_id": c.conversation_id,
                 "subject": c.subject,
                 "status": c.status.value,
-                "message_count": len(c.messages),
+                "message_count": c.message_count,
                 "created_at": c.created_at.isoformat(),
                 "updated_at": c.updated_at.isoformat()
             }
@@ -1149,9 +1389,10 @@ async def add_known_issue(issue_data: dict):
         with open(known_issues_path, "w", encoding="utf-8") as f:
             f.write(new_content)
         
-        # Rebuild the KB index to include the new issue
+        # Re-index the changed file; the KB manifest picks up the edit
+        build_kb_index()
+        _invalidate_kb_search_cache()
         _retriever = None  # Reset retriever to force rebuild
-        build_kb_index(force_rebuild=True)
         
         return {
             "success": True,
@@ -1312,10 +1553,10 @@ async def get_monitoring_events(limit: int = 50):
             events = _monitoring_state["events"]
             if limit:
                 events = events[:limit]
-            return {
+            return _orjson_response({
                 "running": running,
-                "events": [event.model_dump(mode='json') for event in events]
-            }
+                "events": [event.model_dump() for event in events]
+            })
 
         events = generator.get_events(limit=None)
 
@@ -1351,10 +1592,10 @@ async def get_monitoring_events(limit: int = 50):
         if limit:
             events = events[:limit]
 
-        return {
+        return _orjson_response({
             "running": running,
-            "events": [event.model_dump(mode='json') for event in events]
-        }
+            "events": [event.model_dump() for event in events]
+        })
 
 
 def _create_monitoring_ticket(event: LogEvent, issue: AIIssue, alerts: list[AIAlert]) -> None:
@@ -1424,7 +1665,7 @@ async def get_flagged_events():
         events = _monitoring_state["events"]
         flagged_events = [e for e in events if e.flagged or e.critical]
         
-        return [event.model_dump(mode='json') for event in flagged_events]
+        return _orjson_response([event.model_dump() for event in flagged_events])
 
 
 @app.get("/api/monitoring/ai-actions")
@@ -1434,10 +1675,10 @@ async def get_ai_actions():
         issues = _monitoring_state["issues"]
         alerts = _monitoring_state["alerts"]
 
-        return {
-            "issues": [issue.model_dump(mode='json') for issue in issues],
-            "alerts": [alert.model_dump(mode='json') for alert in alerts]
-        }
+        return _orjson_response({
+            "issues": [issue.model_dump() for issue in issues],
+            "alerts": [alert.model_dump() for alert in alerts]
+        })
 
 
 @app.get("/api/monitoring/cache-status")
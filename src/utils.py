@@ -35,24 +35,24 @@ class RedactionFilter(logging.Filter):
         (r"\bsk-[a-zA-Z0-9]{32,}\b", "[API_KEY_REDACTED]"),
         (r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b", "[PHONE_REDACTED]"),
     ]
+    _compiled = [(re.compile(pattern), replacement) for pattern, replacement in patterns]
     
     def filter(self, record: logging.LogRecord) -> bool:
         """Redact sensitive data from log message."""
         message = record.getMessage()
-        for pattern, replacement in self.patterns:
-            message = re.sub(pattern, replacement, message)
+        for regex, replacement in self._compiled:
+            message = regex.sub(replacement, message)
         record.msg = message
         record.args = ()
         return True
 
 
+_email_re = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+
+
 def redact_email(text: str) -> str:
     """Redact email addresses from text."""
-    return re.sub(
-        r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
-        "[EMAIL_REDACTED]",
-        text
-    )
+    return _email_re.sub("[EMAIL_REDACTED]", text)
 
 
 def format_timestamp(dt: datetime | None = None) -> str:
@@ -0,0 +1,224 @@
+"""
+Tests for conversation threading persistence.
+
+These run entirely offline against a temporary persistence directory.
+"""
+
+import shutil
+
+import pytest
+
+from src.kb.conversation_store import (
+    ConversationStore, INDEX_FILENAME, META_FILENAME, MESSAGES_FILENAME
+)
+from src.schemas import (
+    SupportTicket, AccountTier, TriageResult, ExtractedFields, RoutingDecision,
+    ConversationStatus, Urgency, Category, Sentiment, Team
+)
+
+
+def make_ticket(ticket_id: str, email: str = "ana@example.com") -> SupportTicket:
+    return SupportTicket(
+        ticket_id=ticket_id,
+        customer_name="Ana",
+        customer_email=email,
+        account_tier=AccountTier.professional,
+        product="CloudSync",
+        subject="Sync failing",
+        body="Files stopped syncing this morning."
+    )
+
+
+def make_classification(missing_fields: list[str] | None = None):
+    triage = TriageResult(
+        urgency=Urgency.p2,
+        category=Category.bug,
+        sentiment=Sentiment.neutral,
+        confidence=0.9,
+        rationale="Sync bug"
+    )
+    extracted = ExtractedFields(missing_fields=missing_fields or [])
+    routing = RoutingDecision(
+        team=Team.engineering,
+        sla_hours=24,
+        escalation=False,
+        reasoning="Bug report"
+    )
+    return triage, extracted, routing
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ConversationStore(persist_dir=tmp_path)
+    yield store
+    store.close()
+
+
+class TestConversationStore:
+    """Tests for ConversationStore persistence and lookups."""
+
+    def test_create_and_get(self, store):
+        """Created conversations should be retrievable by ID."""
+        conversation = store.create_conversation(make_ticket("T-1"), *make_classification())
+
+        assert store.get_conversation(conversation.conversation_id) is conversation
+        assert store.get_conversation("conv-missing") is None
+
+    def test_reload_is_lazy(self, store, tmp_path):
+        """A new store should list conversations without loading any of them."""
+        store.create_conversation(make_ticket("T-1"), *make_classification())
+        store.create_conversation(make_ticket("T-2"), *make_classification(["region"]))
+        store.flush()
+
+        reloaded = ConversationStore(persist_dir=tmp_path)
+
+        assert len(reloaded._conversations) == 0
+        assert reloaded.get_stats()["total_conversations"] == 2
+        assert reloaded.get_stats()["awaiting_customer"] == 1
+        assert reloaded.get_conversation("conv-T-2").pending_fields == ["region"]
+
+    def test_index_rebuilt_when_missing(self, store, tmp_path):
+        """Deleting the index should not lose any conversations."""
+        store.create_conversation(make_ticket("T-1"), *make_classification())
+        store.flush()
+        (tmp_path / INDEX_FILENAME).unlink()
+
+        reloaded = ConversationStore(persist_dir=tmp_path)
+
+        assert [s.conversation_id for s in reloaded.list_conversations()] == ["conv-T-1"]
+
+    def test_status_changes_are_persisted(self, store, tmp_path):
+        """Status changes made through the store should survive a reload."""
+        conversation = store.create_conversation(make_ticket("T-1"), *make_classification())
+        store.set_status(conversation.conversation_id, ConversationStatus.awaiting_agent)
+        store.flush()
+
+        reloaded = ConversationStore(persist_dir=tmp_path)
+
+        assert reloaded.get_conversation("conv-T-1").status == ConversationStatus.awaiting_agent
+        assert reloaded.list_conversations(statuses={ConversationStatus.awaiting_agent})
+
+    def test_filter_by_customer(self, store):
+        """Customer lookups should only return that customer's conversations."""
+        store.create_conversation(make_ticket("T-1", "ana@example.com"), *make_classification())
+        store.create_conversation(make_ticket("T-2", "bo@example.com"), *make_classification())
+
+        conversations = store.get_conversations_by_customer("bo@example.com")
+
+        assert [c.conversation_id for c in conversations] == ["conv-T-2"]
+
+    def test_writes_are_deferred_until_flush(self, store, tmp_path):
+        """Saves should be visible immediately but only hit disk on flush."""
+        store._closed.set()  # stop the background flusher for a deterministic check
+        store._flush_thread.join()
+        conversation = store.create_conversation(make_ticket("T-1"), *make_classification())
+
+        assert not (tmp_path / "conv-T-1").exists()
+        assert store.get_conversation(conversation.conversation_id) is conversation
+
+        store.flush()
+
+        assert (tmp_path / "conv-T-1" / META_FILENAME).exists()
+        assert not list(tmp_path.glob("**/*.tmp"))
+
+    def test_messages_are_appended(self, store, tmp_path):
+        """Replies should be appended to the message log and survive a reload."""
+        store.create_conversation(make_ticket("T-1"), *make_classification())
+        store.flush()
+        store.add_system_reply("conv-T-1", "Could you share the region?")
+        store.flush()
+
+        lines = (tmp_path / "conv-T-1" / MESSAGES_FILENAME).read_bytes().splitlines()
+        reloaded = ConversationStore(persist_dir=tmp_path)
+
+        assert len(lines) == 2
+        assert [m.content for m in reloaded.get_conversation("conv-T-1").messages][1] == (
+            "Could you share the region?"
+        )
+
+    def test_failed_meta_write_does_not_duplicate_messages(self, store, tmp_path, monkeypatch):
+        """Retrying a flush after the meta write fails should not append messages twice."""
+        store.create_conversation(make_ticket("T-1"), *make_classification())
+        store.flush()
+        store.add_system_reply("conv-T-1", "Could you share the region?")
+
+        atomic_write = store._atomic_write
+        def fail_meta(path, data):
+            if path.name == META_FILENAME:
+                raise OSError("disk full")
+            atomic_write(path, data)
+        monkeypatch.setattr(store, "_atomic_write", fail_meta)
+        with pytest.raises(OSError):
+            store.flush()
+        monkeypatch.setattr(store, "_atomic_write", atomic_write)
+        store.flush()
+
+        lines = (tmp_path / "conv-T-1" / MESSAGES_FILENAME).read_bytes().splitlines()
+        assert len(lines) == 2
+
+    def test_legacy_file_is_migrated(self, store, tmp_path):
+        """Single-file conversations should load and move to the log format on write."""
+        conversation = store.create_conversation(make_ticket("T-1"), *make_classification())
+        store.close()
+        shutil.rmtree(tmp_path / "conv-T-1")
+        (tmp_path / "conv-T-1.json").write_text(conversation.model_dump_json())
+        (tmp_path / INDEX_FILENAME).unlink()
+
+        legacy = ConversationStore(persist_dir=tmp_path)
+        legacy.set_status("conv-T-1", ConversationStatus.awaiting_agent)
+        legacy.close()
+
+        assert not (tmp_path / "conv-T-1.json").exists()
+        assert len((tmp_path / "conv-T-1" / MESSAGES_FILENAME).read_bytes().splitlines()) == 1
+
+    def test_followup_fills_missing_fields(self, store):
+        """Follow-up extractions should fill empty fields without overwriting known ones."""
+        triage, extracted, routing = make_classification(["region"])
+        extracted.environment = "production"
+        store.create_conversation(make_ticket("T-1"), triage, extracted, routing)
+
+        followup = ExtractedFields(environment="staging", region="us-east-1")
+        conversation = store.add_customer_message("conv-T-1", make_ticket("T-2"), followup)
+
+        merged = conversation.merged_extracted_fields
+        assert (merged.environment, merged.region) == ("production", "us-east-1")
+        assert conversation.pending_fields == []
+        assert conversation.messages[0].extracted_fields.region is None
+
+    def test_torn_log_line_is_skipped_and_repaired(self, store, tmp_path):
+        """A partial trailing message should be dropped and not corrupt later appends."""
+        store.create_conversation(make_ticket("T-1"), *make_classification())
+        store.close()
+        with open(tmp_path / "conv-T-1" / MESSAGES_FILENAME, "ab") as f:
+            f.write(b'{"message_id":')
+
+        reopened = ConversationStore(persist_dir=tmp_path)
+        reopened.add_system_reply("conv-T-1", "Following up")
+        reopened.close()
+
+        messages = ConversationStore(persist_dir=tmp_path).get_conversation("conv-T-1").messages
+        assert [m.content for m in messages][1:] == ["Following up"]
+
+    def test_status_index_follows_transitions(self, store):
+        """Status lookups and stats should reflect the latest status only."""
+        store.create_conversation(make_ticket("T-1"), *make_classification(["region"]))
+        store.create_conversation(make_ticket("T-2", "bo@example.com"), *make_classification())
+        store.resolve_conversation("conv-T-1")
+
+        assert store.get_awaiting_customer() == []
+        assert [c.conversation_id for c in store.get_active_conversations()] == ["conv-T-2"]
+        assert store.get_stats()["by_status"] == {"resolved": 1, "in_progress": 1}
+        assert store.list_conversations(
+            statuses={ConversationStatus.resolved}, customer_email="bo@example.com"
+        ) == []
+
+    def test_context_refreshes_after_update(self, store):
+        """Cached context should be reused until the conversation changes."""
+        store.create_conversation(make_ticket("T-1"), *make_classification())
+        first = store.get_conversation_context("conv-T-1")
+
+        assert store.get_conversation_context("conv-T-1") is first
+
+        store.add_system_reply("conv-T-1", "We're looking into it")
+
+        assert "We're looking into it" in store.get_conversation_context("conv-T-1")
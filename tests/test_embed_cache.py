@@ -0,0 +1,85 @@
+"""
+Tests for the persistent embedding cache.
+
+These run offline using deterministic fake embeddings.
+"""
+
+import sqlite3
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.kb.embed_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings that record every text sent to the model."""
+    calls: list[str] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.extend(texts)
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def model():
+    return CountingEmbeddings(size=8, calls=[])
+
+
+class TestCachedEmbeddings:
+    """Tests for CachedEmbeddings."""
+
+    def test_only_misses_are_embedded(self, model, tmp_path):
+        """Repeated and previously seen texts should come from the cache."""
+        cache = CachedEmbeddings(model, "fake", tmp_path / "cache.sqlite3")
+
+        first = cache.embed_documents(["refunds", "outages", "refunds"])
+        second = cache.embed_documents(["outages", "sla"])
+
+        assert model.calls == ["refunds", "outages", "sla"]
+        assert first[0] == first[2]
+        assert second[0] == pytest.approx(first[1])
+
+    def test_cache_persists_per_model(self, model, tmp_path):
+        """Vectors should survive a reopen but not be shared across models."""
+        path = tmp_path / "cache.sqlite3"
+        CachedEmbeddings(model, "fake", path).embed_documents(["refunds"])
+
+        CachedEmbeddings(model, "fake", path).embed_query("refunds")
+        CachedEmbeddings(model, "other", path).embed_query("refunds")
+
+        assert model.calls == ["refunds", "refunds"]
+
+    def test_repeat_queries_skip_sqlite(self, model, tmp_path, monkeypatch):
+        """Repeated queries should be served from the in-memory LRU."""
+        monkeypatch.setattr("src.kb.embed_cache.QUERY_CACHE_SIZE", 1)
+        cache = CachedEmbeddings(model, "fake", tmp_path / "cache.sqlite3")
+        first = cache.embed_query("refunds")
+
+        lookups = []
+        monkeypatch.setattr(cache, "_lookup", lambda hashes: lookups.append(hashes) or {})
+        assert cache.embed_query("refunds") == first
+        assert lookups == []
+
+        cache.embed_query("outages")
+        assert list(cache._query_cache) == ["outages"]
+
+    def test_float32_cache_migrated_to_half_precision(self, model, tmp_path):
+        """Vectors from an older float32 cache should be served quantized."""
+        path = tmp_path / "cache.sqlite3"
+        cache = CachedEmbeddings(model, "fake", path)
+        fresh = cache.embed_query("refunds")
+        cache._conn.close()
+
+        # Rewrite the entry as an older cache would have stored it
+        vector = np.asarray(model.embed_query("refunds"), dtype=np.float32)
+        conn = sqlite3.connect(str(path))
+        with conn:
+            conn.execute("UPDATE cache SET vector = ?", (vector.tobytes(),))
+            conn.execute("PRAGMA user_version = 0")
+        conn.close()
+
+        migrated = CachedEmbeddings(model, "fake", path).embed_query("refunds")
+
+        assert migrated == fresh == vector.astype(np.float16).tolist()
@@ -4,14 +4,19 @@ Tests for knowledge base indexing and retrieval.
 Note: Tests requiring embeddings need OPENAI_API_KEY to be set.
 """
 
+import json
 import os
 import pytest
 from pathlib import Path
 
+from langchain_core.documents import Document
+
 from src.kb.indexer import (
     get_kb_path, get_chroma_path, load_markdown_files,
-    split_by_headers, build_kb_index
+    split_by_headers, split_into_children, build_kb_index, build_kb_manifest,
+    MANIFEST_FILENAME, CHILD_CHUNK_SIZE
 )
+from src.kb.dedup import drop_near_duplicates
 from src.kb.retriever import KBRetriever, get_retriever
 from src.schemas import KBHit
 
@@ -54,6 +59,278 @@ class TestKBIndexer:
             assert "source" in chunk.metadata
             assert "section" in chunk.metadata
 
+    def test_split_tracks_header_hierarchy(self):
+        """Sections should carry their h1-h3 path; fenced headers aren't sections."""
+        text = (
+            "# Billing\n\n## Refunds\n\nRefunds take 5 days.\n\n"
+            "```\n# not a header\n```\n\n### Annual plans\n\nProrated.\n\n## Invoices\n\nMonthly.\n"
+        )
+        doc = Document(page_content=text, metadata={"source": "billing"})
+
+        chunks = split_by_headers([doc])
+
+        assert [chunk.metadata["section"] for chunk in chunks] == ["refunds", "annual-plans", "invoices"]
+        assert "# not a header" in chunks[0].page_content
+        assert chunks[1].metadata["h2"] == "Refunds"
+        assert "h3" not in chunks[2].metadata
+
+
+class TestParentChildChunks:
+    """Tests for parent/child chunking and parent passages."""
+
+    def test_children_link_to_parents(self):
+        """Every child should reference a parent and fit the child size."""
+        parents = split_by_headers(load_markdown_files(get_kb_path()))
+        children = split_into_children(parents)
+
+        parent_ids = {parent.metadata["parent_id"] for parent in parents}
+        assert len(parent_ids) == len(parents)
+        assert {child.metadata["parent_id"] for child in children} == parent_ids
+        assert all(len(child.page_content) <= CHILD_CHUNK_SIZE for child in children)
+
+    # Fake embeddings aren't normalized, so cosine relevance can leave [0, 1]
+    @pytest.mark.filterwarnings("ignore:Relevance scores must be between")
+    @pytest.mark.filterwarnings("ignore:legacy embedding function config")
+    def test_search_returns_parent_passage(self, tmp_path, monkeypatch):
+        """Hits should carry the parent text, once per parent."""
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        embeddings = DeterministicFakeEmbedding(size=8)
+        monkeypatch.setattr("src.kb.indexer.get_embeddings", lambda: embeddings)
+        monkeypatch.setattr("src.kb.retriever.get_embeddings", lambda: embeddings)
+
+        kb_path = tmp_path / "kb"
+        kb_path.mkdir()
+        section = "## Refunds\n\n" + " ".join(f"Refund rule {i}." for i in range(60))
+        (kb_path / "billing.md").write_text(f"# Billing\n\n{section}\n")
+        build_kb_index(kb_path=kb_path, persist_dir=tmp_path / "chroma_db")
+
+        hits = KBRetriever(persist_dir=tmp_path).search("refund rules")
+
+        assert len(hits) == 1
+        assert len(hits[0].passage) == 500 > CHILD_CHUNK_SIZE
+        assert "Refund rule 0." in hits[0].passage
+
+    @pytest.mark.filterwarnings("ignore:Relevance scores must be between")
+    @pytest.mark.filterwarnings("ignore:legacy embedding function config")
+    def test_search_ef_sized_once_for_max_k(self, tmp_path, monkeypatch):
+        """ef_search should cover MAX_SEARCH_K at setup, and searches shouldn't modify it."""
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        from src.kb.retriever import MAX_SEARCH_K, PARENT_OVERSAMPLE, SEARCH_EF_PER_RESULT
+        embeddings = DeterministicFakeEmbedding(size=8)
+        monkeypatch.setattr("src.kb.indexer.get_embeddings", lambda: embeddings)
+        monkeypatch.setattr("src.kb.retriever.get_embeddings", lambda: embeddings)
+
+        kb_path = tmp_path / "kb"
+        kb_path.mkdir()
+        (kb_path / "billing.md").write_text("# Billing\n\n## Refunds\n\nRefunds take 5 days.\n")
+        build_kb_index(kb_path=kb_path, persist_dir=tmp_path / "chroma_db")
+        retriever = KBRetriever(persist_dir=tmp_path)
+        sized = SEARCH_EF_PER_RESULT * MAX_SEARCH_K * PARENT_OVERSAMPLE
+        modified = []
+        with monkeypatch.context() as patch:
+            patch.setattr(retriever.vectorstore._collection, "modify", lambda **kwargs: modified.append(kwargs))
+            retriever.search("refunds", k=5)
+            retriever.search("refunds", k=MAX_SEARCH_K * 2)
+            retriever.search_batch(["Refunds"], ["How long?"], k=MAX_SEARCH_K)
+
+        assert retriever._current_search_ef() == sized
+        assert modified == []
+        assert KBRetriever(persist_dir=tmp_path)._current_search_ef() == sized
+
+
+class TestBatchSearch:
+    """Tests for KBRetriever.search_batch."""
+
+    @pytest.mark.filterwarnings("ignore:Relevance scores must be between")
+    @pytest.mark.filterwarnings("ignore:legacy embedding function config")
+    def test_batch_matches_single_searches(self, tmp_path, monkeypatch):
+        """Batched results should equal per-ticket contextual searches, from one embeddings call."""
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        embeddings = DeterministicFakeEmbedding(size=8)
+        monkeypatch.setattr("src.kb.indexer.get_embeddings", lambda: embeddings)
+        monkeypatch.setattr("src.kb.retriever.get_embeddings", lambda: embeddings)
+
+        kb_path = tmp_path / "kb"
+        kb_path.mkdir()
+        (kb_path / "billing.md").write_text(
+            "# Billing\n\n## Refunds\n\nRefunds take 5 days.\n\n## Invoices\n\nInvoices are monthly.\n"
+        )
+        (kb_path / "outages.md").write_text("# Outages\n\n## Status\n\nCheck the status page.\n")
+        build_kb_index(kb_path=kb_path, persist_dir=tmp_path / "chroma_db")
+        retriever = KBRetriever(persist_dir=tmp_path)
+
+        subjects = ["Refund please", "API down", "Refund please"]
+        bodies = ["Charged twice", "Everything returns 500", "Charged twice"]
+        categories = ["billing", "outage", "billing"]
+        batch_calls = []
+        embed_batch = retriever.embed_batch
+        monkeypatch.setattr(retriever, "embed_batch", lambda texts: batch_calls.append(texts) or embed_batch(texts))
+
+        batch = retriever.search_batch(subjects, bodies, categories, k=2)
+        retriever.clear_cache()
+        single = [
+            retriever.search_with_context(subject, body, category, k=2)
+            for subject, body, category in zip(subjects, bodies, categories)
+        ]
+
+        assert batch == single
+        assert len(batch_calls) == 1 and len(batch_calls[0]) == 2
+
+
+class TestApprovedResponses:
+    """Tests for approved responses added to the KB."""
+
+    @pytest.mark.filterwarnings("ignore:Relevance scores must be between")
+    @pytest.mark.filterwarnings("ignore:legacy embedding function config")
+    def test_search_filters_by_tags(self, tmp_path, monkeypatch):
+        """Tags should be stored as a list and usable as a search filter."""
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        from src.kb.indexer import add_approved_response, get_approved_response_queue
+        embeddings = DeterministicFakeEmbedding(size=8)
+        monkeypatch.setattr("src.kb.indexer.get_embeddings", lambda: embeddings)
+        monkeypatch.setattr("src.kb.retriever.get_embeddings", lambda: embeddings)
+
+        kb_path = tmp_path / "kb"
+        kb_path.mkdir()
+        (kb_path / "billing.md").write_text("# Billing\n\n## Refunds\n\nRefunds take 5 days.\n")
+        build_kb_index(kb_path=kb_path, persist_dir=tmp_path / "chroma_db")
+        for ticket_id, tags in [("T-1", ["refund", "billing"]), ("T-2", ["outage"])]:
+            add_approved_response(
+                ticket_id, "Question", "Answer", "billing", tags, "agent", "2024-01-01",
+                persist_dir=tmp_path / "chroma_db"
+            )
+        get_approved_response_queue().flush()
+
+        retriever = KBRetriever(persist_dir=tmp_path)
+        hits = retriever.search("refund", tags=["refund"])
+        metadatas = retriever.vectorstore._collection.get(where={"ticket_id": "T-1"})["metadatas"]
+
+        assert [hit.doc_name for hit in hits] == ["approved_responses"]
+        assert len(retriever.search("refund", tags=["outage", "billing"])) == 2
+        assert metadatas[0]["tags"] == ["refund", "billing"]
+
+    def test_failed_write_retried_without_duplicates(self, tmp_path, monkeypatch):
+        """A batch failing partway should be retried whole, with callbacks run only once written."""
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        from src.kb.indexer import (
+            _get_vectorstore, add_approved_response, get_approved_response_queue, reset_approved_response_queue
+        )
+
+        class FlakyEmbedding(DeterministicFakeEmbedding):
+            """Fails the second embedding request once."""
+            calls: int = 0
+
+            def embed_documents(self, texts):
+                self.calls += 1
+                if self.calls == 2:
+                    raise RuntimeError("embedding service unavailable")
+                return super().embed_documents(texts)
+
+        embeddings = FlakyEmbedding(size=8)
+        monkeypatch.setattr("src.kb.indexer.get_embeddings", lambda: embeddings)
+        monkeypatch.setattr("src.kb.write_queue.WRITE_RETRY_SECONDS", 0.0)
+        reset_approved_response_queue()
+        added = []
+        on_added = lambda: added.append(1)
+
+        for ticket_id, persist_dir in [("T-1", tmp_path / "a"), ("T-2", tmp_path / "b")]:
+            add_approved_response(
+                ticket_id, "Question", "Answer", "billing", [], "agent", "2024-01-01",
+                persist_dir=persist_dir, on_added=on_added
+            )
+        get_approved_response_queue().flush()
+        reset_approved_response_queue()
+
+        assert embeddings.calls == 4
+        assert added == [1]
+        for persist_dir in [tmp_path / "a", tmp_path / "b"]:
+            assert len(_get_vectorstore(persist_dir)._collection.get()["ids"]) == 1
+
+
+class TestNearDuplicateChunks:
+    """Tests for MinHash near-duplicate filtering."""
+
+    def test_drops_near_duplicates_keeps_distinct(self):
+        """Near-identical chunks should collapse to the first; distinct ones stay."""
+        text = "Refunds for annual plans are issued within 30 days of the request being approved."
+        chunks = [
+            Document(page_content=text),
+            Document(page_content=text.replace("approved.", "approved!")),
+            Document(page_content="Page the on-call engineer when the API error rate exceeds 5%."),
+        ]
+
+        kept = drop_near_duplicates(chunks)
+
+        assert kept == [chunks[0], chunks[2]]
+
+    def test_bundled_kb_has_no_false_positives(self):
+        """Distinct sections of the shipped KB should all be kept."""
+        children = split_into_children(split_by_headers(load_markdown_files(get_kb_path())))
+
+        assert len(drop_near_duplicates(children)) == len(children)
+
+
+class TestKBManifest:
+    """Tests for incremental re-indexing driven by the KB manifest."""
+
+    @pytest.fixture
+    def kb_dir(self, tmp_path, monkeypatch):
+        """A small KB with offline embeddings."""
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        monkeypatch.setattr(
+            "src.kb.indexer.get_embeddings", lambda: DeterministicFakeEmbedding(size=8)
+        )
+        kb_path = tmp_path / "kb"
+        kb_path.mkdir()
+        (kb_path / "billing.md").write_text("# Billing\n\n## Refunds\n\nRefunds take 5 days.\n")
+        (kb_path / "outages.md").write_text("# Outages\n\n## Paging\n\nPage the on-call.\n")
+        return kb_path
+
+    def test_manifest_written_on_build(self, kb_dir, tmp_path):
+        """A fresh build should record every KB file in the manifest."""
+        build_kb_index(kb_path=kb_dir, persist_dir=tmp_path / "index")
+
+        manifest = json.loads((tmp_path / "index" / MANIFEST_FILENAME).read_text())
+        assert set(manifest) == {"billing.md", "outages.md"}
+
+    def test_empty_files_skipped(self, kb_dir):
+        """Empty and whitespace-only files should not be loaded or fingerprinted."""
+        (kb_dir / "empty.md").write_text("")
+        (kb_dir / "blank.md").write_text(" \n" * 20)
+
+        docs = load_markdown_files(kb_dir)
+        assert {doc.metadata["source"] for doc in docs} == {"billing", "outages"}
+        assert "empty.md" not in build_kb_manifest(kb_dir)
+
+    def test_only_changed_files_reindexed(self, kb_dir, tmp_path):
+        """Editing or deleting a file should replace only that file's chunks."""
+        persist_dir = tmp_path / "index"
+        build_kb_index(kb_path=kb_dir, persist_dir=persist_dir)
+
+        (kb_dir / "billing.md").write_text("# Billing\n\n## Invoices\n\nInvoices are monthly.\n")
+        (kb_dir / "outages.md").unlink()
+        vectorstore = build_kb_index(kb_path=kb_dir, persist_dir=persist_dir)
+
+        chunks = vectorstore._collection.get()
+        assert {m["source"] for m in chunks["metadatas"]} == {"billing"}
+        assert any("monthly" in doc for doc in chunks["documents"])
+        assert not any("5 days" in doc for doc in chunks["documents"])
+
+
+    def test_duplicates_kept_across_files(self, kb_dir, tmp_path):
+        """A section repeated in two files should survive editing one of them."""
+        persist_dir = tmp_path / "index"
+        (kb_dir / "faq.md").write_text((kb_dir / "billing.md").read_text())
+        build_kb_index(kb_path=kb_dir, persist_dir=persist_dir)
+
+        (kb_dir / "billing.md").write_text("# Billing\n\n## Invoices\n\nInvoices are monthly.\n")
+        vectorstore = build_kb_index(kb_path=kb_dir, persist_dir=persist_dir)
+
+        chunks = vectorstore._collection.get()
+        assert any(
+            "5 days" in doc and metadata["source"] == "faq"
+            for doc, metadata in zip(chunks["documents"], chunks["metadatas"])
+        )
 
 @pytest.mark.skipif(
     not os.getenv("OPENAI_API_KEY"),
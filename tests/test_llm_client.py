@@ -0,0 +1,126 @@
+"""
+Tests for the LLM client's completion cache.
+
+These run offline; the OpenAI client is replaced with a counting fake.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import httpx
+from openai import BadRequestError
+
+from src.llm_client import OpenAIProvider, get_llm_client, reset_llm_client
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions, recording each request."""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_provider(content: str, enable_cache: bool) -> tuple[OpenAIProvider, FakeCompletions]:
+    provider = OpenAIProvider(api_key="test-key", enable_cache=enable_cache)
+    completions = FakeCompletions(content)
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return provider, completions
+
+
+class TestCompletionCache:
+    """Tests for OpenAIProvider's opt-in completion cache."""
+
+    def test_repeated_prompts_hit_cache(self):
+        """Identical prompts should reach the API once; different ones again."""
+        provider, completions = make_provider("hello", enable_cache=True)
+
+        assert provider.complete("hi", "be brief") == "hello"
+        assert provider.complete("hi", "be brief") == "hello"
+        provider.complete("hi", "be verbose")
+
+        assert len(completions.calls) == 2
+
+    def test_json_results_are_copied(self):
+        """Mutating a returned dict should not change later cache hits."""
+        provider, completions = make_provider(json.dumps({"tags": ["billing"]}), enable_cache=True)
+
+        first = provider.complete_json("classify")
+        first["tags"].append("mutated")
+
+        assert provider.complete_json("classify") == {"tags": ["billing"]}
+        assert len(completions.calls) == 1
+
+    def test_cache_is_opt_in(self):
+        """Without enable_cache every call should go to the API."""
+        provider, completions = make_provider("hello", enable_cache=False)
+
+        provider.complete("hi")
+        provider.complete("hi")
+
+        assert len(completions.calls) == 2
+
+
+class TestLLMClientSingleton:
+    """Tests for get_llm_client."""
+
+    def test_client_is_shared(self, monkeypatch):
+        """Every caller should get the same provider and connection pool."""
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        reset_llm_client()
+        try:
+            assert get_llm_client() is get_llm_client()
+        finally:
+            reset_llm_client()
+
+    def test_concurrent_first_calls_build_one_client(self, monkeypatch):
+        """Requests arriving together should share one provider rather than each building one."""
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        reset_llm_client()
+        built = []
+
+        def slow_provider(**kwargs):
+            time.sleep(0.05)
+            built.append(SimpleNamespace(close=lambda: None))
+            return built[-1]
+
+        monkeypatch.setattr("src.llm_client.OpenAIProvider", slow_provider)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                clients = list(executor.map(lambda _: get_llm_client(), range(8)))
+        finally:
+            reset_llm_client()
+
+        assert len(built) == 1
+        assert all(client is built[0] for client in clients)
+
+
+class TestJSONSchemas:
+    """Tests for structured JSON outputs."""
+
+    def test_schema_falls_back_to_json_mode(self):
+        """A rejected json_schema format should be retried as plain JSON mode."""
+        provider, completions = make_provider(json.dumps({"passed": True}), enable_cache=False)
+        schema = {"name": "check", "schema": {"type": "object"}}
+        formats = []
+        respond = completions.create
+
+        def create(**kwargs):
+            formats.append(kwargs["response_format"]["type"])
+            if kwargs["response_format"]["type"] == "json_schema":
+                request = httpx.Request("POST", "https://api.test/v1/chat/completions")
+                raise BadRequestError("unsupported", response=httpx.Response(400, request=request), body=None)
+            return respond(**kwargs)
+        completions.create = create
+
+        assert provider.complete_json("check", json_schema=schema) == {"passed": True}
+        provider.complete_json("check", json_schema=schema)
+
+        assert formats == ["json_schema", "json_object", "json_object"]
@@ -0,0 +1,79 @@
+"""
+Tests for the monitoring AI agent.
+
+These run offline; the LLM is replaced with a fake that records prompts.
+"""
+
+import threading
+
+from src.monitoring.ai_agent import MonitoringAIAgent
+from src.monitoring.schemas import EventType, LogEvent
+
+
+class FakeLLM:
+    """Stands in for OpenAIProvider, answering with the event's service."""
+
+    def __init__(self):
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def complete_json(self, prompt: str, system_prompt: str = "") -> dict:
+        with self._lock:
+            self.prompts.append(prompt)
+        service = prompt.split("- Service: ", 1)[1].split("\n", 1)[0]
+        return {"severity": "high", "eng_alert_subject": f"[ALERT] {service}"}
+
+
+def make_event(event_id: str, service_name: str, latency_ms: float = 750.0) -> LogEvent:
+    return LogEvent(
+        event_id=event_id,
+        event_type=EventType.api,
+        service_name=service_name,
+        region="us-east-1",
+        severity="error",
+        message="/api/v1/payments - 500",
+        metrics={"latency_ms": latency_ms, "status_code": 500},
+        flagged=True
+    )
+
+
+class TestAnalyzeFlaggedEvent:
+    """Tests for MonitoringAIAgent.analyze_flagged_event."""
+
+    def test_processed_ids_are_bounded(self, monkeypatch):
+        """Only the most recent event IDs should be remembered."""
+        monkeypatch.setattr("src.monitoring.ai_agent.PROCESSED_EVENTS_SIZE", 2)
+        agent = MonitoringAIAgent(FakeLLM(), kb_retriever=None)
+
+        for i in range(3):
+            agent.analyze_flagged_event(make_event(f"evt-{i}", f"service-{i}"), [])
+
+        assert list(agent._processed_event_ids) == ["evt-1", "evt-2"]
+
+
+class TestAnalysisCache:
+    """Tests for reusing analyses of events with the same fingerprint."""
+
+    def test_similar_events_share_analysis(self):
+        """Events differing only by small metric changes should reuse one LLM call."""
+        llm = FakeLLM()
+        agent = MonitoringAIAgent(llm, kb_retriever=None)
+
+        first, _ = agent.analyze_flagged_event(make_event("evt-1", "payment-api", 751.2), [])
+        second, _ = agent.analyze_flagged_event(make_event("evt-2", "payment-api", 748.9), [])
+        agent.analyze_flagged_event(make_event("evt-3", "payment-api", 1200.0), [])
+
+        assert len(llm.prompts) == 2
+        assert second.related_events == ["evt-2"]
+        assert second.severity == first.severity
+
+    def test_cached_analysis_expires(self, monkeypatch):
+        """An analysis older than the TTL should not be reused."""
+        monkeypatch.setattr("src.monitoring.ai_agent.ANALYSIS_CACHE_TTL_SECONDS", 0.0)
+        llm = FakeLLM()
+        agent = MonitoringAIAgent(llm, kb_retriever=None)
+
+        agent.analyze_flagged_event(make_event("evt-1", "payment-api"), [])
+        agent.analyze_flagged_event(make_event("evt-2", "payment-api"), [])
+
+        assert len(llm.prompts) == 2
@@ -0,0 +1,65 @@
+"""
+Tests for the embedding rate limiter.
+
+These run offline; time is controlled by patching the monotonic clock.
+"""
+
+import pytest
+
+from src.kb import rate_limiter
+from src.kb.rate_limiter import RateLimiter, _retry_after_seconds
+
+
+class FakeClock:
+    """Monotonic clock that only advances when the limiter waits."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    return clock
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter token buckets."""
+
+    def test_waits_for_refill(self, clock, monkeypatch):
+        """Exhausting the request bucket should wait for the refill time."""
+        limiter = RateLimiter(requests_per_minute=60)
+        waits = []
+
+        def fake_wait(timeout):
+            waits.append(timeout)
+            clock.now += timeout
+        monkeypatch.setattr(limiter._cond, "wait", fake_wait)
+
+        limiter.acquire(requests=60)
+        limiter.acquire(requests=2)
+
+        assert waits == [pytest.approx(2.0)]
+
+    def test_unlimited_by_default(self):
+        """A limiter without limits should never block."""
+        limiter = RateLimiter()
+
+        limiter.acquire(requests=10_000, tokens=10_000_000)
+
+        assert not limiter.enabled
+
+    def test_retry_after_header(self):
+        """Retry-After values should be used verbatim."""
+        class Response:
+            headers = {"retry-after": "7"}
+
+        class RateLimitError(Exception):
+            status_code = 429
+            response = Response()
+
+        assert _retry_after_seconds(RateLimitError()) == 7.0
@@ -0,0 +1,193 @@
+"""
+Tests for the server's ticket pipeline.
+
+These run offline; the LLM, KB retriever and status store are replaced with
+fakes, and ticket history uses deterministic fake embeddings.
+"""
+
+import threading
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.kb.conversation_store import ConversationStore
+from src.kb.ticket_history import TicketHistoryStore
+from src.pipeline.reply import reply_system_prompt
+from src.pipeline.routing import compute_routing
+from src.pipeline.triage import triage_system_prompt
+from src.schemas import AccountTier, ExtractedFields, KBHit, SupportTicket
+from src.server import process_ticket, process_tickets
+
+
+class FakeLLM:
+    """Stands in for OpenAIProvider, answering each pipeline stage by its system prompt."""
+
+    def __init__(self):
+        self.system_prompts = []
+        self._lock = threading.Lock()
+
+    def complete_json(self, prompt: str, system_prompt: str = "", json_schema: dict | None = None) -> dict:
+        with self._lock:
+            self.system_prompts.append(system_prompt)
+        if system_prompt == triage_system_prompt:
+            return {
+                "triage": {"urgency": "P1", "category": "billing", "sentiment": "neutral", "confidence": 0.9},
+                "extracted_fields": {"order_id": "ORD-1001", "requested_action": "Refund the duplicate charge"}
+            }
+        if system_prompt == reply_system_prompt:
+            return {"customer_reply": "We have refunded the duplicate charge.", "citations": []}
+        # Input and output guardrail checks
+        return {"passed": True, "risk_level": "low"}
+
+    @property
+    def triage_calls(self) -> int:
+        return self.system_prompts.count(triage_system_prompt)
+
+
+class FakeRetriever:
+    """Stands in for KBRetriever, recording the categories it was searched with."""
+
+    def __init__(self):
+        self.categories = []
+        self.batches = []
+
+    def search_with_context(self, ticket_subject, ticket_body, category=None, k=None) -> list[KBHit]:
+        self.categories.append(category)
+        return [KBHit(doc_name="billing.md", section="Refunds", passage="Refunds take 5 days.", relevance_score=0.9)]
+
+    def search_batch(self, ticket_subjects, ticket_bodies, categories=None, k=None) -> list[list[KBHit]]:
+        self.batches.append(list(zip(ticket_subjects, categories)))
+        return [
+            self.search_with_context(subject, body, category, k)
+            for subject, body, category in zip(ticket_subjects, ticket_bodies, categories)
+        ]
+
+
+class FakeStatusStore:
+    """Stands in for StatusUpdateStore with no active incidents."""
+
+    def find_relevant_status(self, query: str, active_only: bool = True, k: int = 3) -> list[dict]:
+        return []
+
+
+class OverlapStatusStore:
+    """Status store that signals when it's searched, returning one active outage."""
+
+    def __init__(self):
+        self.searched = threading.Event()
+
+    def find_relevant_status(self, query: str, active_only: bool = True, k: int = 3) -> list[dict]:
+        self.searched.set()
+        return [{
+            "status_id": "STATUS-1",
+            "title": "Billing API degraded",
+            "status_type": "degradation",
+            "severity": "high",
+            "affected_services": ["billing-api"],
+            "description": "Charges may be duplicated.",
+            "is_active": True,
+            "relevance_score": 0.8
+        }]
+
+
+def make_ticket(
+    ticket_id: str,
+    account_tier: AccountTier,
+    subject: str = "Charged twice",
+    body: str = "I was charged twice for my subscription this month, please refund one."
+) -> SupportTicket:
+    return SupportTicket(
+        ticket_id=ticket_id,
+        customer_name="Ada",
+        customer_email="ada@example.com",
+        account_tier=account_tier,
+        product="API",
+        subject=subject,
+        body=body
+    )
+
+
+@pytest.fixture
+def stores(monkeypatch, tmp_path):
+    monkeypatch.setattr("src.kb.ticket_history.get_embeddings", lambda: DeterministicFakeEmbedding(size=8))
+    history = TicketHistoryStore(persist_dir=tmp_path)
+    conversations = ConversationStore(persist_dir=tmp_path / "conversations")
+    yield history, FakeStatusStore(), conversations
+    history.close()
+    conversations.close()
+
+
+class TestAutoReply:
+    """Tests for answering a ticket from a similar earlier one."""
+
+    def test_routing_and_fields_not_copied_across_customers(self, stores):
+        """An auto-reply should reuse triage and KB hits but route for its own tier."""
+        history = stores[0]
+        llm, retriever = FakeLLM(), FakeRetriever()
+
+        first = process_ticket(
+            make_ticket("TICKET-1", AccountTier.enterprise), llm, retriever, *stores
+        )
+        history.flush()
+        second = process_ticket(
+            make_ticket("TICKET-2", AccountTier.free), llm, retriever, *stores
+        )
+
+        assert second.auto_reply.is_auto_reply
+        assert second.auto_reply.matched_ticket_id == "TICKET-1"
+        assert llm.triage_calls == 1
+        assert second.triage == first.triage
+        assert second.kb_hits == first.kb_hits
+        assert second.routing == compute_routing(first.triage, AccountTier.free)
+        assert second.routing.sla_hours != first.routing.sla_hours
+        assert first.extracted_fields.order_id == "ORD-1001"
+        assert second.extracted_fields == ExtractedFields()
+
+
+class TestLookups:
+    """Tests for the status and similar-ticket lookups run before triage."""
+
+    def test_status_lookup_overlaps_similar_ticket_lookup(self, stores, monkeypatch):
+        """The status search should run while the similar-ticket lookup is in progress."""
+        history, _, conversations = stores
+        status_store = OverlapStatusStore()
+        find_similar_ticket = history.find_similar_ticket
+        overlapped = []
+
+        def waiting_find_similar_ticket(ticket):
+            overlapped.append(status_store.searched.wait(timeout=5))
+            return find_similar_ticket(ticket)
+
+        monkeypatch.setattr(history, "find_similar_ticket", waiting_find_similar_ticket)
+
+        result = process_ticket(
+            make_ticket("TICKET-1", AccountTier.professional), FakeLLM(), FakeRetriever(),
+            history, status_store, conversations
+        )
+
+        assert overlapped == [True]
+        assert [status.status_id for status in result.status_updates] == ["STATUS-1"]
+
+
+class TestProcessTickets:
+    """Tests for processing a batch of tickets."""
+
+    def test_kb_searched_once_after_triage(self, stores):
+        """Only triaged tickets should be searched, together and with their category."""
+        history = stores[0]
+        llm, retriever = FakeLLM(), FakeRetriever()
+        process_ticket(make_ticket("TICKET-1", AccountTier.enterprise), llm, retriever, *stores)
+        history.flush()
+
+        results = process_tickets([
+            make_ticket("TICKET-2", AccountTier.free),
+            make_ticket("TICKET-3", AccountTier.free, body="Refund <script>alert(1)</script> now"),
+            make_ticket("TICKET-4", AccountTier.starter, subject="Invoice missing", body="Where is my May invoice?"),
+        ], llm, retriever, *stores)
+
+        assert [result.ticket_id for result in results] == ["TICKET-2", "TICKET-3", "TICKET-4"]
+        assert results[0].auto_reply.is_auto_reply
+        assert results[1].reply.should_send is False
+        assert retriever.batches == [[("Invoice missing", "billing")]]
+        assert results[2].kb_hits == retriever.search_with_context("Invoice missing", "", "billing")
+        assert results[2].routing == compute_routing(results[2].triage, AccountTier.starter)
@@ -0,0 +1,211 @@
+"""
+Tests for the status update store.
+
+These run offline using deterministic fake embeddings.
+"""
+
+import json
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.kb.status_store import StatusUpdate, StatusUpdateStore
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings that record every text sent to the model."""
+    calls: list[str] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.extend(texts)
+        return super().embed_documents(texts)
+
+
+class FailingEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings whose document requests are always rejected."""
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise RuntimeError("input rejected")
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    model = CountingEmbeddings(size=8, calls=[])
+    monkeypatch.setattr("src.kb.status_store.get_embeddings", lambda: model)
+    return model
+
+
+@pytest.fixture
+def store(embeddings, tmp_path):
+    store = StatusUpdateStore(persist_dir=tmp_path)
+    store.add_status(StatusUpdate(
+        status_id="STATUS-1",
+        title="API outage",
+        status_type="outage",
+        affected_services=["api"],
+        description="Requests are failing"
+    ))
+    store.flush()
+    yield store
+    store.close()
+
+
+class TestAddStatus:
+    """Tests for StatusUpdateStore.add_status."""
+
+    def test_reads_see_queued_statuses(self, store):
+        """Statuses added in the background should be visible to the store's reads."""
+        store.add_status(StatusUpdate(
+            status_id="STATUS-2",
+            title="Billing maintenance",
+            status_type="maintenance",
+            description="Invoices delayed"
+        ))
+
+        active = store.get_active_statuses()
+
+        assert {status["status_id"] for status in active} == {"STATUS-1", "STATUS-2"}
+
+    def test_active_statuses_sorted_by_severity(self, store):
+        """Active statuses should list the most severe first, oldest first within a severity."""
+        for status_id, severity in [("STATUS-2", "low"), ("STATUS-3", "critical"), ("STATUS-4", "unknown")]:
+            store.add_status(StatusUpdate(
+                status_id=status_id,
+                title=f"{severity} issue",
+                status_type="degradation",
+                severity=severity,
+                description="Slow responses"
+            ))
+
+        active = store.get_active_statuses()
+
+        assert [status["status_id"] for status in active] == ["STATUS-3", "STATUS-2", "STATUS-1", "STATUS-4"]
+
+    def test_resolved_statuses_filtered(self, store):
+        """Resolved statuses should drop out of the active list and stats."""
+        store.update_status("STATUS-1", "Fixed", resolved=True)
+
+        assert store.get_active_statuses() == []
+        assert store.get_stats()["active_statuses"] == 0
+        assert store.get_stats()["resolved_statuses"] == 1
+
+
+    def test_unwritable_status_does_not_break_reads(self, store, monkeypatch):
+        """A status that can't be written should leave reads working on what is stored."""
+        monkeypatch.setattr("src.kb.write_queue.WRITE_RETRY_SECONDS", 0.0)
+        store.embeddings = FailingEmbeddings(size=8)
+        store.similarity_threshold = float("-inf")
+        store.add_status(StatusUpdate(
+            status_id="STATUS-2",
+            title="Billing maintenance",
+            status_type="maintenance",
+            description="Invoices delayed"
+        ))
+
+        relevant = store.find_relevant_status("API requests failing")
+        active = store.get_active_statuses()
+
+        assert [status["status_id"] for status in relevant] == ["STATUS-1"]
+        assert [status["status_id"] for status in active] == ["STATUS-1"]
+        assert store.get_stats()
+        with pytest.raises(RuntimeError):
+            store.flush()
+
+
+class TestUpdateStatus:
+    """Tests for StatusUpdateStore.update_status."""
+
+    def test_new_message_reembeds_in_place(self, store, embeddings):
+        """A new update message should re-embed the status without duplicating it."""
+        message = "Fix deployed to every region, error rates back to normal"
+        assert store.update_status("STATUS-1", message, resolved=True)
+
+        stored = store.vectorstore._collection.get(ids=["STATUS-1"], include=["documents", "metadatas"])
+        assert store.vectorstore._collection.count() == 1
+        assert stored["documents"][0].endswith(message)
+        assert stored["metadatas"][0]["is_active"] is False
+        updates = json.loads(stored["metadatas"][0]["updates"])
+        assert updates[-1]["timestamp"] == stored["metadatas"][0]["resolved_at"]
+        assert embeddings.calls[-1] == stored["documents"][0]
+
+    def test_metadata_only_change_skips_embedding(self, store, embeddings):
+        """An update that leaves the search text unchanged shouldn't be embedded."""
+        calls_before = len(embeddings.calls)
+
+        assert store.update_status("STATUS-1", "", new_status_type="degradation")
+
+        stored = store.vectorstore._collection.get(ids=["STATUS-1"], include=["metadatas"])
+        assert stored["metadatas"][0]["status_type"] == "degradation"
+        assert len(embeddings.calls) == calls_before
+
+    def test_short_message_appended_without_embedding(self, store, embeddings):
+        """A short update should extend the search text but not be embedded."""
+        calls_before = len(embeddings.calls)
+
+        assert store.update_status("STATUS-1", "Monitoring")
+        assert store.update_status("STATUS-1", "Fixed")
+
+        stored = store.vectorstore._collection.get(ids=["STATUS-1"], include=["documents"])
+        assert stored["documents"][0].endswith(" Monitoring Fixed")
+        assert len(embeddings.calls) == calls_before
+
+    def test_unknown_status(self, store):
+        """Updating a missing status should report failure."""
+        assert not store.update_status("STATUS-404", "Fixed")
+
+
+class TestFindRelevantStatus:
+    """Tests for StatusUpdateStore.find_relevant_status."""
+
+    def test_repeat_queries_embedded_once(self, store, embeddings):
+        """Active statuses should be found, with repeat queries served from the cache."""
+        from src.kb.embed_cache import CachedEmbeddings
+        store.embeddings = CachedEmbeddings(embeddings, "fake", store.persist_dir / "cache.sqlite3")
+        store.similarity_threshold = float("-inf")
+        calls_before = len(embeddings.calls)
+
+        first = store.find_relevant_status("API requests failing")
+        second = store.find_relevant_status("API requests failing")
+
+        assert [status["status_id"] for status in first] == ["STATUS-1"]
+        assert first[0]["affected_services"] == ["api"]
+        assert second == first
+        assert len(embeddings.calls) == calls_before + 1
+
+
+class TestStatusMetadata:
+    """Tests for how status metadata is stored."""
+
+    def test_native_fields(self, store):
+        """is_active and affected_services should be stored as native values."""
+        metadata = store.vectorstore._collection.get(ids=["STATUS-1"], include=["metadatas"])["metadatas"][0]
+
+        assert metadata["is_active"] is True
+        assert metadata["affected_services"] == ["api"]
+
+    def test_string_encoded_statuses_migrated(self, store, tmp_path):
+        """Statuses stored with string-encoded fields should be converted on open."""
+        store.vectorstore._collection.add(
+            ids=["STATUS-OLD"],
+            embeddings=[[0.1] * 8],
+            documents=["Old outage"],
+            metadatas=[{
+                "status_id": "STATUS-OLD",
+                "title": "Old outage",
+                "severity": "high",
+                "description": "Stored before native metadata",
+                "started_at": "2024-01-01T00:00:00",
+                "affected_services": json.dumps(["web", "api"]),
+                "is_active": "True",
+                "updates": "[]",
+            }]
+        )
+        store.close()
+
+        reopened = StatusUpdateStore(persist_dir=tmp_path)
+        metadata = reopened.vectorstore._collection.get(ids=["STATUS-OLD"], include=["metadatas"])["metadatas"][0]
+        active = {status["status_id"]: status for status in reopened.get_active_statuses()}
+        reopened.close()
+
+        assert metadata["is_active"] is True
+        assert active["STATUS-OLD"]["affected_services"] == ["web", "api"]
@@ -0,0 +1,98 @@
+"""
+Tests for the ticket history store.
+
+These run offline using deterministic fake embeddings.
+"""
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.kb.ticket_history import TicketHistoryStore
+from src.schemas import AccountTier, SupportTicket
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings that record every text sent to the model."""
+    calls: list[str] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.extend(texts)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls.append(text)
+        return super().embed_query(text)
+
+
+def make_ticket(ticket_id: str, subject: str, body: str) -> SupportTicket:
+    return SupportTicket(
+        ticket_id=ticket_id,
+        customer_name="Ada",
+        customer_email="ada@example.com",
+        account_tier=AccountTier.free,
+        product="API",
+        subject=subject,
+        body=body
+    )
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    model = CountingEmbeddings(size=8, calls=[])
+    monkeypatch.setattr("src.kb.ticket_history.get_embeddings", lambda: model)
+    return model
+
+
+@pytest.fixture
+def store(embeddings, tmp_path):
+    store = TicketHistoryStore(persist_dir=tmp_path)
+    store._write_tickets([("TICKET-1", "Refund request Please refund my order", {"ticket_id": "TICKET-1"})])
+    yield store
+    store.close()
+
+
+class TestFindSimilarTicket:
+    """Tests for TicketHistoryStore.find_similar_ticket."""
+
+    def test_identical_text_skips_embedding(self, store, embeddings):
+        """A ticket with the same text as a stored one should match without embedding."""
+        calls_before = len(embeddings.calls)
+
+        should_reply, score, _, matched = store.find_similar_ticket(
+            make_ticket("TICKET-2", "Refund request", "please refund  my order")
+        )
+
+        assert should_reply and score == 1.0
+        assert matched["matched_ticket_id"] == "TICKET-1"
+        assert len(embeddings.calls) == calls_before
+
+    def test_lookup_vector_reused_when_stored(self, store, embeddings):
+        """Storing a ticket after looking it up shouldn't embed its text again."""
+        ticket = make_ticket("TICKET-2", "Login broken", "Cannot sign in since this morning")
+        search_text = f"{ticket.subject} {ticket.body}"
+
+        store.find_similar_ticket(ticket)
+        store._write_tickets([("TICKET-2", search_text, {"ticket_id": "TICKET-2"})])
+
+        assert embeddings.calls.count(search_text) == 1
+        assert store.vectorstore._collection.count() == 2
+
+    def test_lookup_matches_chroma_without_reading_it(self, store, embeddings, monkeypatch):
+        """The in-memory scan and rerank should rank like Chroma, without querying it."""
+        store._write_tickets([
+            (f"TICKET-{i}", f"Issue number {i} with the product", {"ticket_id": f"TICKET-{i}"})
+            for i in range(10, 140)
+        ])
+        store._load_mirror()
+        query = np.asarray(embeddings.embed_query("Issue number 42 with the product"), dtype=np.float32)
+        expected = store.vectorstore._collection.query(query_embeddings=[query.tolist()], n_results=5)
+
+        # Any Chroma access during the lookup would now fail
+        monkeypatch.setattr(store, "vectorstore", None)
+        top, distances = store._search_mirror(
+            query, store._codes, store._scales, store._vectors, store._sq_norms, k=5
+        )
+
+        assert [store._ids[i] for i in top] == expected["ids"][0]
+        assert distances == pytest.approx(expected["distances"][0], rel=1e-2, abs=1e-3)
@@ -0,0 +1,105 @@
+"""
+Tests for the background batch write queue.
+"""
+
+import pytest
+
+from src.kb.write_queue import BatchWriteQueue
+
+
+class RecordingWriter:
+    """Writer that records every batch it is given."""
+
+    def __init__(self):
+        self.batches: list[list] = []
+
+    def __call__(self, items: list) -> None:
+        self.batches.append(list(items))
+
+
+class TestBatchWriteQueue:
+    """Tests for BatchWriteQueue."""
+
+    def test_flush_writes_pending_batch_and_callbacks_once(self):
+        """Flush should write everything queued and run each callback once."""
+        writer = RecordingWriter()
+        written = []
+        callback = lambda: written.append(1)
+        writes = BatchWriteQueue(writer, batch_size=10, flush_seconds=60)
+
+        writes.put("one", callback)
+        writes.put("two", callback)
+        writes.put("three")
+        writes.flush()
+
+        assert writer.batches == [["one", "two", "three"]]
+        assert written == [1]
+        assert writes.pending == 0
+        writes.close()
+
+    def test_full_batch_and_close_write_without_flush(self):
+        """A full batch should be written immediately and the rest on close."""
+        writer = RecordingWriter()
+        writes = BatchWriteQueue(writer, batch_size=2, flush_seconds=60)
+
+        for item in ["one", "two", "three"]:
+            writes.put(item)
+        writes.close()
+
+        assert writer.batches == [["one", "two"], ["three"]]
+
+    def test_failed_batch_is_retried(self, monkeypatch):
+        """A batch should be retried until written, and only then run its callback."""
+        monkeypatch.setattr("src.kb.write_queue.WRITE_RETRY_SECONDS", 0.0)
+        batches = []
+        written = []
+
+        def writer(items):
+            batches.append(items)
+            if len(batches) < 3:
+                raise RuntimeError("boom")
+
+        writes = BatchWriteQueue(writer, batch_size=1, flush_seconds=60)
+        writes.put("one", lambda: written.append(1))
+        writes.flush()
+
+        assert batches == [["one"]] * 3
+        assert written == [1]
+        assert writes.pending == 0
+        writes.close()
+
+    def test_unwritten_batch_is_kept_and_reported(self, monkeypatch):
+        """A batch failing every attempt shouldn't block others, and flush should report it."""
+        monkeypatch.setattr("src.kb.write_queue.WRITE_RETRY_SECONDS", 0.0)
+        batches = []
+        written = []
+        failing = True
+
+        def writer(items):
+            batches.append(items)
+            if failing and items == ["bad"]:
+                raise RuntimeError("boom")
+
+        writes = BatchWriteQueue(writer, batch_size=1, flush_seconds=60)
+        writes.put("bad", lambda: written.append("bad"))
+        writes.put("good", lambda: written.append("good"))
+        with pytest.raises(RuntimeError):
+            writes.flush()
+
+        assert ["good"] in batches
+        assert written == ["good"]
+        assert writes.pending == 1
+
+        failing = False
+        writes.flush()
+        assert written == ["good", "bad"]
+        assert writes.pending == 0
+        writes.close()
+
+    def test_put_after_close_raises(self):
+        """Items put after close would never be written, so put should refuse them."""
+        writes = BatchWriteQueue(RecordingWriter(), batch_size=1, flush_seconds=60)
+        writes.close()
+
+        with pytest.raises(RuntimeError):
+            writes.put("late")